@@ -0,0 +1,50 @@
+"""
+Dependencias de FastAPI (`Depends`) sobre el contenedor `app.state.services`.
+
+Son async a propósito: FastAPI las resuelve en el event loop y no en el
+threadpool, así que cada servicio se construye una sola vez aunque la
+primera ráfaga de peticiones llegue a rutas síncronas.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from fastapi import Request
+
+from app.services.container import Services
+
+if TYPE_CHECKING:
+    from app.clients.nasa_client import CachedNasaNeoClient
+    from app.services.isitwater_service import IsItWaterService
+    from app.services.nasa_service import NasaNeoService
+    from app.services.physicService import ImpactEarthquakeService
+    from app.services.risk_index import RiskIndex
+    from app.services.sweep_service import SweepRunner
+
+
+def get_services(request: Request) -> Services:
+    return request.app.state.services
+
+
+async def nasa_client(request: Request) -> CachedNasaNeoClient:
+    return get_services(request).nasa_client
+
+
+async def nasa_service(request: Request) -> NasaNeoService:
+    return get_services(request).nasa
+
+
+async def water_service(request: Request) -> IsItWaterService:
+    return get_services(request).water
+
+
+async def impact_service(request: Request) -> ImpactEarthquakeService:
+    return get_services(request).impact
+
+
+async def risk_index(request: Request) -> RiskIndex:
+    return get_services(request).risk_index
+
+
+async def sweep_runner(request: Request) -> SweepRunner:
+    return get_services(request).sweeps
@@ -0,0 +1,28 @@
+"""
+Errores de los upstreams hacia el cliente.
+
+Las excepciones de httpx incluyen la URL completa de la petición, y la de
+NASA lleva la `api_key` en la query: nunca se devuelven tal cual. El cliente
+recibe un detalle fijo con el código HTTP o el tipo de error; la excepción
+completa queda en el log del servidor.
+"""
+import logging
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+def upstream_reason(e: BaseException) -> str:
+    """Motivo breve y sin URL: el código HTTP del upstream o el tipo de error."""
+    import httpx  # ya cargado si hubo una petición; no al importar la app
+
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"HTTP {e.response.status_code}"
+    return type(e).__name__
+
+
+def upstream_error(upstream: str, e: BaseException) -> HTTPException:
+    """502 para `raise upstream_error("NASA /feed", e) from e`; registra el error real."""
+    logger.warning("Upstream %s failed: %r", upstream, e)
+    return HTTPException(status_code=502, detail=f"{upstream} no disponible ({upstream_reason(e)})")
@@ -1,7 +1,30 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from app.domain.schemas import EarthquakeDetail, SimDetail
-from app.services.physicService import ImpactEarthquakeService  # ensure this path is correct
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+import json
+from typing import TYPE_CHECKING
+from pydantic import BaseModel, ValidationError
+from app.api import deps
+from app.api.errors import upstream_error
+from app.core.degraded import track_degraded
+from app.domain.schemas import (
+    BatchImpactInput, BatchImpactResponse, CombinedJobParams, EarthquakeDetail, EffectsInput, EffectsResponse,
+    EntryInput, EntryResponse, JobInput, JobOut, MonteCarloInput, NearbyEarthquake, SweepAxis, SweepInput, SweepProgressOut, MonteCarloResponse, SimDetail,
+)
+from app.services.job_queue import JobContext, JobRejected
+from app.services.scenario_store import SCENARIO_COOKIE
+
+if TYPE_CHECKING:
+    # Física (NumPy) y servicios se importan en el primer uso: ver app/services/container.py
+    from app.domain.physics.impact import ImpactScenario
+    from app.domain.physics.montecarlo import MonteCarloSpec
+    from app.services.nasa_service import NasaNeoService
+    from app.services.physicService import ImpactEarthquakeService
+    from app.services.quake_catalog import QuakeCatalog
+    from app.services.sweep_service import SweepRunner
 
 router = APIRouter(prefix="/impact", tags=["impact"])
 
@@ -9,16 +32,342 @@ class CombinedResponse(BaseModel):
     simulation: SimDetail
     seismic_magnitude: float
     related_earthquake: EarthquakeDetail | None = None
+    # True si algún dato viene de un respaldo local porque el upstream falló
+    degraded: bool = False
 
-service = ImpactEarthquakeService()
+async def resolve_scenario(request: Request, scenario_id: str | None) -> ImpactScenario | None:
+    """
+    Escenario a simular: el `scenario_id` explícito, el de la cookie de sesión
+    o, para clientes antiguos, el último guardado (en cualquier worker si
+    el backend de escenarios es compartido).
+    None deja que el servicio use el config.json por defecto.
+    """
+    from app.domain.physics.impact import ImpactScenario
 
-@router.get("/combined", response_model=CombinedResponse)
-def run_combined():
-    combined = service.run_combined()
+    store = request.app.state.scenarios
+    if scenario_id is not None:
+        config = await store.get(scenario_id)
+        if config is None:
+            raise HTTPException(status_code=404, detail=f"Escenario {scenario_id} no encontrado o vencido.")
+        return ImpactScenario.from_config(config)
+
+    cookie = request.cookies.get(SCENARIO_COOKIE)
+    config = await store.get(cookie) if cookie else None
+    if config is None and (last := await store.last()) is not None:
+        config = await store.get(last)
+    return ImpactScenario.from_config(config) if config is not None else None
+
+
+async def combined_response(service: ImpactEarthquakeService, scenario: ImpactScenario | None) -> CombinedResponse:
+    with track_degraded() as degraded:
+        combined = await service.run_combined(scenario)
     if not combined:
         raise HTTPException(status_code=500, detail="Failed to produce combined impact + earthquake result.")
     return CombinedResponse(
         simulation=SimDetail(**combined["simulation"]),
         seismic_magnitude=combined["seismic_magnitude"],
-        related_earthquake=EarthquakeDetail(**combined["related_earthquake"]) if combined["related_earthquake"] else None
+        related_earthquake=EarthquakeDetail(**combined["related_earthquake"]) if combined["related_earthquake"] else None,
+        degraded=bool(degraded),
+    )
+
+
+@router.get("/combined", response_model=CombinedResponse)
+async def run_combined(
+    request: Request,
+    scenario_id: str | None = None,
+    service: ImpactEarthquakeService = Depends(deps.impact_service),
+):
+    scenario = await resolve_scenario(request, scenario_id)
+    return await combined_response(service, scenario)
+
+
+def require_table(service: ImpactEarthquakeService, payload: BatchImpactInput) -> None:
+    if payload.mode == "table" and service.table is None:
+        raise HTTPException(status_code=503, detail="Tabla precalculada no configurada (IMPACT_TABLE_PATH).")
+
+
+@router.post("/batch", response_model=BatchImpactResponse)
+async def run_batch(payload: BatchImpactInput, service: ImpactEarthquakeService = Depends(deps.impact_service)):
+    require_table(service, payload)
+    response = await run_in_threadpool(service.run_batch, payload)
+    if payload.related_earthquakes:
+        response = await service.attach_related_earthquakes(response)
+    return response
+
+
+async def _batch_job(ctx: JobContext, service: ImpactEarthquakeService, params: BatchImpactInput):
+    response = await ctx.run(service.run_batch, params)
+    if params.related_earthquakes:
+        ctx.report(0.9, "Buscando sismos comparables")
+        response = await service.attach_related_earthquakes(response)
+    return response
+
+
+async def montecarlo_spec(payload: MonteCarloInput, nasa_service: NasaNeoService) -> MonteCarloSpec:
+    from app.domain.physics.montecarlo import MonteCarloSpec
+
+    if payload.nasa_id is not None:
+        try:
+            neo = await nasa_service.get_diameter_range(payload.nasa_id)
+        except Exception as e:
+            raise upstream_error("NASA /neo/{id}", e) from e
+        d_min, d_max, velocity = neo["diameter_min_km"], neo["diameter_max_km"], neo["velocity_km_s"]
+    else:
+        d_min, d_max, velocity = payload.diameter_min_km, payload.diameter_max_km, payload.velocity_kms
+
+    spec = MonteCarloSpec(
+        diameterMin=d_min,
+        diameterMax=d_max,
+        relativeVelocity=velocity,
+        isTargetWater=payload.water,
+    )
+    return spec
+
+
+@router.post("/montecarlo", response_model=MonteCarloResponse)
+async def run_montecarlo(
+    payload: MonteCarloInput,
+    service: ImpactEarthquakeService = Depends(deps.impact_service),
+    nasa_service: NasaNeoService = Depends(deps.nasa_service),
+):
+    spec = await montecarlo_spec(payload, nasa_service)
+    # Sampling is CPU-bound; keep the event loop free while it runs
+    return await run_in_threadpool(service.run_monte_carlo, spec, payload.samples, payload.seed)
+
+
+@router.post("/effects", response_model=EffectsResponse)
+async def run_effects(
+    payload: EffectsInput,
+    request: Request,
+    service: ImpactEarthquakeService = Depends(deps.impact_service),
+):
+    lat, lon = payload.lat, payload.lon
+    if payload.diameter_km is not None:
+        from app.domain.physics.impact import ImpactScenario
+
+        scenario = ImpactScenario(
+            diameter=payload.diameter_km,
+            relativeVelocity=payload.velocity_kms,
+            isTargetWater=payload.water,
+        )
+    else:
+        scenario = await resolve_scenario(request, payload.scenario_id)
+        if payload.scenario_id is not None and lat is None:
+            # Por defecto, el punto de impacto guardado con el escenario
+            config = await request.app.state.scenarios.get(payload.scenario_id)
+            lat, lon = config.get("lat"), config.get("lon")
+
+    return await run_in_threadpool(
+        service.run_effects, scenario, lat, lon, payload.raster, payload.grid_size, payload.half_width_km
     )
+
+
+@router.post("/entry", response_model=EntryResponse)
+async def run_entry(payload: EntryInput, service: ImpactEarthquakeService = Depends(deps.impact_service)):
+    # Integration is CPU-bound; keep the event loop free while it runs
+    return await run_in_threadpool(service.run_entry, payload)
+
+
+async def require_catalog(service: ImpactEarthquakeService = Depends(deps.impact_service)) -> QuakeCatalog:
+    if service.catalog is None:
+        raise HTTPException(status_code=503, detail="Catálogo local de USGS no configurado (USGS_CATALOG_PATH).")
+    return service.catalog
+
+
+@router.get("/earthquakes/nearest", response_model=list[NearbyEarthquake])
+def nearest_earthquakes(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(10, ge=1, le=500),
+    min_magnitude: float | None = None,
+    catalog: QuakeCatalog = Depends(require_catalog),
+):
+    return [catalog.record(row, distance) for row, distance in catalog.nearest(lat, lon, limit, min_magnitude)]
+
+
+@router.get("/earthquakes/largest", response_model=NearbyEarthquake | EarthquakeDetail | None)
+def largest_earthquake(
+    lat: float | None = Query(None, ge=-90, le=90),
+    lon: float | None = Query(None, ge=-180, le=180),
+    radius_km: float | None = Query(None, gt=0),
+    lat_min: float | None = Query(None, ge=-90, le=90),
+    lat_max: float | None = Query(None, ge=-90, le=90),
+    lon_min: float | None = Query(None, ge=-180, le=180),
+    lon_max: float | None = Query(None, ge=-180, le=180),
+    catalog: QuakeCatalog = Depends(require_catalog),
+):
+    """Mayor sismo en un radio alrededor de (lat, lon) o dentro de un rectángulo."""
+    if None not in (lat, lon, radius_km):
+        found = catalog.largest_within(lat, lon, radius_km)
+        return catalog.record(*found) if found else None
+    if None not in (lat_min, lat_max, lon_min, lon_max):
+        row = catalog.largest_in_region(lat_min, lat_max, lon_min, lon_max)
+        return catalog.record(row) if row is not None else None
+    raise HTTPException(status_code=422, detail="Se requiere lat, lon y radius_km, o lat_min, lat_max, lon_min y lon_max.")
+
+
+def _axis(axis: list[float] | SweepAxis):
+    from app.domain.physics.sweep import axis_values
+
+    return axis if isinstance(axis, list) else axis_values(axis.start, axis.stop, axis.num, axis.log)
+
+
+@router.post("/sweep")
+async def run_sweep(payload: SweepInput, runner: SweepRunner = Depends(deps.sweep_runner)):
+    """
+    Evalúa toda la malla diámetro × velocidad × agua en el pool de procesos.
+    Las celdas siguen el orden C (diámetro más lento, agua más rápido).
+    ndjson: una línea de cabecera, una por trozo y una final con el estado.
+    binary: tramas (offset u64, count u32, columnas u32) + columnas float32;
+    la descripción de la malla va en las cabeceras X-Sweep-*.
+    """
+    from app.domain.physics.sweep import COLUMNS as SWEEP_COLUMNS, SweepGrid
+
+    grid = SweepGrid.from_axes(_axis(payload.diameters_km), _axis(payload.velocities_kms), payload.water)
+    progress = runner.start(grid)
+    chunks = runner.stream(progress, grid, payload.chunk_size, payload.format)
+    headers = {
+        "X-Sweep-Id": progress.id,
+        "X-Sweep-Total": str(len(grid)),
+        "X-Sweep-Shape": ",".join(map(str, grid.shape)),
+        "X-Sweep-Columns": ",".join(SWEEP_COLUMNS),
+    }
+    if payload.format == "binary":
+        return StreamingResponse(chunks, media_type="application/octet-stream", headers=headers)
+
+    async def lines():
+        yield json.dumps({"type": "header", "sweep_id": progress.id, "total": len(grid),
+                          "shape": grid.shape, "columns": SWEEP_COLUMNS}) + "\n"
+        async for chunk in chunks:
+            yield chunk
+        yield json.dumps({"type": "end", **progress.as_dict()}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers=headers)
+
+
+@router.get("/sweep/{sweep_id}", response_model=SweepProgressOut)
+def sweep_progress(sweep_id: str, runner: SweepRunner = Depends(deps.sweep_runner)):
+    progress = runner.get(sweep_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"Barrido {sweep_id} no encontrado.")
+    return progress.as_dict()
+
+
+@router.delete("/sweep/{sweep_id}", response_model=SweepProgressOut)
+def cancel_sweep(sweep_id: str, runner: SweepRunner = Depends(deps.sweep_runner)):
+    progress = runner.get(sweep_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"Barrido {sweep_id} no encontrado.")
+    runner.cancel(sweep_id)
+    return progress.as_dict()
+
+
+# ---------- trabajos en segundo plano ----------
+JOB_PARAMS: dict[str, type[BaseModel]] = {
+    "combined": CombinedJobParams,
+    "batch": BatchImpactInput,
+    "montecarlo": MonteCarloInput,
+    "entry": EntryInput,
+}
+
+
+def job_client(request: Request) -> str:
+    """Cliente para el cupo por cliente: X-Client-Id, la sesión o la IP."""
+    return (request.headers.get("x-client-id") or request.cookies.get(SCENARIO_COOKIE)
+            or (request.client.host if request.client else ""))
+
+
+async def _montecarlo_job(ctx: JobContext, service: ImpactEarthquakeService, nasa_service: NasaNeoService,
+                          payload: MonteCarloInput) -> MonteCarloResponse:
+    ctx.report(0.0, "preparando muestras")
+    spec = await montecarlo_spec(payload, nasa_service)
+
+    def progress(done: int, total: int) -> None:
+        ctx.report(done / total, f"{done}/{total} muestras")
+
+    return await ctx.run(service.run_monte_carlo, spec, payload.samples, payload.seed, progress)
+
+
+@router.post("/jobs", response_model=JobOut, status_code=202)
+async def submit_job(
+    payload: JobInput,
+    request: Request,
+    service: ImpactEarthquakeService = Depends(deps.impact_service),
+    nasa_service: NasaNeoService = Depends(deps.nasa_service),
+):
+    """
+    Encola una simulación larga y responde enseguida con su id.
+    `params` lleva el mismo cuerpo que la ruta síncrona del mismo `kind`.
+    """
+    try:
+        params = JOB_PARAMS[payload.kind].model_validate(payload.params)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", "params", *error["loc"])}
+            for error in e.errors(include_url=False, include_context=False)
+        ])
+
+    if payload.kind == "combined":
+        # El escenario se resuelve ahora: la cookie y el último guardado son de esta petición
+        scenario = await resolve_scenario(request, params.scenario_id)
+        work = lambda ctx: combined_response(service, scenario)
+    elif payload.kind == "batch":
+        require_table(service, params)
+        work = lambda ctx: _batch_job(ctx, service, params)
+    elif payload.kind == "montecarlo":
+        work = lambda ctx: _montecarlo_job(ctx, service, nasa_service, params)
+    else:
+        work = lambda ctx: ctx.run(service.run_entry, params)
+
+    try:
+        job = request.app.state.jobs.submit(payload.kind, work, job_client(request), payload.priority)
+    except JobRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
+    return job.as_dict()
+
+
+def job_not_found(job_id: str) -> HTTPException:
+    return HTTPException(status_code=404, detail=f"Trabajo {job_id} no encontrado o vencido.")
+
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+async def job_status(job_id: str, request: Request):
+    # Con STATE_BACKEND compartido responde cualquier worker, no solo el que corre el trabajo
+    state = await request.app.state.jobs.state(job_id)
+    if state is None:
+        raise job_not_found(job_id)
+    return state
+
+
+@router.delete("/jobs/{job_id}", response_model=JobOut)
+async def cancel_job(job_id: str, request: Request):
+    state = await request.app.state.jobs.request_cancel(job_id)
+    if state is None:
+        raise job_not_found(job_id)
+    return state
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Progreso como Server-Sent Events; el último evento trae el resultado."""
+    if await request.app.state.jobs.state(job_id) is None:
+        raise job_not_found(job_id)
+
+    async def events():
+        async for state in request.app.state.jobs.watch(job_id):
+            yield f"event: {state['status']}\ndata: {json.dumps(state)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.websocket("/jobs/{job_id}/ws")
+async def job_socket(websocket: WebSocket, job_id: str):
+    """El mismo flujo que /events, un mensaje JSON por cambio."""
+    jobs = websocket.app.state.jobs
+    await websocket.accept()
+    if await jobs.state(job_id) is None:
+        await websocket.close(code=4404, reason="Trabajo no encontrado o vencido.")
+        return
+    async for state in jobs.watch(job_id):
+        await websocket.send_json(state)
+    await websocket.close()
@@ -1,58 +1,285 @@
-from fastapi import APIRouter, HTTPException, Query
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from datetime import date, timedelta
-from app.services.nasa_service import NasaNeoService
-from app.domain.schemas import MeteorListResponse
-from app.domain.schemas import SimInput
-from app.services.isitwater_service import IsItWaterService
-from app.services.config_manager import write_impact_config
+from typing import TYPE_CHECKING, Literal
+from app.api import deps
+from app.api.errors import upstream_error, upstream_reason
+from app.core.config import settings
+from app.core.degraded import track_degraded
+from app.domain.schemas import MeteorListResponse, OrbitApproachResponse, RankedItem, RankedResponse
+from app.domain.schemas import BatchImpactInput, BulkSimInput, BulkSimResponse, SimInput, SiteResult
+from app.services.scenario_store import SCENARIO_COOKIE
+
+if TYPE_CHECKING:
+    # Los servicios llegan por Depends (app/services/container.py); importarlos
+    # aquí cargaría httpx y NumPy con la app en lugar de con la primera petición
+    from app.clients.nasa_client import CachedNasaNeoClient
+    from app.services.isitwater_service import IsItWaterService
+    from app.services.nasa_service import NasaNeoService
+    from app.services.physicService import ImpactEarthquakeService
+    from app.services.risk_index import RiskIndex
 
 router = APIRouter(prefix="/nasa", tags=["nasa"])
-service = NasaNeoService()
-serviceWater = IsItWaterService()
 
 @router.get("/closest", response_model=MeteorListResponse)
-async def get_closest_asteroids():
+async def get_closest_asteroids(service: NasaNeoService = Depends(deps.nasa_service)):
     
         
     today = date.today()
     start_date = today.isoformat()
     end_date = (today + timedelta(days=2)).isoformat()
 
-    items = await service.get_filtered_asteroids(start_date, end_date)
+    with track_degraded() as degraded:
+        items = await service.get_filtered_asteroids(start_date, end_date)
     return {
             "range": [start_date, end_date],
             "count": len(items),
-            "asteroids": items
+            "asteroids": items,
+            "degraded": bool(degraded),
         }
 
-@router.post("/input")
-async def receive_sim_input(payload: SimInput):
-    
-    # 👇 Servicio devuelve bool
-    is_water: bool = await serviceWater.get_water_info(payload.lat, payload.lon)
-    water_flag = 1 if is_water else 0   # 👈 impact.py espera 0/1
-
-    print("here")
+def _validate_range(start_date: date, end_date: date) -> None:
+    if end_date < start_date:
+        raise HTTPException(status_code=422, detail="end_date debe ser posterior a start_date")
+    if (end_date - start_date).days + 1 > settings.NASA_MAX_RANGE_DAYS:
+        raise HTTPException(status_code=422, detail=f"El rango máximo es de {settings.NASA_MAX_RANGE_DAYS} días")
 
-    if payload.is_custom:
-        config = {
-            "relativeVelocity": float(payload.velocity_kms),  # km/s
-            "diameter": float(payload.diameter_km),           # 👈 km directo
-            "water": water_flag,
+@router.get("/range", response_model=MeteorListResponse)
+async def get_closest_in_range(
+    start_date: date,
+    end_date: date,
+    limit: int = Query(10, ge=1, le=1000),
+    service: NasaNeoService = Depends(deps.nasa_service),
+):
+    """Los más cercanos de un rango arbitrario, consultado en ventanas de 7 días."""
+    _validate_range(start_date, end_date)
+    try:
+        with track_degraded() as degraded:
+            items = await service.get_closest_in_range(
+                start_date, end_date, limit, settings.NASA_RANGE_CONCURRENCY, settings.NASA_RANGE_CACHED_WINDOWS)
+    except Exception as e:
+        raise upstream_error("NASA /feed", e) from e
+    return {
+            "range": [start_date.isoformat(), end_date.isoformat()],
+            "count": len(items),
+            "asteroids": items,
+            "degraded": bool(degraded),
         }
-        
-    else:
+
+@router.get("/range/stream")
+async def stream_range(start_date: date, end_date: date, service: NasaNeoService = Depends(deps.nasa_service)):
+    """Cada acercamiento del rango como una línea NDJSON, conforme llega cada ventana."""
+    _validate_range(start_date, end_date)
+
+    async def lines():
+        async for item in service.iter_feed_range(
+                start_date, end_date, settings.NASA_RANGE_CONCURRENCY, settings.NASA_RANGE_CACHED_WINDOWS):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/ranked", response_model=RankedResponse)
+async def get_ranked(
+    metric: Literal["energy", "seismic", "crater"] = "energy",
+    limit: int = Query(10, ge=1, le=500),
+    cursor: str | None = None,
+    index: RiskIndex = Depends(deps.risk_index),
+):
+    """Top-k del catálogo por consecuencias de impacto, desde el índice precalculado."""
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=422, detail="cursor inválido")
+    if offset < 0:
+        raise HTTPException(status_code=422, detail="cursor inválido")
+
+    rows = index.top(metric, limit, offset)
+    end = offset + rows.size
+    return RankedResponse(
+        metric=metric,
+        total=len(index),
+        count=int(rows.size),
+        next_cursor=str(end) if end < len(index) else None,
+        asteroids=[
+            RankedItem(
+                id=int(r["id"]),
+                name=str(r["name"]),
+                estimated_diameter_km=round(float(r["diameter_km"]), 3),
+                velocity_km_s=round(float(r["velocity_kms"]), 3),
+                is_potentially_hazardous=bool(r["is_potentially_hazardous"]),
+                energy_in_megatons=round(float(r["energy_in_megatons"]), 2),
+                seismic_magnitude=round(float(r["seismic_magnitude"]), 2),
+                crater_diameter_m=round(float(r["crater_diameter_m"]), 2),
+            )
+            for r in rows
+        ],
+    )
+
+@router.get("/approaches", response_model=OrbitApproachResponse)
+async def screen_approaches(
+    days: int = Query(365, ge=1, le=36_500),
+    max_distance_au: float = Query(0.05, gt=0, le=1.0),
+    limit: int = Query(50, ge=1, le=1000),
+    index: RiskIndex = Depends(deps.risk_index),
+):
+    """
+    Acercamientos futuros de todo el catálogo indexado, propagando las
+    órbitas localmente (sin llamar a NASA), del más cercano al más lejano.
+    """
+    from app.domain.physics.orbit import dateToJd
+    from app.services.nasa_service import approach_items
+
+    start = date.today()
+    jd = dateToJd(start)
+    rows, found = await run_in_threadpool(
+        index.screen_approaches, jd, jd + days, settings.ORBIT_STEP_DAYS, max_distance_au
+    )
+    items = approach_items(rows["id"], rows["name"], rows["diameter_km"], found, limit)
+    return {
+        "range": [start.isoformat(), (start + timedelta(days=days)).isoformat()],
+        "screened": index.with_orbits,
+        "count": len(items),
+        "approaches": items,
+    }
+
+@router.get("/orbit/{neo_id}", response_model=OrbitApproachResponse)
+async def get_orbit_approaches(
+    neo_id: int,
+    days: int | None = Query(None, ge=1, le=36_500, description="por defecto ORBIT_HORIZON_DAYS"),
+    max_distance_au: float = Query(0.05, gt=0, le=1.0),
+    service: NasaNeoService = Depends(deps.nasa_service),
+):
+    """Acercamientos futuros de un NEO calculados desde su `orbital_data`."""
+    start = date.today()
+    days = days or settings.ORBIT_HORIZON_DAYS
+    try:
+        items = await service.get_orbit_approaches(neo_id, start, days, max_distance_au)
+    except KeyError:
+        raise HTTPException(status_code=422, detail=f"El NEO {neo_id} no trae orbital_data")
+    except Exception as e:
+        raise upstream_error("NASA /neo/{id}", e) from e
+    return {
+        "range": [start.isoformat(), (start + timedelta(days=days)).isoformat()],
+        "screened": 1,
+        "count": len(items),
+        "approaches": items,
+    }
+
+@router.get("/cache/stats")
+async def get_cache_stats(client: CachedNasaNeoClient = Depends(deps.nasa_client)):
+    return client.stats()
+
+@router.get("/water/stats")
+async def get_water_stats(serviceWater: IsItWaterService = Depends(deps.water_service)):
+    return serviceWater.tiles.stats()
+
+@router.post("/input")
+async def receive_sim_input(
+    payload: SimInput,
+    request: Request,
+    response: Response,
+    serviceWater: IsItWaterService = Depends(deps.water_service),
+    service: NasaNeoService = Depends(deps.nasa_service),
+):
+    
+    with track_degraded() as degraded:
+        # 👇 Servicio devuelve bool
         try:
-            data = await service.get_filtered_by_item(payload.nasa_id)
+            is_water: bool = await serviceWater.get_water_info(payload.lat, payload.lon)
         except Exception as e:
-            raise HTTPException(status_code=502, detail=f"NASA /neo/{{id}} falló: {e}")
+            raise upstream_error("IsItWater", e) from e
+        water_flag = 1 if is_water else 0   # 👈 impact.py espera 0/1
 
+        if payload.is_custom:
+            config = {
+                "relativeVelocity": float(payload.velocity_kms),  # km/s
+                "diameter": float(payload.diameter_km),           # 👈 km directo
+                "water": water_flag,
+            }
 
-        config = {
-            "relativeVelocity": data.velocity_km_s,       # km/s
-            "diameter": data.estimated_diameter_km,               # km
-            "water": water_flag,
-        }
+        else:
+            try:
+                data = await service.get_filtered_by_item(payload.nasa_id)
+            except Exception as e:
+                raise upstream_error("NASA /neo/{id}", e) from e
+
+
+            config = {
+                "relativeVelocity": data.velocity_km_s,       # km/s
+                "diameter": data.estimated_diameter_km,               # km
+                "water": water_flag,
+            }
+
+    config.update(lat=payload.lat, lon=payload.lon)
+
+    # Se guarda por sesión; /impact/combined lo recupera con scenario_id desde cualquier worker
+    store = request.app.state.scenarios
+    scenario_id = await store.save(config)
+    await store.set_last(scenario_id)
+    response.set_cookie(SCENARIO_COOKIE, scenario_id, max_age=int(store.ttl), httponly=True, samesite="lax")
+
+    return {"ok": True, "scenario_id": scenario_id, "saved_config": config, "degraded": bool(degraded)}
+
+@router.post("/input/bulk", response_model=BulkSimResponse)
+async def receive_bulk_input(
+    payload: BulkSimInput,
+    serviceWater: IsItWaterService = Depends(deps.water_service),
+    service: NasaNeoService = Depends(deps.nasa_service),
+    impactService: ImpactEarthquakeService = Depends(deps.impact_service),
+):
+    """
+    Un asteroide contra muchos puntos de impacto, para comparar sitios.
+    El NEO se consulta una vez, agua/tierra una vez por punto distinto (a lo
+    sumo WATER_BULK_CONCURRENCY en vuelo) y las consecuencias de todos los
+    puntos se calculan en un solo lote. Un punto cuya consulta a IsItWater
+    falla (sin ráster de respaldo) vuelve con `error` y sin resultados; el
+    resto no se ve afectado.
+    No se guarda ningún escenario: el sitio elegido se envía a /nasa/input.
+    """
+    with track_degraded() as degraded:
+        nasa_id = name = None
+        if payload.nasa_id is not None:
+            try:
+                data = await service.get_filtered_by_item(payload.nasa_id)
+            except Exception as e:
+                raise upstream_error("NASA /neo/{id}", e) from e
+            nasa_id, name = data.id, data.name
+            diameter, velocity = data.estimated_diameter_km, data.velocity_km_s
+        else:
+            diameter, velocity = payload.diameter_km, payload.velocity_kms
+
+        points = [(site.lat, site.lon) for site in payload.sites]
+        water = await serviceWater.get_water_many(points, settings.WATER_BULK_CONCURRENCY)
+    resolved = [i for i, w in enumerate(water) if not isinstance(w, BaseException)]
+    sites = [
+        SiteResult(lat=lat, lon=lon) if not isinstance(w, BaseException)
+        else SiteResult(lat=lat, lon=lon, error=f"IsItWater no disponible ({upstream_reason(w)})")
+        for (lat, lon), w in zip(points, water)
+    ]
+
+    if resolved:
+        # Un solo lote vectorizado para todos los puntos resueltos
+        flags = [bool(water[i]) for i in resolved]
+        result = impactService.run_batch(BatchImpactInput(
+            diameters_km=[diameter] * len(flags), velocities_kms=[velocity] * len(flags), water=flags,
+        ))
+        for row, i in enumerate(resolved):
+            sites[i].is_water = flags[row]
+            for field in ("energy_in_megatons", "impact_velocity", "crater_diameter_m",
+                          "crater_depth_m", "seismic_magnitude"):
+                setattr(sites[i], field, getattr(result, field)[row])
 
-    write_impact_config(config)
-    return {"ok": True, "saved_config": config}
\ No newline at end of file
+    return BulkSimResponse(
+        nasa_id=nasa_id,
+        name=name,
+        diameter_km=diameter,
+        velocity_kms=velocity,
+        count=len(sites),
+        unique_sites=len({serviceWater.point_key(lat, lon) for lat, lon in points}),
+        failed=len(sites) - len(resolved),
+        sites=sites,
+        degraded=bool(degraded),
+    )
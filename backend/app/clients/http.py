@@ -0,0 +1,249 @@
+import asyncio
+import importlib.util
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+import httpx
+
+from app.clients.resilience import BudgetExceeded, CircuitBreaker, CircuitOpenError, UpstreamPolicy
+from app.core.config import settings
+from app.core.metrics import UPSTREAM_HEDGES, UPSTREAM_REJECTED, UPSTREAM_REQUEST_SECONDS, UPSTREAM_RETRIES
+
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to HTTP/1.1 without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HttpClientManager:
+    """
+    Pool de conexiones HTTP compartido por todos los clientes externos
+    (NASA, IsItWater, USGS).
+
+    Mantiene un único httpx.AsyncClient con keep-alive durante la vida de la
+    aplicación, limita la concurrencia por host y reintenta con backoff
+    exponencial + jitter las respuestas 429/5xx y los errores de transporte.
+    Las peticiones con `upstream=` siguen además la política de ese upstream
+    (presupuesto, cortacircuitos y hedging; ver app/clients/resilience.py).
+    En pruebas y benchmarks se puede inyectar un `transport`
+    (p. ej. httpx.MockTransport) para simular los servicios externos.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        timeout: float | None = None,
+        max_connections: int | None = None,
+        max_keepalive_connections: int = 20,
+        per_host_limit: int | None = None,
+        host_limits: dict[str, int] | None = None,
+        retries: int | None = None,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        http2: bool = HTTP2_AVAILABLE,
+        policies: dict[str, UpstreamPolicy] | None = None,
+    ):
+        # None = valor de settings, leído al construir y no al importar
+        timeout = settings.HTTP_TIMEOUT_S if timeout is None else timeout
+        max_connections = settings.HTTP_MAX_CONNECTIONS if max_connections is None else max_connections
+        self.transport = transport
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.per_host_limit = settings.HTTP_PER_HOST_LIMIT if per_host_limit is None else per_host_limit
+        self.host_limits = dict(host_limits or {})
+        self.retries = settings.HTTP_MAX_RETRIES if retries is None else retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.http2 = http2 and transport is None
+        self._client: httpx.AsyncClient | None = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        # Sin política explícita, la de settings (se lee al primer uso de cada upstream)
+        self.policies = dict(policies or {})
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Crea el AsyncClient en el primer uso, ya dentro del event loop."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                transport=self.transport,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.host_limits.get(host, self.per_host_limit))
+            self._semaphores[host] = sem
+        return sem
+
+    def policy(self, upstream: str) -> UpstreamPolicy:
+        policy = self.policies.get(upstream)
+        if policy is None:
+            policy = self.policies[upstream] = UpstreamPolicy.from_settings(upstream)
+        return policy
+
+    def breaker(self, upstream: str) -> CircuitBreaker:
+        breaker = self.breakers.get(upstream)
+        if breaker is None:
+            policy = self.policy(upstream)
+            breaker = self.breakers[upstream] = CircuitBreaker(upstream, policy.failure_threshold, policy.reset_s)
+        return breaker
+
+    def _backoff(self, attempt: int, response: httpx.Response | None) -> float:
+        """Full jitter; respeta Retry-After cuando el servidor lo envía."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    try:
+                        when = parsedate_to_datetime(retry_after)
+                        delay = (when - datetime.now(timezone.utc)).total_seconds()
+                        return min(max(delay, 0.0), self.backoff_max)
+                    except (TypeError, ValueError):
+                        pass
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    async def request(self, method: str, url: str, upstream: str | None = None, **kwargs) -> httpx.Response:
+        """
+        Envía la petición respetando el límite del host. Solo los métodos
+        idempotentes se reintentan; la última respuesta (o excepción) se
+        devuelve al llamador tal cual. Con `upstream`, el circuito abierto
+        o el presupuesto agotado fallan con UpstreamUnavailable.
+        """
+        method = method.upper()
+        if upstream is None:
+            return await self._request(method, url, None, None, **kwargs)
+
+        policy, breaker = self.policy(upstream), self.breaker(upstream)
+        try:
+            breaker.allow()
+        except CircuitOpenError:
+            UPSTREAM_REJECTED.inc(upstream=upstream, reason="open")
+            raise
+        try:
+            response = await asyncio.wait_for(
+                self._request(method, url, upstream, policy.hedge_after_s, **kwargs), policy.budget_s,
+            )
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            UPSTREAM_REJECTED.inc(upstream=upstream, reason="budget")
+            raise BudgetExceeded(upstream, policy.budget_s) from None
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        if response.status_code in RETRY_STATUS:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def _request(self, method: str, url: str, upstream: str | None, hedge_after: float | None,
+                       **kwargs) -> httpx.Response:
+        """Intentos con reintento y backoff; sin presupuesto ni cortacircuitos."""
+        attempts = self.retries + 1 if method in IDEMPOTENT_METHODS else 1
+        host = httpx.URL(url).host
+        hedge = hedge_after is not None and method in IDEMPOTENT_METHODS
+
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            response = None
+            if attempt:
+                UPSTREAM_RETRIES.inc(host=host)
+            try:
+                if hedge:
+                    response = await self._send_hedged(method, url, host, upstream, hedge_after, **kwargs)
+                else:
+                    response = await self._send(method, url, host, **kwargs)
+            except httpx.TransportError:
+                if last:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS or last:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(self._backoff(attempt, response))
+
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    async def _send(self, method: str, url: str, host: str, **kwargs) -> httpx.Response:
+        response = None
+        async with self._semaphore(host):
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            finally:
+                UPSTREAM_REQUEST_SECONDS.observe(
+                    time.perf_counter() - start, host=host,
+                    status=response.status_code if response is not None else "error",
+                )
+        return response
+
+    async def _send_hedged(self, method: str, url: str, host: str, upstream: str, delay: float,
+                           **kwargs) -> httpx.Response:
+        """
+        Un intento y, si no respondió en `delay`, un segundo en paralelo.
+        Gana la primera respuesta buena; un fallo solo se devuelve cuando ya
+        no queda otro intento en vuelo. El perdedor se cancela.
+        """
+        pending = {asyncio.create_task(self._send(method, url, host, **kwargs))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                UPSTREAM_HEDGES.inc(upstream=upstream)
+                pending.add(asyncio.create_task(self._send(method, url, host, **kwargs)))
+            while True:
+                for task in done:
+                    if pending and (task.exception() is not None or task.result().status_code in RETRY_STATUS):
+                        continue
+                    return task.result()
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Estado del cortacircuitos de cada upstream usado."""
+        return {upstream: breaker.stats() for upstream, breaker in self.breakers.items()}
+
+
+_manager: HttpClientManager | None = None
+
+
+def get_http_manager() -> HttpClientManager:
+    """
+    Devuelve el manager de la aplicación. Normalmente lo crea el lifespan
+    de main.py; fuera de FastAPI (scripts) se crea uno bajo demanda.
+    """
+    global _manager
+    if _manager is None:
+        _manager = HttpClientManager()
+    return _manager
+
+
+def set_http_manager(manager: HttpClientManager | None) -> None:
+    global _manager
+    _manager = manager
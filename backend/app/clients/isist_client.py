@@ -1,5 +1,5 @@
-import httpx
 from app.core.config import settings
+from app.clients.http import HttpClientManager, get_http_manager
 
 class IsItWaterClient:
     """
@@ -7,18 +7,24 @@ class IsItWaterClient:
     Solo se encarga de obtener los datos crudos desde la API.
     """
 
-    BASE_URL = "https://isitwater-com.p.rapidapi.com/"
-
-    def __init__(self, api_key: str = settings.ISITWATER_API_KEY):
+    def __init__(self, api_key: str | None = None, http: HttpClientManager | None = None,
+                 base_url: str | None = None):
         """
         Inicializa el cliente con la API Key almacenada en el archivo .env.
         """
-        self.api_key = api_key
+        self.api_key = api_key or settings.ISITWATER_API_KEY
+        self._http = http
+        self.base_url = base_url or settings.ISITWATER_BASE_URL
         self.headers = {
             "X-RapidAPI-Key": self.api_key,
             "X-RapidAPI-Host": "isitwater-com.p.rapidapi.com",
         }
 
+    @property
+    def http(self) -> HttpClientManager:
+        """Pool inyectado o, por defecto, el compartido de la aplicación."""
+        return self._http or get_http_manager()
+
     async def fetch_is_water(self, lat: float, lon: float) -> dict:
         """
         Llama al endpoint de IsItWater y devuelve el JSON crudo.
@@ -31,7 +37,6 @@ class IsItWaterClient:
         """
         params = {"latitude": lat, "longitude": lon}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.BASE_URL, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.get(self.base_url, headers=self.headers, params=params, upstream="isitwater")
+        response.raise_for_status()
+        return response.json()
@@ -1,5 +1,20 @@
-import httpx
+import math
+import time
+
+import numpy as np
+
 from app.core.config import settings
+from app.clients.http import HttpClientManager, get_http_manager
+from app.clients.resilience import CLOSED
+from app.core.cache import MISSING, AsyncTTLCache
+from app.core.degraded import mark_degraded
+from app.core.serialization import dumps, loads
+from app.core.shared_state import SharedCache
+from app.domain.neo_feed import parse_feed, records_from_bytes, records_to_bytes
+
+# (encode, decode) de cada tipo de valor para el segundo nivel compartido
+JSON_CODEC = (dumps, loads)
+RECORDS_CODEC = (records_to_bytes, records_from_bytes)
 
 class NasaNeoClient:
     """
@@ -7,37 +22,193 @@ class NasaNeoClient:
     Obtiene datos crudos desde los endpoints oficiales de la NASA.
     """
 
-    BASE_URL = "https://api.nasa.gov/neo/rest/v1"
+    def __init__(self, api_key: str | None = None, http: HttpClientManager | None = None,
+                 base_url: str | None = None):
+        self.api_key = api_key or settings.NASA_API_KEY
+        self._http = http
+        self.base_url = (base_url or settings.NASA_BASE_URL).rstrip("/")
 
-    def __init__(self, api_key: str = settings.NASA_API_KEY):
-        self.api_key = api_key
+    @property
+    def http(self) -> HttpClientManager:
+        """Pool inyectado o, por defecto, el compartido de la aplicación."""
+        return self._http or get_http_manager()
 
-    async def fetch_neo_feed(self, start_date: str, end_date: str) -> dict:
+    async def fetch_neo_feed_raw(self, start_date: str, end_date: str) -> bytes:
         """
-        Obtiene el 'feed' de objetos cercanos a la Tierra en un rango de fechas.
+        Obtiene el 'feed' de objetos cercanos a la Tierra en un rango de fechas,
+        como bytes sin decodificar.
         Endpoint: /feed
         """
-        url = f"{self.BASE_URL}/feed"
+        url = f"{self.base_url}/feed"
         params = {
             "start_date": start_date,
             "end_date": end_date,
             "api_key": self.api_key
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()  # lanza excepción si la respuesta es 4xx o 5xx
-            return response.json()
+        response = await self.http.get(url, params=params, upstream="nasa")
+        response.raise_for_status()  # lanza excepción si la respuesta es 4xx o 5xx
+        return response.content
+
+    async def fetch_neo_feed(self, start_date: str, end_date: str) -> dict:
+        """El /feed decodificado completo."""
+        return loads(await self.fetch_neo_feed_raw(start_date, end_date))
+
+    async def fetch_feed_records(self, start_date: str, end_date: str) -> np.ndarray:
+        """Solo los acercamientos a la Tierra del /feed, como arreglo estructurado (ver neo_feed.feed_dtype)."""
+        return parse_feed(await self.fetch_neo_feed_raw(start_date, end_date))
 
     async def fetch_neo_by_id(self, neo_id: int) -> dict:
         """
         Obtiene los datos de un asteroide específico por su ID.
         Endpoint: /neo/{neo_id}
         """
-        url = f"{self.BASE_URL}/neo/{neo_id}"
+        url = f"{self.base_url}/neo/{neo_id}"
         params = {"api_key": self.api_key}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.get(url, params=params, upstream="nasa")
+        response.raise_for_status()
+        return loads(response.content)
+
+    async def fetch_neo_browse(self, page: int = 0, size: int = 20) -> dict:
+        """
+        Recorre el catálogo completo de NEOs, una página a la vez.
+        Endpoint: /neo/browse (size máximo 20)
+        """
+        url = f"{self.base_url}/neo/browse"
+        params = {"page": page, "size": size, "api_key": self.api_key}
+
+        response = await self.http.get(url, params=params, upstream="nasa")
+        response.raise_for_status()
+        return loads(response.content)
+
+
+class CachedNasaNeoClient:
+    """
+    Caché delante de NasaNeoClient con la misma interfaz.
+    LRU acotado, TTL distinto para /feed y /neo/{id}, carga única por clave
+    ante fallos concurrentes y, opcionalmente, datos vencidos servidos
+    mientras se refrescan en segundo plano.
+
+    Si NASA falla (o su circuito está abierto) y la clave ya se obtuvo antes,
+    se responde con el último valor bueno aunque haya salido de la caché,
+    y la respuesta se marca como degradada. Con el circuito de NASA abierto,
+    o si la última carga de esa clave falló hace menos de BREAKER_RESET_S,
+    ese valor se sirve sin esperar: la carga sigue en segundo plano y nadie
+    queda colgado de ella (las cargas se agrupan por clave, así que un solo
+    intento lento haría esperar a todos).
+
+    Con `shared` (STATE_BACKEND sqlite o redis) cada carga pasa antes por
+    el backend común: con N workers, un dato nuevo se pide a NASA una vez
+    y no N (ver SharedCache).
+    """
+
+    def __init__(
+        self,
+        client: NasaNeoClient | None = None,
+        maxsize: int | None = None,
+        feed_ttl: float | None = None,
+        neo_ttl: float | None = None,
+        stale_ttl: float | None = None,
+        shared: SharedCache | None = None,
+    ):
+        self.client = client or NasaNeoClient()
+        self.shared = shared
+        self.feed_ttl = settings.NASA_FEED_TTL_S if feed_ttl is None else feed_ttl
+        self.neo_ttl = settings.NASA_NEO_TTL_S if neo_ttl is None else neo_ttl
+        self.cache = AsyncTTLCache(
+            maxsize=settings.NASA_CACHE_MAXSIZE if maxsize is None else maxsize,
+            ttl=self.neo_ttl,
+            stale_ttl=settings.NASA_CACHE_STALE_S if stale_ttl is None else stale_ttl,
+        )
+        # Último valor bueno por clave, sin vencimiento; comparte los objetos con `cache`
+        self.last_good = AsyncTTLCache(maxsize=self.cache.maxsize, ttl=math.inf)
+        self.fallbacks = 0
+        # clave -> momento de la última carga fallida que se cubrió con `last_good`
+        self._failed_at: dict[tuple, float] = {}
+
+    def _upstream_down(self, key: tuple) -> bool:
+        failed_at = self._failed_at.get(key)
+        if failed_at is not None and time.monotonic() - failed_at < settings.BREAKER_RESET_S:
+            return True
+        http = getattr(self.client, "http", None)
+        breaker = http.breakers.get("nasa") if http is not None else None
+        return breaker is not None and breaker.state != CLOSED
+
+    def _fallback(self, key: tuple):
+        value = self.last_good.peek(key, MISSING)
+        if value is not MISSING:
+            self.fallbacks += 1
+            mark_degraded("nasa")
+        return value
+
+    def _through_shared(self, key: tuple, loader, ttl: float, codec):
+        if self.shared is None:
+            return loader
+        encode, decode = codec
+        return lambda: self.shared.get_or_load(":".join(map(str, key)), loader, ttl, encode, decode)
+
+    async def _get(self, key: tuple, loader, ttl: float, codec=JSON_CODEC):
+        loader = self._through_shared(key, loader, ttl, codec)
+        if key not in self.cache and self._upstream_down(key):
+            value = self._fallback(key)
+            if value is not MISSING:
+                self.cache.refresh(key, loader, ttl)
+                return value
+        try:
+            value = await self.cache.get_or_load(key, loader, ttl=ttl)
+        except Exception:
+            value = self._fallback(key)
+            if value is MISSING:
+                raise
+            self._failed_at[key] = time.monotonic()
+            return value
+        self._failed_at.pop(key, None)
+        self.last_good.set(key, value)
+        return value
+
+    async def _peek_or_load(self, key: tuple, loader):
+        # Para las ventanas de rangos largos (cache=False): lo que ya está en caché se
+        # reutiliza y lo que se trae no se guarda en ningún nivel ni desplaza otras entradas
+        value = self.cache.peek(key, MISSING)
+        return await loader() if value is MISSING else value
+
+    async def fetch_neo_feed(self, start_date: str, end_date: str, cache: bool = True) -> dict:
+        if not cache:
+            return await self._peek_or_load(("feed", start_date, end_date),
+                                            lambda: self.client.fetch_neo_feed(start_date, end_date))
+        return await self._get(
+            ("feed", start_date, end_date),
+            lambda: self.client.fetch_neo_feed(start_date, end_date),
+            ttl=self.feed_ttl,
+        )
+
+    async def fetch_feed_records(self, start_date: str, end_date: str, cache: bool = True) -> np.ndarray:
+        if not cache:
+            return await self._peek_or_load(("feed_records", start_date, end_date),
+                                            lambda: self.client.fetch_feed_records(start_date, end_date))
+        # Se cachea la proyección compacta, no el JSON: un acierto no vuelve a parsear
+        return await self._get(
+            ("feed_records", start_date, end_date),
+            lambda: self.client.fetch_feed_records(start_date, end_date),
+            ttl=self.feed_ttl,
+            codec=RECORDS_CODEC,
+        )
+
+    async def fetch_neo_by_id(self, neo_id: int) -> dict:
+        return await self._get(
+            ("neo", int(neo_id)),
+            lambda: self.client.fetch_neo_by_id(neo_id),
+            ttl=self.neo_ttl,
+        )
+
+    async def fetch_neo_browse(self, page: int = 0, size: int = 20) -> dict:
+        # El catálogo lo recorre un job en segundo plano; no tiene sentido cachearlo
+        return await self.client.fetch_neo_browse(page, size)
+
+    def stats(self) -> dict:
+        stats = {"size": len(self.cache), "maxsize": self.cache.maxsize, **self.cache.stats.as_dict(),
+                 "last_good": len(self.last_good), "fallbacks": self.fallbacks}
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats.as_dict()
+        return stats
@@ -0,0 +1,131 @@
+"""
+Cortacircuitos, presupuestos de latencia y peticiones "hedged" por
+upstream ("nasa", "isitwater", "usgs"), aplicados por HttpClientManager.
+
+- Presupuesto: una petición lógica, con todos sus reintentos y esperas,
+  no dura más de `budget_s`; al agotarse falla con BudgetExceeded. El
+  timeout de httpx solo acota cada intento.
+- Cortacircuitos: tras `failure_threshold` fallos seguidos (errores de
+  transporte, 429/5xx, presupuesto agotado) el circuito se abre y durante
+  `reset_s` las peticiones fallan al instante con CircuitOpenError, sin
+  ocupar conexiones ni workers. Luego pasa una sola petición de prueba
+  (half-open): si responde se cierra, si no se vuelve a abrir.
+- Hedging: en GET idempotentes, si el intento no respondió en
+  `hedge_after_s` se lanza un segundo en paralelo y se usa el primero que
+  responda bien. Cuesta una petición extra en la cola lenta, así que solo
+  conviene donde no se paga cuota por llamada.
+
+Los servicios atrapan UpstreamUnavailable (o cualquier excepción) y
+responden con su respaldo local; ver app/core/degraded.py.
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from app.core.config import settings
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+
+class UpstreamUnavailable(Exception):
+    """El upstream no respondió dentro de su política (circuito abierto o presupuesto agotado)."""
+
+    def __init__(self, upstream: str, message: str):
+        super().__init__(f"{upstream}: {message}")
+        self.upstream = upstream
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(upstream, f"circuito abierto, reintentar en {retry_after:.1f} s")
+        self.retry_after = retry_after
+
+
+class BudgetExceeded(UpstreamUnavailable):
+    def __init__(self, upstream: str, budget_s: float):
+        super().__init__(upstream, f"sin respuesta en el presupuesto de {budget_s:g} s")
+
+
+@dataclass(frozen=True, slots=True)
+class UpstreamPolicy:
+    budget_s: float | None = None         # None = solo el timeout por intento de httpx
+    hedge_after_s: float | None = None    # None = sin hedging
+    failure_threshold: int = 5            # 0 = sin cortacircuitos
+    reset_s: float = 30.0
+
+    @classmethod
+    def from_settings(cls, upstream: str) -> "UpstreamPolicy":
+        return cls(
+            budget_s=settings.UPSTREAM_BUDGET_S.get(upstream),
+            hedge_after_s=settings.UPSTREAM_HEDGE_AFTER_S.get(upstream),
+            failure_threshold=settings.BREAKER_FAILURES,
+            reset_s=settings.BREAKER_RESET_S,
+        )
+
+
+class CircuitBreaker:
+    """
+    Estado closed → open → half_open de un upstream. Todo ocurre en el event
+    loop, así que no necesita locks.
+    """
+
+    def __init__(self, upstream: str, failure_threshold: int = 5, reset_s: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.upstream = upstream
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self._probing = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def allow(self) -> None:
+        """Lanza CircuitOpenError si la petición no debe salir."""
+        if not self.enabled:
+            return
+        if self.state == OPEN:
+            remaining = self.opened_at + self.reset_s - self.clock()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.upstream, remaining)
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                raise CircuitOpenError(self.upstream, self.reset_s)
+            self._probing = True
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = self.clock()
+            self.opens += 1
+        self._probing = False
+
+    def release(self) -> None:
+        """La petición se canceló sin resultado: libera el turno de prueba."""
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
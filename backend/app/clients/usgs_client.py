@@ -1,28 +1,13 @@
-import requests
 from datetime import datetime
+from app.core.config import settings
+from app.clients.http import HttpClientManager, get_http_manager
 
-def get_earthquake_by_magnitude(min_magnitude: float):
+
+def parse_earthquake(quake: dict) -> dict:
     """
-    Queries the USGS API for the most recent earthquake >= min_magnitude
-    and returns a single earthquake dictionary (or None if not found).
+    Flattens one GeoJSON feature from the FDSN event service
+    into the EarthquakeDetail layout.
     """
-    url = "https://earthquake.usgs.gov/fdsnws/event/1/query"
-    params = {
-        "format": "geojson",
-        "minmagnitude": min_magnitude,
-        "orderby": "time",
-        "limit": 1  # only one result
-    }
-
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    data = response.json()
-
-    features = data.get("features", [])
-    if not features:
-        return None  # no earthquake found
-
-    quake = features[0]
     props = quake.get("properties", {})
     coords = quake.get("geometry", {}).get("coordinates", [None, None, None])
 
@@ -36,3 +21,55 @@ def get_earthquake_by_magnitude(min_magnitude: float):
         "depth_km": coords[2],
         "url": props.get("url")
     }
+
+
+class UsgsClient:
+    """
+    Async client for the USGS FDSN event service.
+    Uses the application-wide HTTP pool, so lookups never block the event loop.
+    """
+
+    def __init__(self, base_url: str | None = None, http: HttpClientManager | None = None):
+        self.base_url = (base_url or settings.USGS_BASE_URL).rstrip("/")
+        self._http = http
+
+    @property
+    def http(self) -> HttpClientManager:
+        return self._http or get_http_manager()
+
+    async def get_earthquake_by_magnitude(self, min_magnitude: float) -> dict | None:
+        """
+        Queries the USGS API for the most recent earthquake >= min_magnitude
+        and returns a single earthquake dictionary (or None if not found).
+        """
+        params = {
+            "format": "geojson",
+            "minmagnitude": min_magnitude,
+            "orderby": "time",
+            "limit": 1  # only one result
+        }
+
+        response = await self.http.get(f"{self.base_url}/query", params=params, upstream="usgs")
+        response.raise_for_status()
+        features = response.json().get("features", [])
+        if not features:
+            return None  # no earthquake found
+        return parse_earthquake(features[0])
+
+    async def fetch_events(self, since_ms: int | None = None, min_magnitude: float = 4.5,
+                           limit: int = 20000) -> dict:
+        """
+        Raw GeoJSON of the events updated after `since_ms` (epoch ms),
+        used to refresh the local catalog incrementally.
+        """
+        params = {
+            "format": "geojson",
+            "minmagnitude": min_magnitude,
+            "orderby": "time-asc",
+            "limit": limit,
+        }
+        if since_ms is not None:
+            params["updatedafter"] = datetime.utcfromtimestamp(since_ms / 1000).isoformat()
+        response = await self.http.get(f"{self.base_url}/query", params=params, upstream="usgs")
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+MISSING = object()
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    refreshes: int = 0
+    load_errors: int = 0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        lookups = self.hits + self.stale_hits + self.misses
+        data["hit_ratio"] = round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        return data
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+
+
+class AsyncTTLCache:
+    """
+    LRU acotado con TTL por entrada, pensado para respuestas de APIs externas.
+
+    - `get_or_load` agrupa las cargas concurrentes de una misma clave
+      (single-flight): N peticiones simultáneas producen una sola llamada.
+    - Con `stale_ttl > 0`, una entrada vencida se sigue sirviendo durante
+      ese margen mientras se refresca en segundo plano.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, stale_ttl: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._data: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry.expires_at > self.clock()
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        now = self.clock()
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = _Entry(value, now + ttl, now + ttl + self.stale_ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def peek(self, key: Hashable, default: Any = None, allow_stale: bool = False) -> Any:
+        """Lee sin contar estadísticas ni alterar el orden LRU."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        now = self.clock()
+        if entry.expires_at > now or (allow_stale and entry.stale_until > now):
+            return entry.value
+        return default
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._lookup(key)
+        if entry is None or entry.expires_at <= self.clock():
+            self.stats.misses += 1
+            return default
+        self.stats.hits += 1
+        return entry.value
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def _lookup(self, key: Hashable) -> _Entry | None:
+        """Devuelve la entrada si aún es utilizable (fresca o stale) y la marca como reciente."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until <= self.clock():
+            del self._data[key]
+            self.stats.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                          ttl: float | None = None) -> Any:
+        entry = self._lookup(key)
+        if entry is not None:
+            if entry.expires_at > self.clock():
+                self.stats.hits += 1
+                return entry.value
+            # Vencida pero dentro del margen stale: se sirve y se refresca aparte
+            self.stats.stale_hits += 1
+            if key not in self._inflight:
+                self.stats.refreshes += 1
+                self._start_load(key, loader, ttl)
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            self.stats.misses += 1
+            task = self._start_load(key, loader, ttl)
+        # shield: si un llamador se cancela, la carga compartida continúa
+        return await asyncio.shield(task)
+
+    def refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float | None = None) -> None:
+        """Recarga en segundo plano, salvo que ya haya una en vuelo para la clave."""
+        if key not in self._inflight:
+            self.stats.refreshes += 1
+            self._start_load(key, loader, ttl)
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float | None) -> asyncio.Task:
+        async def load():
+            try:
+                value = await loader()
+            except Exception:
+                self.stats.load_errors += 1
+                raise
+            finally:
+                self._inflight.pop(key, None)
+            self.set(key, value, ttl)
+            return value
+
+        task = asyncio.create_task(load())
+        # Evita "exception was never retrieved" en refrescos sin nadie esperando
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
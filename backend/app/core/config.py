@@ -1,11 +1,106 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     NASA_API_KEY: str  # obligatorio
     ISITWATER_API_KEY: str  # obligatoria
 
+    # Pool HTTP compartido (app/clients/http.py)
+    HTTP_TIMEOUT_S: float = 10.0
+    HTTP_MAX_RETRIES: int = 3
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_PER_HOST_LIMIT: int = 32
+
+    # Resiliencia por upstream: "nasa", "isitwater", "usgs" (app/clients/resilience.py)
+    UPSTREAM_BUDGET_S: dict[str, float] = {"nasa": 8.0, "isitwater": 3.0, "usgs": 3.0}  # por petición, reintentos incluidos
+    UPSTREAM_HEDGE_AFTER_S: dict[str, float] = {"usgs": 0.75}  # NASA y RapidAPI cobran cuota por llamada
+    BREAKER_FAILURES: int = 5                 # fallos seguidos que abren el circuito; 0 = desactivado
+    BREAKER_RESET_S: float = 30.0             # tiempo abierto antes de la petición de prueba
+
+    USGS_BASE_URL: str = "https://earthquake.usgs.gov/fdsnws/event/1"
+    NASA_BASE_URL: str = "https://api.nasa.gov/neo/rest/v1"
+    ISITWATER_BASE_URL: str = "https://isitwater-com.p.rapidapi.com/"
+
+    # Catálogo local de sismos (app/services/quake_catalog.py)
+    USGS_CATALOG_PATH: str | None = None       # directorio generado con `python -m app.services.quake_catalog`
+    USGS_CATALOG_REFRESH_S: float = 0.0        # 0 = sin refresco desde la API en vivo
+    USGS_CATALOG_MIN_MAGNITUDE: float = 4.5
+
+    # Caché de NASA NEO (app/clients/nasa_client.py)
+    NASA_CACHE_MAXSIZE: int = 512
+    NASA_FEED_TTL_S: float = 900.0       # /feed: 15 min
+    NASA_NEO_TTL_S: float = 21600.0      # /neo/{id}: 6 h, los datos cambian a lo sumo a diario
+    NASA_CACHE_STALE_S: float = 3600.0   # margen para servir datos vencidos mientras se refrescan
+    NASA_MAX_RANGE_DAYS: int = 366        # rango máximo de /nasa/range
+    NASA_RANGE_CONCURRENCY: int = 4       # ventanas de /feed en vuelo a la vez
+    NASA_RANGE_CACHED_WINDOWS: int = 2    # ventanas de un rango que se guardan en caché; el resto va directo a NASA
+
+    # Índice de riesgo sobre /neo/browse (app/services/risk_index.py)
+    RISK_INDEX_ENABLED: bool = False      # consume cuota de la API key: activarlo explícitamente
+    RISK_INDEX_MAX_PAGES: int = 50        # 20 NEOs por página; 0 = catálogo completo
+    RISK_INDEX_REFRESH_S: float = 21600.0
+
+    # Propagación orbital local (app/domain/physics/orbit.py)
+    ORBIT_HORIZON_DAYS: int = 3650        # ventana por defecto para acercamientos futuros
+    ORBIT_STEP_DAYS: float = 1.0          # malla gruesa antes del refinamiento de Newton
+
+    # Caché de agua/tierra por celdas (app/services/water_tiles.py)
+    WATER_TILE_RESOLUTION_DEG: float = 0.01   # ~1.1 km en el ecuador
+    WATER_TILE_CACHE_SIZE: int = 100_000
+    WATER_TILE_DB_PATH: str | None = None     # SQLite para persistir celdas entre reinicios
+    WATER_RASTER_PATH: str | None = None      # ráster .npy generado con build_water_raster; respaldo si la API falla
+    WATER_OFFLINE: bool = False               # responder solo desde el ráster, sin red
+    WATER_BULK_CONCURRENCY: int = 16          # consultas a IsItWater en vuelo por petición de /nasa/input/bulk
+
+    # Observabilidad (app/core/metrics.py, app/core/profiling.py)
+    PROFILING_ENABLED: bool = False           # habilita ?profile=1 / X-Profile: 1
+
+    # Tabla precalculada para /impact/batch con mode="table" (app/domain/physics/lookup.py)
+    IMPACT_TABLE_PATH: str | None = None      # archivo generado con `python -m app.domain.physics.lookup`
+
+    # Barridos de parámetros (app/services/sweep_service.py)
+    SWEEP_WORKERS: int = 0                    # 0 = un proceso por CPU
+
+    # Trabajos en segundo plano (app/services/job_queue.py)
+    JOB_WORKERS: int = 2                      # trabajos en ejecución a la vez
+    JOB_PER_CLIENT: int = 1                   # en ejecución a la vez por cliente
+    JOB_MAX_QUEUED: int = 100                 # más allá se responde 429
+    JOB_MAX_PER_CLIENT: int = 20              # en cola + en ejecución por cliente
+    JOB_RESULT_TTL_S: float = 900.0
+
+    # Estado compartido entre workers: caché de NASA, escenarios, trabajos (app/core/shared_state.py)
+    STATE_BACKEND: str = "memory"             # "memory" (un worker) | "sqlite" (un nodo) | "redis"
+    STATE_SQLITE_PATH: str = "/dev/shm/meteor-state.db"
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Escenarios por sesión (app/services/scenario_store.py)
+    SCENARIO_BACKEND: str | None = None       # None = STATE_BACKEND
+    SCENARIO_TTL_S: float = 3600.0
+    SCENARIO_MAX: int = 10_000                # solo con "memory"; sqlite y redis vencen por TTL
+
+    # Arranque (app/services/container.py)
+    PREWARM: bool = False                     # construir servicios e importar NumPy/física en el lifespan
+
 
     class Config:
         env_file = ".env"   # busca las variables en este archivo
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Settings del proceso; se leen (.env y entorno) en el primer uso."""
+    return Settings()
+
+
+class _LazySettings:
+    """
+    `settings.X` sin leer la configuración al importar: importar la app (o
+    un módulo suelto en un script) no exige las API keys; faltan recién
+    cuando algo las usa, normalmente en el lifespan.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
@@ -0,0 +1,41 @@
+"""
+Marca de respuesta degradada, por petición.
+
+Cuando un servicio responde con un respaldo local en lugar del upstream
+(datos de NASA ya vistos, el ráster de agua, el último sismo conocido)
+llama a `mark_degraded("nasa")`. El middleware de main.py abre un registro
+por petición y lo devuelve en la cabecera X-Degraded; las rutas que lo
+exponen en el cuerpo envuelven su trabajo en `track_degraded()`.
+
+El registro es un set mutable dentro de un ContextVar: las tareas que la
+petición crea (asyncio.gather, single-flight de la caché) heredan el mismo
+set, así que sus marcas llegan a la respuesta.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from app.core.metrics import UPSTREAM_FALLBACKS
+
+_current: ContextVar[set[str] | None] = ContextVar("degraded", default=None)
+
+
+@contextmanager
+def track_degraded() -> Iterator[set[str]]:
+    """Registro propio para un bloque; al salir se suma al de afuera."""
+    parent = _current.get()
+    sources: set[str] = set()
+    token = _current.set(sources)
+    try:
+        yield sources
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            parent |= sources
+
+
+def mark_degraded(upstream: str) -> None:
+    UPSTREAM_FALLBACKS.inc(upstream=upstream)
+    sources = _current.get()
+    if sources is not None:
+        sources.add(upstream)
@@ -0,0 +1,175 @@
+"""
+Métricas en memoria con salida en formato de texto de Prometheus.
+
+Sin dependencias: contadores e histogramas con etiquetas, más
+"collectors" que se evalúan al leer /metrics (p. ej. las estadísticas de
+las cachés). Las rutas síncronas corren en el threadpool, así que cada
+serie se actualiza bajo un lock.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# segundos; cubren desde cálculos de física (µs) hasta APIs externas lentas
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}   # key -> [counts por bucket (+Inf al final), suma]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(counts), total) for k, (counts, total) in self._series.items()]
+        lines = self.header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = _labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        # nombre -> función que devuelve líneas ya formateadas al momento de leer
+        self._collectors: dict[str, Callable[[], list[str]]] = {}
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, name: str, fn: Callable[[], list[str]]) -> None:
+        self._collectors[name] = fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors.values():
+            try:
+                lines.extend(fn())
+            except Exception:
+                continue   # una caché rota no debe tumbar /metrics
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help: str, samples: Iterable[tuple[dict, float]], kind: str = "gauge") -> list[str]:
+    """Serie calculada al vuelo (para collectors)."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        names = tuple(labels)
+        lines.append(f"{name}{_labels(names, tuple(labels[n] for n in names))} {value}")
+    return lines
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Latencia por ruta (hasta enviar las cabeceras).", ("method", "route", "status"))
+UPSTREAM_REQUEST_SECONDS = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Latencia de cada intento contra APIs externas.", ("host", "status"))
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "upstream_retries_total", "Reintentos contra APIs externas.", ("host",))
+UPSTREAM_HEDGES = REGISTRY.counter(
+    "upstream_hedged_requests_total", "Segundos intentos lanzados por hedging.", ("upstream",))
+UPSTREAM_REJECTED = REGISTRY.counter(
+    "upstream_rejected_total", "Peticiones cortadas por circuito abierto o presupuesto agotado.",
+    ("upstream", "reason"))
+UPSTREAM_FALLBACKS = REGISTRY.counter(
+    "upstream_fallbacks_total", "Respuestas servidas con un respaldo local.", ("upstream",))
+PHYSICS_SECONDS = REGISTRY.histogram(
+    "physics_compute_seconds", "Tiempo de cómputo de la física por operación.", ("operation",))
+
+
+def cache_lines(samples: Iterable[tuple[str, dict]]) -> list[str]:
+    """Contadores y tasa de aciertos a partir de CacheStats.as_dict() de cada caché."""
+    samples = list(samples)
+    lines = []
+    for field, help in (("hits", "Aciertos"), ("stale_hits", "Aciertos vencidos servidos"),
+                        ("misses", "Fallos"), ("coalesced", "Cargas agrupadas (single-flight)"),
+                        ("evictions", "Desalojos por LRU")):
+        lines += gauge_lines(f"cache_{field}_total", f"{help} por caché.",
+                             (({"cache": name}, stats.get(field, 0)) for name, stats in samples), kind="counter")
+    lines += gauge_lines("cache_hit_ratio", "Aciertos / consultas por caché.",
+                         (({"cache": name}, stats.get("hit_ratio", 0.0)) for name, stats in samples))
+    return lines
@@ -0,0 +1,67 @@
+"""
+Perfilador por muestreo para una sola petición (`?profile=1`).
+
+Un hilo lee `sys._current_frames()` a intervalos fijos y cuenta cada pila
+en formato "folded" (una línea `marco;marco;marco N` por pila), que
+flamegraph.pl, speedscope o inferno dibujan directamente. Se muestrean
+todos los hilos salvo los que están ociosos esperando trabajo, así que
+con peticiones concurrentes también aparecen las de los demás.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# funciones en las que un hilo del pool está ocioso, no trabajando
+_IDLE = {("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker"), ("_backends/_asyncio.py", "run")}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return any(code.co_filename.endswith(f) and code.co_name == name for f, name in _IDLE)
+
+
+class StackSampler:
+    def __init__(self, interval_s: float = 0.001, max_depth: int = 128):
+        self.interval_s = interval_s
+        self.max_depth = max_depth
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.is_set():
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me or _is_idle(frame):
+                    continue
+                labels = []
+                while frame is not None and len(labels) < self.max_depth:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+            time.sleep(self.interval_s)
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
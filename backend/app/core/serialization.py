@@ -0,0 +1,32 @@
+"""
+JSON rápido con orjson cuando está instalado y la librería estándar si no.
+
+orjson decodifica los /feed de NASA varias veces más rápido que `json` y
+serializa las respuestas sin pasar por str; sin él todo sigue funcionando
+igual, solo más lento.
+"""
+import importlib.util
+import json
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+ORJSON_AVAILABLE = importlib.util.find_spec("orjson") is not None
+
+if ORJSON_AVAILABLE:
+    import orjson
+
+    def loads(data: bytes | bytearray | memoryview | str):
+        return orjson.loads(data)
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    DefaultJSONResponse = ORJSONResponse
+else:
+    def loads(data: bytes | bytearray | memoryview | str):
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    DefaultJSONResponse = JSONResponse
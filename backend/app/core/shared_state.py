@@ -0,0 +1,310 @@
+"""
+Estado compartido entre workers (uvicorn --workers N, gunicorn, réplicas).
+
+Cada worker es un proceso aparte: sin un backend común cada uno tiene su
+propia caché de NASA, sus propios escenarios y sus propios trabajos, y un
+cliente cuya siguiente petición cae en otro worker no encuentra su
+scenario_id ni su job_id. STATE_BACKEND elige dónde vive lo compartido:
+
+  memory   dict en el proceso; un solo worker (el comportamiento de siempre)
+  sqlite   un archivo SQLite en modo WAL que comparten los workers de un
+           nodo; en /dev/shm no toca disco
+  redis    cualquier servidor con el protocolo de Redis (Redis, Valkey,
+           KeyDB, un stand-in local); requiere el paquete opcional `redis`
+
+Los valores son bytes con TTL. `add` (escribir solo si la clave no existe)
+es el lease con el que los workers se reparten el trabajo: SharedCache lo
+usa para que un fallo de caché en N workers produzca una sola llamada al
+upstream.
+"""
+import asyncio
+import logging
+import secrets
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StateBackend(Protocol):
+    shared: bool   # True si otros procesos ven lo que se escribe
+
+    async def get(self, key: str) -> bytes | None: ...
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+    async def add(self, key: str, value: bytes, ttl: float) -> bool: ...
+    async def delete(self, key: str) -> None: ...
+    async def delete_if(self, key: str, value: bytes) -> bool: ...
+    async def aclose(self) -> None: ...
+
+
+class InProcessStateBackend:
+    """
+    Dict del proceso con TTL por entrada; al superar `maxsize` se descartan
+    las entradas más antiguas.
+    """
+
+    shared = False
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self.data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def _live(self, key: str) -> bytes | None:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry[1]
+
+    async def get(self, key: str) -> bytes | None:
+        return self._live(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.data.pop(key, None)  # reinsertar para que quede como la más reciente
+        self.data[key] = (time.monotonic() + ttl, value)
+        if len(self.data) > self.maxsize:
+            self._evict()
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    async def delete_if(self, key: str, value: bytes) -> bool:
+        if self._live(key) != value:
+            return False
+        del self.data[key]
+        return True
+
+    async def aclose(self) -> None:
+        self.data.clear()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self.data.items() if expires_at <= now]:
+            del self.data[key]
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+
+class SqliteStateBackend:
+    """
+    Tabla clave/valor en un archivo SQLite (WAL) compartido por los workers
+    de un mismo nodo. El vencimiento usa la hora del sistema, que todos los
+    procesos comparten. Cada backend tiene su conexión y un hilo propio, así
+    que las esperas por el lock de escritura de SQLite no bloquean el event
+    loop.
+    """
+
+    shared = True
+    PURGE_EVERY = 512   # escrituras entre barridos de entradas vencidas
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="state-sqlite")
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._writes = 0
+
+    async def _run(self, fn: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _get(self, key: str) -> bytes | None:
+        found = self._conn.execute(
+            "SELECT value FROM state WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return None if found is None else found[0]
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl),
+        )
+        self._wrote()
+
+    def _add(self, key: str, value: bytes, ttl: float) -> bool:
+        # Inserta, o reemplaza solo una entrada ya vencida; atómico dentro de SQLite
+        now = time.time()
+        cursor = self._conn.execute(
+            "INSERT INTO state (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE state.expires_at <= ?",
+            (key, value, now + ttl, now),
+        )
+        self._wrote()
+        return cursor.rowcount == 1
+
+    def _delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def _delete_if(self, key: str, value: bytes) -> bool:
+        cursor = self._conn.execute(
+            "DELETE FROM state WHERE key = ? AND value = ? AND expires_at > ?", (key, value, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._conn.execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),))
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._run(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._run(self._set, key, value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return await self._run(self._add, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+    async def delete_if(self, key: str, value: bytes) -> bool:
+        return await self._run(self._delete_if, key, value)
+
+    async def aclose(self) -> None:
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=False)
+
+
+class RedisStateBackend:
+    """
+    Sobre cualquier servidor compatible con el protocolo Redis. `add` es
+    SET NX PX, así que el lease sirve también entre nodos; `delete_if` es
+    un script Lua, atómico en el servidor.
+    """
+
+    shared = True
+    DELETE_IF = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str | None = None):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("STATE_BACKEND=redis requiere el paquete 'redis'") from e
+        self.client = redis.from_url(url or settings.REDIS_URL)
+        self._delete_if = self.client.register_script(self.DELETE_IF)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(await self.client.set(key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+    async def delete_if(self, key: str, value: bytes) -> bool:
+        return bool(await self._delete_if(keys=[key], args=[value]))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def build_state_backend(kind: str | None = None) -> StateBackend:
+    """Elige el backend según STATE_BACKEND ("memory", "sqlite" o "redis")."""
+    kind = kind or settings.STATE_BACKEND
+    if kind == "memory":
+        return InProcessStateBackend()
+    if kind == "sqlite":
+        return SqliteStateBackend(settings.STATE_SQLITE_PATH)
+    if kind == "redis":
+        return RedisStateBackend(settings.REDIS_URL)
+    raise ValueError(f"STATE_BACKEND desconocido: {kind}")
+
+
+@dataclass(slots=True)
+class SharedCacheStats:
+    hits: int = 0          # el valor ya estaba en el backend
+    fills: int = 0         # este worker llamó al upstream y publicó el valor
+    coalesced: int = 0     # otro worker lo llenó mientras este esperaba
+    lease_waits: int = 0   # esperas de `poll_s` por un lease ajeno
+    errors: int = 0        # backend inaccesible: se cargó sin coordinar
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class SharedCache:
+    """
+    Segundo nivel de caché sobre un StateBackend, con llenado agrupado entre
+    workers. Ante un fallo, el worker que obtiene el lease (`add` sobre
+    `lock:<clave>`) llama al upstream y publica el valor; los demás consultan
+    el backend cada `poll_s` hasta que aparece. Si el dueño falla suelta el
+    lease y el siguiente lo toma; si muere, el lease vence a los `lease_s`.
+    El lease guarda un token aleatorio y solo se borra si sigue siendo el
+    propio: un dueño lento cuyo lease ya venció no suelta el del siguiente.
+
+    Dentro de cada worker AsyncTTLCache ya agrupa las cargas por clave, así
+    que esto se ejecuta una vez por worker y no una vez por petición. Un
+    valor leído del backend puede tener hasta un TTL de antigüedad y luego
+    vivir otro TTL en la caché local del worker.
+    """
+
+    def __init__(self, backend: StateBackend, prefix: str, lease_s: float = 10.0, poll_s: float = 0.02):
+        self.backend = backend
+        self.prefix = prefix
+        self.lease_s = lease_s
+        self.poll_s = poll_s
+        self.stats = SharedCacheStats()
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float,
+                          encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]) -> Any:
+        key = self.prefix + key
+        try:
+            raw = await self.backend.get(key)
+        except Exception as e:
+            # Sin backend cada worker carga por su cuenta, como con STATE_BACKEND=memory
+            self.stats.errors += 1
+            logger.warning("Shared state backend unavailable: %s", e)
+            return await loader()
+        if raw is not None:
+            self.stats.hits += 1
+            return decode(raw)
+
+        lock_key = f"lock:{key}"
+        token = secrets.token_bytes(16)
+        deadline = time.monotonic() + self.lease_s
+        while time.monotonic() < deadline:
+            if await self.backend.add(lock_key, token, self.lease_s):
+                try:
+                    # Otro worker pudo publicar y soltar el lease entre el get y el add
+                    raw = await self.backend.get(key)
+                    if raw is not None:
+                        self.stats.coalesced += 1
+                        return decode(raw)
+                    value = await loader()
+                    await self.backend.set(key, encode(value), ttl)
+                finally:
+                    await self.backend.delete_if(lock_key, token)
+                self.stats.fills += 1
+                return value
+            self.stats.lease_waits += 1
+            await asyncio.sleep(self.poll_s)
+            raw = await self.backend.get(key)
+            if raw is not None:
+                self.stats.coalesced += 1
+                return decode(raw)
+        # El dueño no publicó a tiempo: cargar sin coordinar antes que seguir esperando
+        return await loader()
@@ -0,0 +1,116 @@
+"""
+Ruta rápida para los /feed de NASA NEO.
+
+En lugar de recorrer el JSON completo y validar un MeteorListItem por cada
+acercamiento, el feed se proyecta a un arreglo estructurado de NumPy con
+solo los campos que usa la API; el top-k por distancia sale de
+`argpartition` y solo las filas devueltas se convierten en modelos Pydantic.
+"""
+import io
+
+import numpy as np
+
+from app.core.serialization import loads
+from app.domain.schemas import MeteorListItem
+
+
+def feed_dtype(name_len: int = 1, date_len: int = 1) -> np.dtype:
+    """
+    Dtype de las filas del feed. El ancho de los campos de texto sale de los
+    datos: un ancho fijo recortaría en silencio los nombres largos.
+    """
+    return np.dtype([
+        ("id", np.int64),
+        ("name", f"U{max(name_len, 1)}"),
+        ("diameter_km", np.float64),          # promedio de min/max, sin redondear
+        ("is_potentially_hazardous", np.bool_),
+        ("close_approach_date_full", f"U{max(date_len, 1)}"),
+        ("velocity_km_s", np.float64),
+        ("miss_distance_km", np.float64),
+    ])
+
+
+def _parse_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _floats(values: tuple) -> np.ndarray:
+    """Cadenas numéricas de NASA a float64; un valor inválido vale 0.0, como antes."""
+    try:
+        return np.fromiter(map(float, values), np.float64, len(values))
+    except (TypeError, ValueError):
+        return np.fromiter(map(_parse_float, values), np.float64, len(values))
+
+
+def parse_feed(data: bytes | str | dict) -> np.ndarray:
+    """Acercamientos a la Tierra de un /feed (bytes crudos o ya decodificado), en orden del feed."""
+    if not isinstance(data, dict):
+        data = loads(data)
+    rows = [
+        (asteroid["id"], asteroid["name"], asteroid["estimated_diameter"]["kilometers"],
+         asteroid["is_potentially_hazardous_asteroid"], approach.get("close_approach_date_full", ""),
+         approach["relative_velocity"]["kilometers_per_second"], approach["miss_distance"]["kilometers"])
+        for asteroids in data.get("near_earth_objects", {}).values()
+        for asteroid in asteroids
+        for approach in asteroid.get("close_approach_data", ())
+        if approach.get("orbiting_body") == "Earth"
+    ]
+    if not rows:
+        return np.empty(0, dtype=feed_dtype())
+    ids, names, diameters, hazardous, dates, velocities, misses = zip(*rows)
+    records = np.empty(len(rows), dtype=feed_dtype(max(map(len, names)), max(map(len, dates))))
+    records["id"] = np.fromiter(map(int, ids), np.int64, len(ids))
+    records["name"] = names
+    records["diameter_km"] = [(d["estimated_diameter_min"] + d["estimated_diameter_max"]) / 2 for d in diameters]
+    records["is_potentially_hazardous"] = hazardous
+    records["close_approach_date_full"] = dates
+    records["velocity_km_s"] = _floats(velocities)
+    records["miss_distance_km"] = _floats(misses)
+    return records
+
+
+def records_to_bytes(records: np.ndarray) -> bytes:
+    """Serializa las filas junto con su dtype (el ancho de los textos varía por feed)."""
+    buffer = io.BytesIO()
+    np.save(buffer, records, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def records_from_bytes(raw: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(raw), allow_pickle=False)
+
+
+def top_k(records: np.ndarray, k: int) -> np.ndarray:
+    """
+    Las `k` filas con menor miss_distance_km, ordenadas. Los empates se
+    resuelven por posición en el arreglo (igual que heapq.nsmallest).
+    """
+    miss = records["miss_distance_km"]
+    if k <= 0:
+        return records[:0]
+    if k >= miss.size:
+        return records[np.argsort(miss, kind="stable")]
+    part = np.argpartition(miss, k - 1)[:k]
+    # argpartition no es estable: se toman todas las filas hasta la k-ésima distancia
+    # y se ordenan de forma estable para que los empates del borde sean deterministas
+    candidates = np.flatnonzero(miss <= miss[part].max())
+    order = np.argsort(miss[candidates], kind="stable")[:k]
+    return records[candidates[order]]
+
+
+def to_items(records: np.ndarray) -> list[MeteorListItem]:
+    return [
+        MeteorListItem(
+            id=neo_id,
+            name=name,
+            estimated_diameter_km=round(diameter, 3),
+            is_potentially_hazardous=hazardous,
+            close_approach_date_full=date_full,
+            velocity_km_s=velocity,
+            miss_distance_km=miss,
+        )
+        for neo_id, name, diameter, hazardous, date_full, velocity, miss in records.tolist()
+    ]
@@ -0,0 +1,100 @@
+"""
+Vectorized version of the formulas in impact.py.
+
+Every function takes NumPy arrays (or anything np.asarray accepts) and
+evaluates all scenarios at once; the scalar branches of impact.py
+(diameter > 1 km, simple vs complex crater) become np.where masks.
+"""
+import numpy as np
+from dataclasses import dataclass
+
+from app.domain.physics.impact import (
+    PI, density, dragC, escapeVelocity, gravity, scaleH, seaDensity,
+    targetDensity, waterDensity,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ImpactBatchResult:
+    """Arrays of derived quantities, one element per scenario (km, km/s, J)."""
+    kineticEnergy: np.ndarray
+    energyInMegaTons: np.ndarray
+    impactVelocity: np.ndarray
+    transientCraterDiameter: np.ndarray
+    finalCraterDiameter: np.ndarray
+    finalCraterDepth: np.ndarray
+    seismicMagnitude: np.ndarray
+
+    def __len__(self) -> int:
+        return self.kineticEnergy.shape[0]
+
+
+def entryVelocity(relativeVelocity):
+    return np.sqrt(escapeVelocity**2 + np.square(relativeVelocity))
+
+def kineticEnergy(diameter, entryVelocity, density=density):
+    return (PI/12) * (density * 1e15) * np.power(diameter, 3) * np.square(entryVelocity)
+
+def energyInMegaTons(kineticEnergy):
+    return kineticEnergy / 4.18e15
+
+def ballisticCoefficient(diameter, density=density, dragC=dragC):
+    return (density * diameter) / (dragC * seaDensity * scaleH)
+
+def impactVelocity(diameter, entryVelocity, density=density, dragC=dragC, sinAngle=1.0):
+    # an oblique entry crosses 1/sin(angle) times more atmosphere
+    b = ballisticCoefficient(diameter, density, dragC)
+    slowed = entryVelocity * np.exp(-1 / (b * sinAngle))
+    return np.where(diameter > 1, entryVelocity, slowed)
+
+def transientCraterDiameter(diameter, impactVelocity, density=density, targetDensity=targetDensity, sinAngle=1.0):
+    # sin(angle)^(1/3) is the oblique-impact correction; 1 for vertical impacts
+    return (1.161 * np.cbrt(density / targetDensity * sinAngle) * np.power(diameter, 0.78)
+            * np.power(impactVelocity, 0.44) * gravity**-0.22)
+
+def finalCraterDiameter(transientCraterDiameter):
+    return 1.25 * transientCraterDiameter
+
+def finalCraterDepthKm(finalCraterDiameter):
+    # simple craters (< 4 km) are ~20% deep, complex ones ~12%
+    return np.where(finalCraterDiameter < 4.0, 0.20, 0.12) * finalCraterDiameter
+
+def seismicEffect(kineticEnergy):
+    return 0.67 * np.log10(kineticEnergy) - 5.87
+
+
+def resolveTargetDensity(isTargetWater):
+    return np.where(np.asarray(isTargetWater, dtype=bool), waterDensity, targetDensity)
+
+
+def simulate_impact_batch(diameter, relativeVelocity, isTargetWater=False,
+                          density=density, dragC=dragC, targetDensity=None,
+                          entryAngle=90.0) -> ImpactBatchResult:
+    """
+    Batch counterpart of impact.simulate_impact.
+    Scalars broadcast against arrays, so a single velocity or water flag
+    can be combined with many diameters. entryAngle is measured from the
+    horizontal in degrees; the default (vertical) reproduces impact.py.
+    """
+    D = np.atleast_1d(np.asarray(diameter, dtype=np.float64))
+    V = np.atleast_1d(np.asarray(relativeVelocity, dtype=np.float64))
+    if targetDensity is None:
+        targetDensity = resolveTargetDensity(isTargetWater)
+    D, V, rho, rho_t, cd, angle = np.broadcast_arrays(D, V, density, targetDensity, dragC, entryAngle)
+    sinAngle = np.sin(np.radians(angle))
+
+    Ve = entryVelocity(V)
+    E = kineticEnergy(D, Ve, rho)
+    Vi = impactVelocity(D, Ve, rho, cd, sinAngle)
+    Dt = transientCraterDiameter(D, Vi, rho, rho_t, sinAngle)
+    Df = finalCraterDiameter(Dt)
+
+    return ImpactBatchResult(
+        kineticEnergy=E,
+        energyInMegaTons=energyInMegaTons(E),
+        impactVelocity=Vi,
+        transientCraterDiameter=Dt,
+        finalCraterDiameter=Df,
+        finalCraterDepth=finalCraterDepthKm(Df),
+        seismicMagnitude=seismicEffect(E),
+    )
@@ -0,0 +1,170 @@
+"""
+Impact effects beyond the crater: fireball, thermal radiation, airblast
+and (for water targets) tsunami, following Collins, Melosh & Marcus (2005),
+"Earth Impact Effects Program". Every function accepts NumPy arrays of
+distances so the same code serves radii inversion and map rasters.
+
+Units: energy in J, distances in km unless noted.
+"""
+import numpy as np
+from dataclasses import dataclass
+
+from app.domain.physics.impact import ImpactResult
+
+EARTH_RADIUS_KM = 6371.0
+luminousEfficiency = 3e-3        # fraction of impact energy radiated as heat
+JOULES_PER_KT = 4.184e12
+JOULES_PER_MT = 4.184e15
+oceanDepth = 3.682               # km, mean ocean depth used for water impacts
+
+# Distances on which monotone effects are sampled to invert them into radii
+_RADII_GRID_KM = np.geomspace(1e-3, np.pi * EARTH_RADIUS_KM, 4096)
+
+
+@dataclass(frozen=True, slots=True)
+class EffectZone:
+    effect: str          # "crater" | "fireball" | "thermal" | "airblast" | "tsunami"
+    label: str
+    threshold: float     # in `unit`
+    unit: str
+    radius: float        # km
+    severity: int        # higher is worse; used to quantize damage rasters
+
+
+# Fireball
+def fireballRadius(kineticEnergy):
+    return 0.002 * np.cbrt(kineticEnergy) / 1000   # m → km
+
+# Thermal radiation
+def thermalExposure(kineticEnergy, distance):
+    """
+    Radiant energy per unit area (J/m^2) at `distance` km from ground zero,
+    reduced by the fraction of the fireball hidden below the horizon.
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    Rf = fireballRadius(kineticEnergy)
+    h = (1 - np.cos(distance / EARTH_RADIUS_KM)) * EARTH_RADIUS_KM
+    ratio = np.clip(h / Rf, 0.0, 1.0)
+    delta = np.arccos(ratio)
+    visible = (2 / np.pi) * (delta - ratio * np.sin(delta))
+    r_m = np.maximum(distance, 1e-6) * 1000
+    return visible * luminousEfficiency * kineticEnergy / (2 * np.pi * r_m**2)
+
+def thermalThreshold(kineticEnergy, exposure1Mt):
+    """Ignition/burn thresholds grow as E^(1/6) because longer pulses dissipate more heat."""
+    return exposure1Mt * (kineticEnergy / JOULES_PER_MT) ** (1 / 6)
+
+# Airblast
+def peakOverpressure(kineticEnergy, distance):
+    """Peak overpressure (Pa) for a surface burst, scaled from a 1 kt reference."""
+    r1 = np.maximum(np.asarray(distance, dtype=np.float64), 1e-6) * 1000 / np.cbrt(kineticEnergy / JOULES_PER_KT)
+    px, rx = 75_000.0, 290.0
+    return (px * rx / (4 * r1)) * (1 + 3 * (rx / r1) ** 1.3)
+
+# Tsunami
+def tsunamiAmplitude(transientCraterDiameter, distance, waterDepth=oceanDepth):
+    """
+    Rim-wave amplitude (m) at `distance` km. The wave forms at 3/4 of the
+    transient cavity with height min(Dtc/14.1, depth) and decays as 1/r.
+    """
+    rimRadius = 0.75 * transientCraterDiameter
+    rimAmplitude = np.minimum(transientCraterDiameter / 14.1, waterDepth) * 1000   # km → m
+    distance = np.asarray(distance, dtype=np.float64)
+    return np.where(distance <= rimRadius, rimAmplitude,
+                    rimAmplitude * rimRadius / np.maximum(distance, 1e-9))
+
+
+def _radius_where(profile, threshold: float) -> float:
+    """Distance at which a decreasing profile falls to `threshold` (0 if never reached)."""
+    values = profile(_RADII_GRID_KM)
+    if values[0] < threshold:
+        return 0.0
+    if values[-1] >= threshold:
+        return float(_RADII_GRID_KM[-1])
+    # np.interp wants increasing x; the profile decreases with distance
+    return float(np.interp(-threshold, -values, _RADII_GRID_KM))
+
+
+# (label, threshold, unit, severity)
+OVERPRESSURE_ZONES = (
+    ("Window breakage (1 psi)", 6_900.0, "Pa", 1),
+    ("Residential collapse (5 psi)", 34_500.0, "Pa", 3),
+    ("Reinforced buildings destroyed (20 psi)", 138_000.0, "Pa", 5),
+)
+THERMAL_ZONES = (  # thresholds for a 1 Mt event
+    ("First-degree burns", 1.3e5, "J/m^2", 1),
+    ("Second-degree burns", 2.5e5, "J/m^2", 2),
+    ("Third-degree burns", 4.2e5, "J/m^2", 4),
+    ("Clothing ignites", 1.0e6, "J/m^2", 5),
+)
+TSUNAMI_ZONES = (
+    ("Wave above 1 m", 1.0, "m", 1),
+    ("Wave above 10 m", 10.0, "m", 4),
+)
+
+
+def effect_zones(result: ImpactResult, waterDepth: float = oceanDepth) -> list[EffectZone]:
+    """Damage radii for every effect of one simulated impact."""
+    E = result.kineticEnergy
+    zones = [
+        EffectZone("crater", "Final crater", 0.0, "km", result.finalCraterDiameter / 2, 7),
+        EffectZone("fireball", "Fireball", 0.0, "km", float(fireballRadius(E)), 6),
+    ]
+    for label, threshold, unit, severity in OVERPRESSURE_ZONES:
+        radius = _radius_where(lambda r: peakOverpressure(E, r), threshold)
+        zones.append(EffectZone("airblast", label, threshold, unit, radius, severity))
+    for label, threshold1Mt, unit, severity in THERMAL_ZONES:
+        threshold = float(thermalThreshold(E, threshold1Mt))
+        radius = _radius_where(lambda r: thermalExposure(E, r), threshold)
+        zones.append(EffectZone("thermal", label, threshold, unit, radius, severity))
+    if result.scenario.isTargetWater:
+        Dtc = result.transientCraterDiameter
+        for label, threshold, unit, severity in TSUNAMI_ZONES:
+            radius = _radius_where(lambda r: tsunamiAmplitude(Dtc, r, waterDepth), threshold)
+            zones.append(EffectZone("tsunami", label, threshold, unit, radius, severity))
+    return zones
+
+
+def great_circle_km(lat0, lon0, lat, lon):
+    """Haversine distance (km), broadcasting over array inputs (degrees)."""
+    phi0, phi = np.radians(lat0), np.radians(lat)
+    dphi = phi - phi0
+    dlmb = np.radians(np.asarray(lon) - lon0)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi0) * np.cos(phi) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+@dataclass(frozen=True, slots=True)
+class DamageRaster:
+    levels: np.ndarray      # uint8 (rows, cols); row 0 is the northern edge
+    latMin: float
+    latMax: float
+    lonMin: float
+    lonMax: float
+
+
+def damage_raster(lat0: float, lon0: float, zones: list[EffectZone],
+                  halfWidth: float | None = None, size: int = 128) -> DamageRaster:
+    """
+    Quantizes the zones onto a size×size lat/lon grid centred on the impact.
+    Each cell holds the highest severity whose radius reaches it (0 = none),
+    found with one searchsorted over the sorted radii.
+    """
+    if halfWidth is None:
+        halfWidth = max((z.radius for z in zones), default=1.0) * 1.1
+    dlat = np.degrees(halfWidth / EARTH_RADIUS_KM)
+    dlon = dlat / max(np.cos(np.radians(lat0)), 1e-6)
+    latMin, latMax = max(lat0 - dlat, -90.0), min(lat0 + dlat, 90.0)
+    lonMin, lonMax = lon0 - min(dlon, 180.0), lon0 + min(dlon, 180.0)
+
+    lats = np.linspace(latMax, latMin, size)[:, None]
+    lons = np.linspace(lonMin, lonMax, size)[None, :]
+    distance = great_circle_km(lat0, lon0, lats, lons)
+
+    ordered = sorted(zones, key=lambda z: z.radius)
+    radii = np.array([z.radius for z in ordered])
+    # highest severity among zones whose radius is >= radii[i]
+    reach = np.maximum.accumulate(np.array([z.severity for z in ordered] + [0])[::-1])[::-1]
+    levels = reach[np.searchsorted(radii, distance, side="left")].astype(np.uint8)
+
+    return DamageRaster(levels, float(latMin), float(latMax), float(lonMin), float(lonMax))
@@ -1,6 +1,7 @@
 import numpy as np
 import math
 import json
+from dataclasses import dataclass
 from pathlib import Path
 
 density = 3000        # density (kg/m^3), average meteor density
@@ -12,80 +13,160 @@ scaleH = 8            # Km
 eulerConstant = math.e  # Euler’s number
 gravity = 9.81 * (10**-3)  # km/s^2
 targetDensity = 2500  # sedimentary rock density
+waterDensity = 1000   # target density when the impact is on water
 
 CONFIG_PATH = Path(__file__).with_name("config.json")
-if not CONFIG_PATH.exists():
-    raise FileNotFoundError(f"config.json not found at {CONFIG_PATH.resolve()}\n(cwd={Path.cwd()})")
 
-with CONFIG_PATH.open("r") as f:
-    config = json.load(f)
 
-relativeVelocity = config.get("relativeVelocity")  # km/s
-diameter = config.get("diameter")                  # km
-isTargetWater = config.get("water")
+@dataclass(frozen=True, slots=True)
+class ImpactScenario:
+    """
+    Inputs of a single impact simulation.
+    Everything the formulas need travels with the scenario, so two
+    scenarios can be evaluated side by side without shared state.
+    """
+    diameter: float                      # km
+    relativeVelocity: float              # km/s
+    isTargetWater: bool = False
+    density: float = density             # kg/m^3
+    targetDensity: float | None = None   # kg/m^3, derived from isTargetWater when None
+    dragC: float = dragC
+
+    @property
+    def resolvedTargetDensity(self) -> float:
+        if self.targetDensity is not None:
+            return self.targetDensity
+        return waterDensity if self.isTargetWater else targetDensity
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ImpactScenario":
+        """
+        Builds a scenario from the config.json layout
+        ({"relativeVelocity": km/s, "diameter": km, "water": 0/1}).
+        """
+        return cls(
+            diameter=float(config["diameter"]),
+            relativeVelocity=float(config["relativeVelocity"]),
+            isTargetWater=bool(config.get("water", 0)),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ImpactResult:
+    """Every quantity derived from an ImpactScenario (km, km/s, J)."""
+    scenario: ImpactScenario
+    mass: float
+    entryVelocity: float
+    kineticEnergy: float
+    energyInMegaTons: float
+    impactVelocity: float
+    transientCraterDiameter: float
+    finalCraterDiameter: float
+    transientCraterDepth: float
+    finalCraterDepth: float
+    seismicMagnitude: float
+
+
+def load_scenario(path: Path | None = None) -> ImpactScenario:
+    """
+    Reads a scenario from config.json. Kept for callers that still
+    persist their input to disk; the engine itself never touches files.
+    """
+    target = path or CONFIG_PATH
+    if not target.exists():
+        raise FileNotFoundError(f"config.json not found at {target.resolve()}\n(cwd={Path.cwd()})")
+    with target.open("r") as f:
+        return ImpactScenario.from_config(json.load(f))
+
 
+# Mass / entry
+def meteorMass(diameter, density=density):
+    return (PI / 6) * (density ) * (1000*diameter**3)
 
-if isTargetWater==1:
-    targetDensity=1000
-else:
-    targetDensity=2500
-# Calculated constants
-mass = (PI / 6) * (density ) * (1000*diameter**3) 
-entryVelocity = math.sqrt((escapeVelocity**2) + (relativeVelocity)**2)
+def entryVelocity(relativeVelocity):
+    return math.sqrt((escapeVelocity**2) + (relativeVelocity)**2)
 
 # Energy formulas
-def kineticEnergy():
+def kineticEnergy(diameter, entryVelocity, density=density):
     E = (PI/12) * (density * 10**15) * (diameter**3) * (entryVelocity**2)
     return E
 
-def energyInMegaTons():
-    E = kineticEnergy()
-    megatons = E / (4.18 * (10**15))
+def energyInMegaTons(kineticEnergy):
+    megatons = kineticEnergy / (4.18 * (10**15))
     return megatons
 
 # Impact velocity formulas
-def ballisticCoefficient():
+def ballisticCoefficient(diameter, density=density, dragC=dragC):
     B = (density * diameter) / (dragC * seaDensity * scaleH)
     return B
 
-def impactVelocity():
-    b = ballisticCoefficient()
+def impactVelocity(diameter, entryVelocity, density=density, dragC=dragC):
     if(diameter>1):
         return entryVelocity
+    b = ballisticCoefficient(diameter, density, dragC)
     return entryVelocity * (eulerConstant ** (-1 / b))  # kms/s
 
 # Crater formulas
-def transientCraterDiameter():
-    Vi = impactVelocity()
-    ct = 1.161 * ((density / targetDensity)**(1/3)) * (diameter**0.78) * (Vi**0.44) * (gravity**-0.22)
+def transientCraterDiameter(diameter, impactVelocity, density=density, targetDensity=targetDensity):
+    ct = 1.161 * ((density / targetDensity)**(1/3)) * (diameter**0.78) * (impactVelocity**0.44) * (gravity**-0.22)
     return ct
 
-def finalCraterDiameter():
-    return 1.25 * transientCraterDiameter()
+def finalCraterDiameter(transientCraterDiameter):
+    return 1.25 * transientCraterDiameter
 
-def transientCreaterDepth():
-    return transientCraterDiameter()/2
+def transientCreaterDepth(transientCraterDiameter):
+    return transientCraterDiameter/2
 
 
-def finalCraterDepthKm():
+def finalCraterDepthKm(finalCraterDiameter):
     """
     Returns an estimate of the FINAL crater depth (rim-to-floor, in km).
     Uses a simple/complex split:
       - simple (< ~4 km final D): depth ≈ 20% of final diameter
       - complex (≥ ~4 km):        depth ≈ 12% of final diameter
     """
-    Df = finalCraterDiameter()
+    Df = finalCraterDiameter
     if Df < 4.0:
         return 0.20 * Df
     else:
-        return 0.12 * Df    
+        return 0.12 * Df
 
 # Earthquake formulas
-def seismicEffect():
-    return 0.67 * math.log10(kineticEnergy()) - 5.87
+def seismicEffect(kineticEnergy):
+    return 0.67 * math.log10(kineticEnergy) - 5.87
 
 
- #fireBall
+ #fireBall (m); thermal, airblast and tsunami models live in effects.py
 
-def thermalRadius():
-    0.002*(kineticEnergy**(1/3))   
+def thermalRadius(kineticEnergy):
+    return 0.002*(kineticEnergy**(1/3))
+
+
+def simulate_impact(scenario: ImpactScenario) -> ImpactResult:
+    """
+    Evaluates every formula for one scenario in a single pass.
+    Shared intermediates (entry velocity, kinetic energy, transient crater)
+    are computed once and reused by the formulas that depend on them.
+    """
+    rho = scenario.density
+    D = scenario.diameter
+
+    Ve = entryVelocity(scenario.relativeVelocity)
+    E = kineticEnergy(D, Ve, rho)
+    Vi = impactVelocity(D, Ve, rho, scenario.dragC)
+    Dt = transientCraterDiameter(D, Vi, rho, scenario.resolvedTargetDensity)
+    Df = finalCraterDiameter(Dt)
+
+    return ImpactResult(
+        scenario=scenario,
+        mass=meteorMass(D, rho),
+        entryVelocity=Ve,
+        kineticEnergy=E,
+        energyInMegaTons=energyInMegaTons(E),
+        impactVelocity=Vi,
+        transientCraterDiameter=Dt,
+        finalCraterDiameter=Df,
+        transientCraterDepth=transientCreaterDepth(Dt),
+        finalCraterDepth=finalCraterDepthKm(Df),
+        seismicMagnitude=seismicEffect(E),
+    )
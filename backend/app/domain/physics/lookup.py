@@ -0,0 +1,264 @@
+"""
+Precomputed impact tables for interactive use (sliders re-evaluating the
+same small domain thousands of times).
+
+A table is a dense grid over log10(diameter) x relative velocity x target
+type, with every output stored in the space where it is closest to linear:
+log10 of energy (MT), impact velocity and final crater diameter, and the
+seismic magnitude as is. Queries are answered by vectorized bilinear
+interpolation over diameter and velocity; the target type is exact (one
+layer per type). Crater depth is not interpolated: it is derived from the
+interpolated final diameter with the exact simple/complex split of
+impact.finalCraterDepthKm, which a grid cell would otherwise smear.
+
+Files are a single versioned binary: magic, format version and header
+length, a JSON header (axes, columns, error bounds, source fingerprint),
+then the float32 grid in C order (target, diameter, velocity, column),
+aligned so `np.memmap` maps it directly. Every worker process maps the same
+file and shares its pages through the OS page cache.
+
+The error bound stored in the header is measured when the table is built,
+against simulate_impact_batch (the vectorized impact.py formulas), at every
+cell centre and edge midpoint plus random points. It is the largest error
+seen, not a proof: relative for energy, velocity, diameter and depth,
+absolute (magnitude units) for the seismic magnitude. A final diameter
+within that error of the 4 km simple/complex threshold can land on the
+other side of it, and then its depth is off by the 0.20/0.12 ratio.
+
+    cd backend
+    python -m app.domain.physics.lookup impact.lut --diameters 2048 --velocities 256
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.domain.physics import batch, impact
+
+MAGIC = b"MMLUT\0"
+FORMAT_VERSION = 1
+# magic, format version (u16), JSON header length (u32), little-endian
+PREAMBLE = struct.Struct("<6sHI")
+ALIGN = 64
+
+# stored columns, in grid order; the flag marks log10-stored columns (kept first: see _lookup)
+COLUMNS = (("energyInMegaTons", True), ("impactVelocity", True),
+           ("finalCraterDiameter", True), ("seismicMagnitude", False))
+# what the error bound covers (depth comes from the exact split on the diameter)
+ERROR_COLUMNS = ("energyInMegaTons", "impactVelocity", "finalCraterDiameter", "finalCraterDepth", "seismicMagnitude")
+TARGETS = (False, True)     # rock, water
+
+
+def sourceFingerprint() -> str:
+    """Hash of the formulas the table was built from; a stale table refuses to open."""
+    source = inspect.getsource(batch) + inspect.getsource(impact)
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+@dataclass(frozen=True, slots=True)
+class TableAxes:
+    logDiameterMin: float      # log10(km)
+    logDiameterMax: float
+    diameterCount: int
+    velocityMin: float         # km/s, relative velocity
+    velocityMax: float
+    velocityCount: int
+
+    @property
+    def logDiameterStep(self) -> float:
+        return (self.logDiameterMax - self.logDiameterMin) / (self.diameterCount - 1)
+
+    @property
+    def velocityStep(self) -> float:
+        return (self.velocityMax - self.velocityMin) / (self.velocityCount - 1)
+
+    def diameters(self) -> np.ndarray:
+        return np.logspace(self.logDiameterMin, self.logDiameterMax, self.diameterCount)
+
+    def velocities(self) -> np.ndarray:
+        return np.linspace(self.velocityMin, self.velocityMax, self.velocityCount)
+
+
+def _stored(result: batch.ImpactBatchResult) -> np.ndarray:
+    """(..., len(COLUMNS)) array of the stored representation."""
+    return np.stack([np.log10(getattr(result, name)) if log else getattr(result, name)
+                     for name, log in COLUMNS], axis=-1)
+
+
+def _errors(approx: batch.ImpactBatchResult, exact: batch.ImpactBatchResult) -> dict[str, float]:
+    out = {}
+    for name in ERROR_COLUMNS:
+        a, e = getattr(approx, name), getattr(exact, name)
+        err = np.abs(a - e) if name == "seismicMagnitude" else np.abs(a - e) / np.abs(e)
+        out[name] = float(err.max(initial=0.0))
+    return out
+
+
+class ImpactTable:
+    """Grid plus axes; compute() builds one in memory, save() writes it and open() maps it."""
+
+    def __init__(self, axes: TableAxes, grid: np.ndarray, errorBound: dict[str, float] | None = None,
+                 path: Path | None = None):
+        self.axes = axes
+        self.grid = grid                       # (len(TARGETS), diameterCount, velocityCount, len(COLUMNS))
+        self.errorBound = errorBound or {}
+        self.path = path
+
+    @property
+    def nbytes(self) -> int:
+        return self.grid.nbytes
+
+    # ---------- construcción ----------
+    @classmethod
+    def compute(cls, axes: TableAxes) -> "ImpactTable":
+        D, V = np.meshgrid(axes.diameters(), axes.velocities(), indexing="ij")
+        layers = [_stored(batch.simulate_impact_batch(D, V, water)) for water in TARGETS]
+        table = cls(axes, np.ascontiguousarray(np.stack(layers), dtype=np.float32))
+        return table.withErrorBound()
+
+    def withErrorBound(self, samples: int = 200_000, seed: int = 0) -> "ImpactTable":
+        """Measures the interpolation error against the exact formulas (see module docstring)."""
+        a = self.axes
+        logD = a.logDiameterMin + a.logDiameterStep * np.arange(a.diameterCount)
+        V = a.velocities()
+        midD, midV = (logD[:-1] + logD[1:]) / 2, (V[:-1] + V[1:]) / 2
+        rng = np.random.default_rng(seed)
+        points = [np.meshgrid(midD, midV, indexing="ij"),        # cell centres
+                  np.meshgrid(midD, V, indexing="ij"),           # edge midpoints
+                  np.meshgrid(logD, midV, indexing="ij"),
+                  (rng.uniform(a.logDiameterMin, a.logDiameterMax, samples),
+                   rng.uniform(a.velocityMin, a.velocityMax, samples))]
+        bound = dict.fromkeys(ERROR_COLUMNS, 0.0)
+        for water in TARGETS:
+            for logDs, Vs in points:
+                d, v = 10 ** logDs.ravel(), Vs.ravel()
+                errors = _errors(self.interpolate(d, v, water), batch.simulate_impact_batch(d, v, water))
+                bound = {k: max(bound[k], errors[k]) for k in bound}
+        return ImpactTable(self.axes, self.grid, bound, self.path)
+
+    # ---------- disco ----------
+    def save(self, path: str | Path) -> Path:
+        """Writes to a temporary file and renames it: mapped readers keep the old inode."""
+        path = Path(path)
+        header = json.dumps({
+            "axes": {f: getattr(self.axes, f) for f in TableAxes.__slots__},
+            "columns": [name for name, _ in COLUMNS],
+            "log10": [log for _, log in COLUMNS],
+            "targets": ["rock", "water"],
+            "dtype": "<f4",
+            "shape": list(self.grid.shape),
+            "errorBound": self.errorBound,
+            "source": sourceFingerprint(),
+        }).encode()
+        offset = -(-(PREAMBLE.size + len(header)) // ALIGN) * ALIGN
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, offset - PREAMBLE.size))
+            f.write(header.ljust(offset - PREAMBLE.size, b" "))
+            f.write(self.grid.astype("<f4", copy=False).tobytes())
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def open(cls, path: str | Path) -> "ImpactTable":
+        """Maps a table file; ValueError when it is not a table, another format version or stale."""
+        path = Path(path)
+        with open(path, "rb") as f:
+            magic, version, length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not an impact table")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{path}: table format {version}, expected {FORMAT_VERSION}")
+            header = json.loads(f.read(length))
+        if header["source"] != sourceFingerprint():
+            raise ValueError(f"{path} was built from different formulas; rebuild it")
+        grid = np.memmap(path, dtype=header["dtype"], mode="r", offset=PREAMBLE.size + length,
+                         shape=tuple(header["shape"]))
+        # plain ndarray view of the map: same pages, without np.memmap subclass overhead
+        return cls(TableAxes(**header["axes"]), np.asarray(grid), header["errorBound"], path)
+
+    # ---------- consultas ----------
+    def _lookup(self, D: np.ndarray, V: np.ndarray, W: np.ndarray) -> tuple[batch.ImpactBatchResult, np.ndarray]:
+        """Interpolated result and the in-domain mask, for 1-d float64/bool inputs."""
+        a = self.axes
+        nD, nV = a.diameterCount, a.velocityCount
+        x = (np.log10(D) - a.logDiameterMin) / a.logDiameterStep
+        y = (V - a.velocityMin) / a.velocityStep
+        inside = (x >= 0) & (x <= nD - 1) & (y >= 0) & (y <= nV - 1)
+        i = np.clip(x.astype(np.intp), 0, nD - 2)
+        j = np.clip(y.astype(np.intp), 0, nV - 2)
+        tx = np.clip(x - i, 0.0, 1.0).astype(np.float32)[:, None]
+        ty = np.clip(y - j, 0.0, 1.0).astype(np.float32)[:, None]
+
+        # one flat row index per scenario; the four corners are +0, +1, +nV, +nV+1
+        rows = self.grid.reshape(-1, len(COLUMNS))
+        base = (W * nD + i) * nV + j
+        lo = rows.take(base, axis=0) * (1 - ty) + rows.take(base + 1, axis=0) * ty
+        hi = rows.take(base + nV, axis=0) * (1 - ty) + rows.take(base + nV + 1, axis=0) * ty
+        values = (lo + (hi - lo) * tx).astype(np.float64)
+
+        E_mt, Vi, Df = np.power(10.0, values[:, :3]).T         # the log10-stored columns
+        return batch.ImpactBatchResult(
+            kineticEnergy=E_mt * 4.18e15,
+            energyInMegaTons=E_mt,
+            impactVelocity=Vi,
+            transientCraterDiameter=Df / 1.25,
+            finalCraterDiameter=Df,
+            finalCraterDepth=batch.finalCraterDepthKm(Df),
+            seismicMagnitude=values[:, 3],
+        ), inside
+
+    @staticmethod
+    def _inputs(diameter, relativeVelocity, isTargetWater) -> tuple[np.ndarray, ...]:
+        arrays = np.broadcast_arrays(np.atleast_1d(np.asarray(diameter, dtype=np.float64)),
+                                     np.atleast_1d(np.asarray(relativeVelocity, dtype=np.float64)),
+                                     np.atleast_1d(np.asarray(isTargetWater, dtype=bool)))
+        return tuple(x.ravel() for x in arrays)
+
+    def interpolate(self, diameter, relativeVelocity, isTargetWater=False) -> batch.ImpactBatchResult:
+        """
+        Bilinear interpolation for every scenario (inputs broadcast like
+        simulate_impact_batch; the result is flat). Points outside the axes
+        are clamped to the border: `simulate` falls back to the formulas.
+        """
+        return self._lookup(*self._inputs(diameter, relativeVelocity, isTargetWater))[0]
+
+    def simulate(self, diameter, relativeVelocity, isTargetWater=False) -> batch.ImpactBatchResult:
+        """interpolate(), with scenarios outside the table computed by the exact formulas."""
+        D, V, W = self._inputs(diameter, relativeVelocity, isTargetWater)
+        result, inside = self._lookup(D, V, W)
+        if not inside.all():
+            outside = ~inside
+            exact = batch.simulate_impact_batch(D[outside], V[outside], W[outside])
+            for name in batch.ImpactBatchResult.__slots__:
+                getattr(result, name)[outside] = getattr(exact, name)
+        return result
+
+
+DEFAULT_AXES = TableAxes(logDiameterMin=-3.0, logDiameterMax=2.0, diameterCount=2048,
+                         velocityMin=1.0, velocityMax=75.0, velocityCount=256)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds a precomputed impact table (see module docstring).")
+    parser.add_argument("out", help="table file, e.g. impact.lut")
+    parser.add_argument("--diameter-min", type=float, default=10 ** DEFAULT_AXES.logDiameterMin, help="km")
+    parser.add_argument("--diameter-max", type=float, default=10 ** DEFAULT_AXES.logDiameterMax, help="km")
+    parser.add_argument("--diameters", type=int, default=DEFAULT_AXES.diameterCount)
+    parser.add_argument("--velocity-min", type=float, default=DEFAULT_AXES.velocityMin, help="km/s")
+    parser.add_argument("--velocity-max", type=float, default=DEFAULT_AXES.velocityMax, help="km/s")
+    parser.add_argument("--velocities", type=int, default=DEFAULT_AXES.velocityCount)
+    args = parser.parse_args()
+    axes = TableAxes(float(np.log10(args.diameter_min)), float(np.log10(args.diameter_max)), args.diameters,
+                     args.velocity_min, args.velocity_max, args.velocities)
+    table = ImpactTable.compute(axes)
+    print(f"{table.grid.shape} grid, {table.nbytes / 1e6:.1f} MB -> {table.save(args.out)}")
+    for name, bound in table.errorBound.items():
+        unit = "" if name == "seismicMagnitude" else " (relative)"
+        print(f"  {name:<22} max error {bound:.3g}{unit}")
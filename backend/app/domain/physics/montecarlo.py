@@ -0,0 +1,129 @@
+"""
+Monte Carlo uncertainty propagation for the impact formulas.
+
+Uncertain inputs (diameter inside the NASA min/max estimate, bulk density,
+entry angle and drag coefficient) are sampled in fixed-size chunks and run
+through physics/batch.py. Each chunk is folded into log-spaced histograms
+and discarded, so memory depends on the chunk size and never on the number
+of samples. Percentiles read from those histograms are accurate to the bin
+width (0.001 dex, about 0.23% relative).
+"""
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable
+
+from app.domain.physics import batch
+from app.domain.physics.impact import dragC
+
+DEFAULT_CHUNK_SIZE = 65_536
+PERCENTILES = (5, 50, 95)
+
+
+@dataclass(frozen=True, slots=True)
+class MonteCarloSpec:
+    """Ranges sampled for each uncertain input (uniform unless noted)."""
+    diameterMin: float                          # km
+    diameterMax: float                          # km
+    relativeVelocity: float                     # km/s
+    isTargetWater: bool = False
+    densityRange: tuple[float, float] = (2000.0, 3500.0)   # kg/m^3, C/S-type asteroids
+    dragRange: tuple[float, float] = (dragC * 0.75, dragC * 1.25)
+    # Entry angle from the horizontal follows the isotropic-flux law
+    # dP = sin(2θ) dθ (most probable 45°); angles below minAngle are
+    # clamped because they graze the atmosphere rather than impact.
+    minAngle: float = 5.0                       # degrees
+
+
+@dataclass(frozen=True, slots=True)
+class PercentileBand:
+    p5: float
+    p50: float
+    p95: float
+
+
+@dataclass(frozen=True, slots=True)
+class MonteCarloResult:
+    samples: int
+    seed: int | None
+    energyInMegaTons: PercentileBand
+    finalCraterDiameter: PercentileBand     # km
+    finalCraterDepth: PercentileBand        # km
+    seismicMagnitude: PercentileBand
+
+
+class _LogHistogram:
+    """Fixed-range histogram over log10(x); constant memory for any sample count."""
+
+    __slots__ = ("lo", "width", "counts")
+
+    def __init__(self, lo: float, hi: float, width: float = 1e-3):
+        self.lo = lo
+        self.width = width
+        self.counts = np.zeros(int(np.ceil((hi - lo) / width)), dtype=np.int64)
+
+    def add(self, values: np.ndarray) -> None:
+        idx = ((np.log10(values) - self.lo) / self.width).astype(np.int64)
+        np.clip(idx, 0, self.counts.size - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=self.counts.size)
+
+    def percentiles(self, qs=PERCENTILES) -> list[float]:
+        cdf = np.cumsum(self.counts)
+        ranks = np.asarray(qs, dtype=np.float64) / 100 * cdf[-1]
+        bins = np.searchsorted(cdf, ranks, side="left")
+        # report the bin centre
+        return (10 ** (self.lo + (bins + 0.5) * self.width)).tolist()
+
+
+def _sample_chunk(spec: MonteCarloSpec, rng: np.random.Generator, n: int) -> batch.ImpactBatchResult:
+    diameter = rng.uniform(spec.diameterMin, spec.diameterMax, n)
+    density = rng.uniform(*spec.densityRange, n)
+    drag = rng.uniform(*spec.dragRange, n)
+    angle = np.degrees(np.arcsin(np.sqrt(rng.random(n))))
+    np.maximum(angle, spec.minAngle, out=angle)
+    return batch.simulate_impact_batch(
+        diameter, spec.relativeVelocity, spec.isTargetWater,
+        density=density, dragC=drag, entryAngle=angle,
+    )
+
+
+def run_monte_carlo(spec: MonteCarloSpec, samples: int = 1_000_000, seed: int | None = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    progress: Callable[[int, int], None] | None = None) -> MonteCarloResult:
+    """
+    Draws `samples` scenarios from `spec` and returns p5/p50/p95 bands.
+    The same (spec, samples, seed, chunk_size) always yields the same result.
+    `progress(done, samples)` is called after every chunk.
+    """
+    if samples <= 0:
+        raise ValueError("samples must be positive")
+    if not 0 < spec.diameterMin <= spec.diameterMax:
+        raise ValueError("diameter range must be positive and ordered")
+
+    rng = np.random.default_rng(seed)
+    energy = _LogHistogram(-15.0, 15.0)   # Mt
+    crater = _LogHistogram(-6.0, 5.0)     # km
+    depth = _LogHistogram(-7.0, 4.0)      # km
+
+    remaining = samples
+    while remaining:
+        n = min(chunk_size, remaining)
+        chunk = _sample_chunk(spec, rng, n)
+        energy.add(chunk.energyInMegaTons)
+        crater.add(chunk.finalCraterDiameter)
+        depth.add(chunk.finalCraterDepth)
+        remaining -= n
+        if progress is not None:
+            progress(samples - remaining, samples)
+
+    e = energy.percentiles()
+    # The magnitude is monotone in energy, so its percentiles follow directly
+    magnitude = [batch.seismicEffect(x * 4.18e15) for x in e]
+
+    return MonteCarloResult(
+        samples=samples,
+        seed=seed,
+        energyInMegaTons=PercentileBand(*e),
+        finalCraterDiameter=PercentileBand(*crater.percentiles()),
+        finalCraterDepth=PercentileBand(*depth.percentiles()),
+        seismicMagnitude=PercentileBand(*(float(m) for m in magnitude)),
+    )
@@ -0,0 +1,84 @@
+"""
+Parameter sweeps over diameter × velocity × target-type grids.
+
+A grid is only its three axes; cell i is unravelled in C order
+(diameter slowest, water fastest), so a chunk is just a [lo, hi) range
+of flat indices. `evaluate_chunk` is a top-level function on purpose:
+process pools pickle the axes and the range, never the cells, and the
+worker returns the chunk already encoded so the caller only forwards bytes.
+"""
+import json
+import struct
+import numpy as np
+from dataclasses import dataclass
+
+from app.domain.physics import batch
+
+# output columns, in the order they are encoded
+COLUMNS = ("energy_in_megatons", "impact_velocity", "crater_diameter_m", "crater_depth_m", "seismic_magnitude")
+# binary frame header: flat offset (u64), cell count (u32), column count (u32), little-endian
+FRAME_HEADER = struct.Struct("<QII")
+
+
+def axis_values(start: float, stop: float, num: int, log: bool = False) -> np.ndarray:
+    """`num` values from start to stop inclusive, evenly spaced or log-spaced."""
+    return (np.geomspace if log else np.linspace)(start, stop, num)
+
+
+@dataclass(frozen=True, slots=True)
+class SweepGrid:
+    diameters: np.ndarray      # km
+    velocities: np.ndarray     # km/s
+    water: np.ndarray          # bool
+
+    @classmethod
+    def from_axes(cls, diameters, velocities, water=(False,)) -> "SweepGrid":
+        return cls(
+            np.ascontiguousarray(diameters, dtype=np.float64),
+            np.ascontiguousarray(velocities, dtype=np.float64),
+            np.ascontiguousarray(water, dtype=bool),
+        )
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return self.diameters.size, self.velocities.size, self.water.size
+
+    def __len__(self) -> int:
+        return self.diameters.size * self.velocities.size * self.water.size
+
+    def chunks(self, chunk_size: int) -> list[tuple[int, int]]:
+        n = len(self)
+        return [(lo, min(lo + chunk_size, n)) for lo in range(0, n, chunk_size)]
+
+
+def simulate_chunk(grid: SweepGrid, lo: int, hi: int) -> dict[str, np.ndarray]:
+    """Vectorized physics for cells [lo, hi); float32 columns in SimDetail units."""
+    d, v, w = np.unravel_index(np.arange(lo, hi), grid.shape)
+    result = batch.simulate_impact_batch(grid.diameters[d], grid.velocities[v], grid.water[w])
+    return {
+        "energy_in_megatons": result.energyInMegaTons.astype(np.float32),
+        "impact_velocity": result.impactVelocity.astype(np.float32),
+        "crater_diameter_m": (result.finalCraterDiameter * 1000).astype(np.float32),  # km → m
+        "crater_depth_m": (result.finalCraterDepth * 1000).astype(np.float32),        # km → m
+        "seismic_magnitude": result.seismicMagnitude.astype(np.float32),
+    }
+
+
+def encode_binary(lo: int, columns: dict[str, np.ndarray]) -> bytes:
+    """One frame: header followed by each column as raw little-endian float32."""
+    count = len(columns[COLUMNS[0]])
+    body = b"".join(columns[name].astype("<f4", copy=False).tobytes() for name in COLUMNS)
+    return FRAME_HEADER.pack(lo, count, len(COLUMNS)) + body
+
+
+def encode_ndjson(lo: int, columns: dict[str, np.ndarray]) -> bytes:
+    line = {"type": "chunk", "offset": lo, "count": len(columns[COLUMNS[0]])}
+    line.update({name: np.round(columns[name].astype(np.float64), 4).tolist() for name in COLUMNS})
+    return (json.dumps(line, separators=(",", ":")) + "\n").encode()
+
+
+ENCODERS = {"binary": encode_binary, "ndjson": encode_ndjson}
+
+
+def evaluate_chunk(grid: SweepGrid, lo: int, hi: int, fmt: str = "binary") -> bytes:
+    return ENCODERS[fmt](lo, simulate_chunk(grid, lo, hi))
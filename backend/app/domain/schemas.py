@@ -2,7 +2,7 @@
 from typing import Any, Dict, List, Literal, Optional, Union
 from datetime import date
 from typing import Optional, Union, Annotated, Literal
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 # ---------- ENTRADA PARA SIMULACIÓN ----------
 
@@ -86,6 +86,47 @@ class MeteorListResponse(BaseModel):
     range: List[str]
     count: int
     asteroids: List[MeteorListItem]
+    # True si NASA falló y se respondió con los últimos datos obtenidos
+    degraded: bool = False
+
+# ---------- RANKING POR CONSECUENCIAS ----------
+class RankedItem(BaseModel):
+    id: int
+    name: str
+    estimated_diameter_km: float
+    velocity_km_s: float
+    is_potentially_hazardous: bool
+    energy_in_megatons: float
+    seismic_magnitude: float
+    crater_diameter_m: float
+
+
+class RankedResponse(BaseModel):
+    metric: str
+    total: int
+    count: int
+    next_cursor: Optional[str] = None
+    asteroids: List[RankedItem]
+
+# ---------- ACERCAMIENTOS POR PROPAGACIÓN ORBITAL ----------
+class OrbitApproachItem(BaseModel):
+    id: int
+    name: str
+    estimated_diameter_km: float
+    close_approach_utc: str
+    miss_distance_km: float
+    velocity_km_s: float
+    # Consecuencias si impactara en tierra con esa velocidad
+    energy_in_megatons: float
+    seismic_magnitude: float
+    crater_diameter_m: float
+
+
+class OrbitApproachResponse(BaseModel):
+    range: List[str]
+    screened: int          # objetos con elementos orbitales propagados
+    count: int
+    approaches: List[OrbitApproachItem]
 
 # ---------- DETALLE / CÁLCULOS (pantalla 2) ----------
 
@@ -97,6 +138,287 @@ class SimDetail(BaseModel):
     crater_depth_m: float
 
 
+# ---------- LOTE DE ESCENARIOS (batch) ----------
+MAX_BATCH_SIZE = 100_000
+
+
+class BatchImpactInput(BaseModel):
+    diameters_km: List[float] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+    velocities_kms: List[float] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+    # Un solo valor se aplica a todos los escenarios
+    water: Union[bool, List[bool]] = False
+    # "table": interpolación sobre la tabla precalculada (IMPACT_TABLE_PATH), para sliders
+    mode: Literal["exact", "table"] = "exact"
+    # Un sismo real comparable por escenario (una consulta por magnitud redondeada a 0.1)
+    related_earthquakes: bool = False
+
+    @field_validator('diameters_km')
+    @classmethod
+    def validate_diameters(cls, v: List[float]):
+        if any(d <= 0 for d in v):
+            raise ValueError('Todos los diámetros deben ser positivos')
+        return v
+
+    @field_validator('velocities_kms')
+    @classmethod
+    def validate_velocities(cls, v: List[float]):
+        if any(s <= 0 for s in v):
+            raise ValueError('Todas las velocidades deben ser positivas')
+        return v
+
+    @model_validator(mode='after')
+    def validate_lengths(self):
+        n = len(self.diameters_km)
+        if len(self.velocities_kms) != n:
+            raise ValueError('diameters_km y velocities_kms deben tener la misma longitud')
+        if isinstance(self.water, list) and len(self.water) != n:
+            raise ValueError('water debe ser un booleano o una lista de la misma longitud')
+        return self
+
+
+class BatchImpactResponse(BaseModel):
+    count: int
+    energy_in_megatons: List[float]
+    impact_velocity: List[float]
+    crater_diameter_m: List[float]
+    crater_depth_m: List[float]
+    seismic_magnitude: List[float]
+    # Solo con mode="table": error máximo medido al construir la tabla
+    # (relativo; en unidades de magnitud para seismic_magnitude)
+    error_bound: Optional[Dict[str, float]] = None
+    # Solo con related_earthquakes=true, en el orden de los escenarios
+    related_earthquakes: Optional[List[Optional["EarthquakeDetail"]]] = None
+
+
+# ---------- VARIOS SITIOS DE IMPACTO (bulk) ----------
+MAX_BULK_SITES = 1_000
+
+
+class ImpactSite(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+
+
+class BulkSimInput(BaseModel):
+    # Un asteroide de NASA o uno personalizado, contra muchos puntos de impacto
+    nasa_id: Optional[int] = None
+    diameter_km: Optional[float] = Field(None, gt=0)
+    velocity_kms: Optional[float] = Field(None, gt=0)
+    sites: List[ImpactSite] = Field(min_length=1, max_length=MAX_BULK_SITES)
+
+    @model_validator(mode='after')
+    def validate_source(self):
+        if self.nasa_id is None and None in (self.diameter_km, self.velocity_kms):
+            raise ValueError('Se requiere nasa_id o diameter_km y velocity_kms')
+        return self
+
+
+class SiteResult(BaseModel):
+    lat: float
+    lon: float
+    # None si no se pudo resolver agua/tierra; `error` dice por qué
+    is_water: Optional[bool] = None
+    error: Optional[str] = None
+    energy_in_megatons: Optional[float] = None
+    impact_velocity: Optional[float] = None
+    crater_diameter_m: Optional[float] = None
+    crater_depth_m: Optional[float] = None
+    seismic_magnitude: Optional[float] = None
+
+
+class BulkSimResponse(BaseModel):
+    nasa_id: Optional[int] = None
+    name: Optional[str] = None
+    diameter_km: float
+    velocity_kms: float
+    count: int
+    unique_sites: int      # puntos consultados a IsItWater tras deduplicar
+    failed: int
+    sites: List[SiteResult]
+    # True si algún dato viene de un respaldo local (NEO ya visto, ráster de agua)
+    degraded: bool = False
+
+
+# ---------- MONTE CARLO (incertidumbre) ----------
+MAX_MONTECARLO_SAMPLES = 20_000_000
+
+
+class MonteCarloInput(BaseModel):
+    # Un asteroide de NASA (usa su rango min/max) o un rango personalizado
+    nasa_id: Optional[int] = None
+    diameter_min_km: Optional[float] = None
+    diameter_max_km: Optional[float] = None
+    velocity_kms: Optional[float] = None
+    water: bool = False
+    samples: int = Field(1_000_000, ge=1_000, le=MAX_MONTECARLO_SAMPLES)
+    seed: Optional[int] = None
+
+    @model_validator(mode='after')
+    def validate_source(self):
+        if self.nasa_id is not None:
+            return self
+        if None in (self.diameter_min_km, self.diameter_max_km, self.velocity_kms):
+            raise ValueError('Se requiere nasa_id o diameter_min_km, diameter_max_km y velocity_kms')
+        if not 0 < self.diameter_min_km <= self.diameter_max_km:
+            raise ValueError('El rango de diámetro debe ser positivo y min <= max')
+        if self.velocity_kms <= 0:
+            raise ValueError('La velocidad debe ser positiva')
+        return self
+
+
+class PercentileBand(BaseModel):
+    p5: float
+    p50: float
+    p95: float
+
+
+class MonteCarloResponse(BaseModel):
+    samples: int
+    seed: Optional[int]
+    diameter_range_km: List[float]
+    velocity_kms: float
+    energy_in_megatons: PercentileBand
+    crater_diameter_m: PercentileBand
+    crater_depth_m: PercentileBand
+    seismic_magnitude: PercentileBand
+
+
+# ---------- EFECTOS Y MAPA DE DAÑOS ----------
+class EffectsInput(BaseModel):
+    # Escenario guardado (scenario_id) o parámetros explícitos
+    scenario_id: Optional[str] = None
+    diameter_km: Optional[float] = Field(None, gt=0)
+    velocity_kms: Optional[float] = Field(None, gt=0)
+    water: bool = False
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
+    raster: bool = False
+    grid_size: int = Field(128, ge=16, le=1024)
+    half_width_km: Optional[float] = Field(None, gt=0)
+
+    @model_validator(mode='after')
+    def validate_source(self):
+        if (self.diameter_km is None) != (self.velocity_kms is None):
+            raise ValueError('diameter_km y velocity_kms van juntos')
+        return self
+
+
+class EffectZoneOut(BaseModel):
+    effect: str
+    label: str
+    threshold: float
+    unit: str
+    radius_km: float
+    severity: int
+
+
+class DamageRasterOut(BaseModel):
+    size: int
+    lat_min: float
+    lat_max: float
+    lon_min: float
+    lon_max: float
+    # uint8 fila por fila (norte → sur), codificado en base64
+    levels_b64: str
+
+
+class EffectsResponse(BaseModel):
+    lat: Optional[float]
+    lon: Optional[float]
+    energy_in_megatons: float
+    zones: List[EffectZoneOut]
+    raster: Optional[DamageRasterOut] = None
+
+
+# ---------- BARRIDO DE PARÁMETROS (sweep) ----------
+MAX_SWEEP_CELLS = 50_000_000
+
+
+class SweepAxis(BaseModel):
+    # num valores entre start y stop (inclusive), lineales o logarítmicos
+    start: float = Field(gt=0)
+    stop: float = Field(gt=0)
+    num: int = Field(ge=1, le=MAX_SWEEP_CELLS)
+    log: bool = False
+
+
+class SweepInput(BaseModel):
+    # Cada eje es una lista explícita o un rango
+    diameters_km: Union[List[float], SweepAxis]
+    velocities_kms: Union[List[float], SweepAxis]
+    water: List[bool] = [False]
+    format: Literal["ndjson", "binary"] = "ndjson"
+    chunk_size: int = Field(65_536, ge=1_024, le=1_048_576)
+
+    @model_validator(mode='after')
+    def validate_grid(self):
+        sizes = []
+        for name in ('diameters_km', 'velocities_kms'):
+            axis = getattr(self, name)
+            if isinstance(axis, list):
+                if not axis or any(x <= 0 for x in axis):
+                    raise ValueError(f'{name} debe tener valores positivos')
+                sizes.append(len(axis))
+            else:
+                sizes.append(axis.num)
+        if not self.water:
+            raise ValueError('water debe tener al menos un valor')
+        if sizes[0] * sizes[1] * len(self.water) > MAX_SWEEP_CELLS:
+            raise ValueError(f'La malla no puede superar {MAX_SWEEP_CELLS} celdas')
+        return self
+
+
+class SweepProgressOut(BaseModel):
+    sweep_id: str
+    status: str
+    total: int
+    done: int
+    elapsed_s: float
+
+
+# ---------- ENTRADA ATMOSFÉRICA (fragmentación / airburst) ----------
+MAX_ENTRY_BODIES = 10_000
+
+
+class EntryInput(BaseModel):
+    diameters_km: List[float] = Field(min_length=1, max_length=MAX_ENTRY_BODIES)
+    velocities_kms: List[float] = Field(min_length=1, max_length=MAX_ENTRY_BODIES)
+    # Un solo valor se aplica a todos los cuerpos
+    angle_deg: Union[float, List[float]] = 45.0
+    density: Union[float, List[float]] = 3000.0
+    # Perfil de energía depositada por altura (solo si se pide)
+    profile: bool = False
+
+    @model_validator(mode='after')
+    def validate_bodies(self):
+        n = len(self.diameters_km)
+        if len(self.velocities_kms) != n:
+            raise ValueError('diameters_km y velocities_kms deben tener la misma longitud')
+        if any(d <= 0 for d in self.diameters_km) or any(v <= 0 for v in self.velocities_kms):
+            raise ValueError('Diámetros y velocidades deben ser positivos')
+        for name in ('angle_deg', 'density'):
+            value = getattr(self, name)
+            values = value if isinstance(value, list) else [value]
+            if isinstance(value, list) and len(value) != n:
+                raise ValueError(f'{name} debe ser un número o una lista de la misma longitud')
+            if any(x <= 0 for x in values) or (name == 'angle_deg' and any(x > 90 for x in values)):
+                raise ValueError(f'{name} fuera de rango')
+        return self
+
+
+class EntryResponse(BaseModel):
+    count: int
+    # None: el cuerpo no se fragmentó / llegó al suelo
+    breakup_altitude_km: List[Optional[float]]
+    airburst_altitude_km: List[Optional[float]]
+    ground_velocity_kms: List[float]
+    atmospheric_energy_mt: List[float]
+    # False: se agotaron los pasos de integración con el cuerpo aún en vuelo
+    converged: List[bool]
+    altitudes_km: Optional[List[float]] = None
+    energy_deposition_kt_per_km: Optional[List[List[float]]] = None
+
+
 class EarthquakeDetail(BaseModel):
     id: str
     magnitude: float
@@ -105,7 +427,40 @@ class EarthquakeDetail(BaseModel):
     longitude: float
     latitude: float
     depth_km: float
-   
+
+
+class NearbyEarthquake(EarthquakeDetail):
+    distance_km: float
+
+
+# ---------- TRABAJOS EN SEGUNDO PLANO ----------
+JobKind = Literal["combined", "batch", "montecarlo", "entry"]
+
+
+class CombinedJobParams(BaseModel):
+    scenario_id: Optional[str] = None
+
+
+class JobInput(BaseModel):
+    kind: JobKind
+    # 0 = más urgente; a igual prioridad, por orden de llegada
+    priority: int = Field(5, ge=0, le=9)
+    # Mismo cuerpo que la ruta síncrona correspondiente (BatchImpactInput, MonteCarloInput, ...)
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+class JobOut(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    priority: int
+    progress: float
+    message: Optional[str] = None
+    elapsed_s: float
+    run_s: Optional[float] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
 
 # ---------- DETALLES SOBRE ISIT WATERAPPI ----------
 class IsitWater(BaseModel):
@@ -113,6 +468,13 @@ class IsitWater(BaseModel):
 
 __all__ = [
     "CustomSimInput", "NasaSimInput", "SimInput",
-    "MeteorListItem", "MeteorListResponse",
-    "SimSummary", "SimDetail", "IsitWater"
+    "MeteorListItem", "MeteorListResponse", "RankedItem", "RankedResponse",
+    "OrbitApproachItem", "OrbitApproachResponse",
+    "SimSummary", "SimDetail", "IsitWater",
+    "BatchImpactInput", "BatchImpactResponse",
+    "MonteCarloInput", "MonteCarloResponse", "PercentileBand",
+    "EffectsInput", "EffectsResponse", "EffectZoneOut", "DamageRasterOut",
+    "EntryInput", "EntryResponse", "EarthquakeDetail", "NearbyEarthquake",
+    "SweepAxis", "SweepInput", "SweepProgressOut",
+    "CombinedJobParams", "JobInput", "JobOut",
 ]
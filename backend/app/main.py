@@ -1,11 +1,69 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from app.api.routes_nasa import router as nasa_router
 from app.api.physicsapi import router as impact_router
+from app.core.config import settings
+from app.core.degraded import track_degraded
+from app.core.metrics import HTTP_REQUEST_SECONDS, REGISTRY, cache_lines, gauge_lines
+from app.core.profiling import StackSampler
+from app.core.serialization import DefaultJSONResponse
+from app.services.container import Services
+from app.services.job_queue import JobQueue
+from app.services.scenario_store import ScenarioStore, build_scenario_backend
 import asyncio
+import logging
+import time
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Meteor Impact API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clientes y servicios se construyen en el primer uso (Depends); ver app/services/container.py
+    services = app.state.services = Services()
+    if settings.PREWARM:
+        logger.info("Prewarm: %s ms", await run_in_threadpool(services.prewarm))
+    # Escenarios por sesión en lugar de config.json; con STATE_BACKEND compartido,
+    # visibles desde cualquier worker (app/core/shared_state.py)
+    state = services.state
+    app.state.scenarios = ScenarioStore(build_scenario_backend(state))
+    # Índice de riesgo; el job que lo llena es opcional porque consume cuota de NASA
+    refresher = None
+    if settings.RISK_INDEX_ENABLED:
+        from app.services.risk_index import RiskIndexRefresher
+
+        refresher = asyncio.create_task(RiskIndexRefresher(
+            services.risk_index, services.nasa_client, max_pages=settings.RISK_INDEX_MAX_PAGES,
+        ).run_forever(settings.RISK_INDEX_REFRESH_S))
+    # Cola de trabajos largos (/impact/jobs) con control de admisión
+    app.state.jobs = JobQueue(shared=state if state.shared else None)
+    # Catálogo local de sismos: la API de USGS solo lo actualiza de forma incremental
+    quake_refresher = None
+    if settings.USGS_CATALOG_PATH and settings.USGS_CATALOG_REFRESH_S > 0:
+        from app.services.quake_catalog import QuakeCatalogRefresher
+
+        impact_service = services.impact
+        quake_refresher = asyncio.create_task(QuakeCatalogRefresher(
+            impact_service, impact_service.usgs, settings.USGS_CATALOG_PATH,
+            min_magnitude=settings.USGS_CATALOG_MIN_MAGNITUDE,
+        ).run_forever(settings.USGS_CATALOG_REFRESH_S))
+    try:
+        yield
+    finally:
+        for task in (refresher, quake_refresher):
+            if task is not None:
+                task.cancel()
+        await app.state.jobs.aclose()
+        if app.state.scenarios.backend is not state:
+            await app.state.scenarios.aclose()
+        await services.aclose()
+
+
+# orjson para serializar las respuestas cuando está instalado
+app = FastAPI(title="Meteor Impact API", lifespan=lifespan, default_response_class=DefaultJSONResponse)
 
 origins = ["*"]
 
@@ -14,18 +72,109 @@ app.add_middleware(
     allow_origins = origins,
     allow_credentials=True,
     allow_methods={"*"},
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Degraded"],
 )
 
-app.state.selections = {}   # dict: { asteroid_id: {"lat": float, "lon": float, "ts": datetime} }
-app.state.lock = asyncio.Lock()
+@app.middleware("http")
+async def instrument(request: Request, call_next):
+    """
+    Latencia por ruta para /metrics. Con PROFILING_ENABLED, `?profile=1` o
+    la cabecera `X-Profile: 1` devuelven en su lugar las pilas muestreadas
+    durante la petición, en formato folded (flamegraph.pl / speedscope).
+    Si algo se respondió con un respaldo local, la cabecera X-Degraded lista
+    los upstreams afectados.
+    """
+    profile = settings.PROFILING_ENABLED and "1" in (request.query_params.get("profile"), request.headers.get("x-profile"))
+    sampler = StackSampler().start() if profile else None
+    start = time.perf_counter()
+    try:
+        with track_degraded() as degraded:
+            response = await call_next(request)
+        if degraded:
+            response.headers["X-Degraded"] = ",".join(sorted(degraded))
+        if sampler is not None:
+            # consumir el cuerpo para perfilar también las respuestas en streaming
+            async for _ in response.body_iterator:
+                pass
+    except Exception:
+        if sampler is not None:
+            sampler.stop()
+        raise
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        elapsed, method=request.method, route=getattr(route, "path", "unmatched"), status=response.status_code
+    )
+    if sampler is None:
+        return response
+    sampler.stop()
+    return PlainTextResponse(sampler.folded(), headers={
+        "X-Profile-Samples": str(sampler.samples),
+        "X-Profile-Elapsed-Ms": f"{elapsed * 1000:.1f}",
+        "X-Profile-Status": str(response.status_code),
+    })
+
+
+def _cache_metrics() -> list[str]:
+    # Solo lo ya construido: /metrics no debe instanciar clientes
+    services = getattr(app.state, "services", None)
+    if services is None:
+        return []
+    samples = []
+    if (client := services.built("nasa_client")) is not None:
+        samples.append(("nasa", client.stats()))
+    if (water := services.built("water")) is not None and water.tiles is not None:
+        samples.append(("water_tiles", water.tiles.stats()["memory"]))
+    return cache_lines(samples)
+
+
+REGISTRY.collector("caches", _cache_metrics)
+
+
+def _breaker_metrics() -> list[str]:
+    services = getattr(app.state, "services", None)
+    http = services.built("http") if services is not None else None
+    if http is None:
+        return []
+    states = {"closed": 0, "half_open": 1, "open": 2}
+    breakers = http.stats()
+    lines = gauge_lines("upstream_circuit_state", "Cortacircuitos por upstream (0 cerrado, 1 prueba, 2 abierto).",
+                        (({"upstream": name}, states[b["state"]]) for name, b in breakers.items()))
+    lines += gauge_lines("upstream_circuit_opens_total", "Veces que se abrió el circuito.",
+                         (({"upstream": name}, b["opens"]) for name, b in breakers.items()), kind="counter")
+    return lines
+
+
+REGISTRY.collector("breakers", _breaker_metrics)
+
+
+def _job_metrics() -> list[str]:
+    jobs = getattr(app.state, "jobs", None)
+    if jobs is None:
+        return []
+    stats = jobs.stats()
+    lines = gauge_lines("jobs_in_progress", "Trabajos por estado.",
+                        (({"status": status}, stats[status]) for status in ("queued", "running")))
+    lines += gauge_lines("jobs_rejected_total", "Trabajos rechazados por control de admisión.",
+                         [({}, stats["rejected"])], kind="counter")
+    lines += gauge_lines("jobs_completed_total", "Trabajos terminados con éxito.",
+                         [({}, stats["completed"])], kind="counter")
+    return lines
+
+
+REGISTRY.collector("jobs", _job_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 
 @app.get("/Meteors Madness")
 def health():
     return {"ok": True}
 
-app.state.last_sim_input = None
-app.state.last_sim_lock = asyncio.Lock()
-
 app.include_router(nasa_router, prefix="/api", tags=["nasa"])
 app.include_router(impact_router, prefix="/api")
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Servicios de la aplicación, construidos en el primer uso.
+
+El lifespan de main.py crea un `Services` en `app.state.services` y las
+rutas lo reciben con `Depends` (app/api/deps.py). Ningún cliente ni
+servicio se construye al importar: httpx, NumPy y los módulos de física
+se cargan con la primera petición que los necesita, así que importar la
+app (un worker nuevo de uvicorn/gunicorn, un script, un benchmark) es
+rápido y no lee la configuración. Con PREWARM=true el lifespan llama a
+`prewarm()` y el costo se paga antes de aceptar tráfico.
+
+Las propiedades se resuelven en el event loop (los providers de deps.py
+son async), por lo que no hay dos hilos construyendo el mismo servicio.
+"""
+from __future__ import annotations
+
+import time
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.clients.http import HttpClientManager
+    from app.clients.nasa_client import CachedNasaNeoClient
+    from app.core.shared_state import StateBackend
+    from app.services.isitwater_service import IsItWaterService
+    from app.services.nasa_service import NasaNeoService
+    from app.services.physicService import ImpactEarthquakeService
+    from app.services.risk_index import RiskIndex
+    from app.services.sweep_service import SweepRunner
+
+PROVIDERS = ("state", "http", "nasa_client", "nasa", "water", "impact", "risk_index", "sweeps")
+
+
+class Services:
+    def __init__(self):
+        self.build_ms: dict[str, float] = {}
+
+    def built(self, name: str):
+        """La instancia si ya se construyó, sin construirla (para métricas y cierre)."""
+        return self.__dict__.get(name)
+
+    def prewarm(self) -> dict[str, float]:
+        """Construye todo (e importa NumPy y la física); devuelve ms por servicio."""
+        for name in PROVIDERS:
+            start = time.perf_counter()
+            getattr(self, name)
+            self.build_ms.setdefault(name, round((time.perf_counter() - start) * 1000, 2))
+        return self.build_ms
+
+    # ---------- providers ----------
+    @cached_property
+    def http(self) -> HttpClientManager:
+        # Un solo pool HTTP (keep-alive) para NASA, IsItWater y USGS
+        from app.clients.http import HttpClientManager, set_http_manager
+
+        manager = HttpClientManager()
+        set_http_manager(manager)
+        return manager
+
+    @cached_property
+    def state(self) -> StateBackend:
+        # Caché de NASA, escenarios y trabajos compartidos entre workers (STATE_BACKEND)
+        from app.core.shared_state import build_state_backend
+
+        return build_state_backend()
+
+    @cached_property
+    def nasa_client(self) -> CachedNasaNeoClient:
+        from app.clients.nasa_client import CachedNasaNeoClient, NasaNeoClient
+        from app.core.shared_state import SharedCache
+
+        shared = SharedCache(self.state, "nasa:") if self.state.shared else None
+        return CachedNasaNeoClient(NasaNeoClient(http=self.http), shared=shared)
+
+    @cached_property
+    def nasa(self) -> NasaNeoService:
+        from app.services.nasa_service import NasaNeoService
+
+        return NasaNeoService(self.nasa_client)
+
+    @cached_property
+    def water(self) -> IsItWaterService:
+        from app.services.isitwater_service import IsItWaterService
+
+        return IsItWaterService.from_settings(self.http)
+
+    @cached_property
+    def impact(self) -> ImpactEarthquakeService:
+        from app.clients.usgs_client import UsgsClient
+        from app.domain.physics.lookup import ImpactTable
+        from app.services.physicService import ImpactEarthquakeService
+        from app.services.quake_catalog import QuakeCatalog
+
+        return ImpactEarthquakeService(
+            usgs=UsgsClient(http=self.http),
+            catalog=QuakeCatalog.open(settings.USGS_CATALOG_PATH) if settings.USGS_CATALOG_PATH else None,
+            table=ImpactTable.open(settings.IMPACT_TABLE_PATH) if settings.IMPACT_TABLE_PATH else None,
+        )
+
+    @cached_property
+    def risk_index(self) -> RiskIndex:
+        from app.services.risk_index import RiskIndex
+
+        return RiskIndex()
+
+    @cached_property
+    def sweeps(self) -> SweepRunner:
+        # El pool de procesos de /impact/sweep se crea con el primer barrido
+        from app.services.sweep_service import SweepRunner
+
+        return SweepRunner()
+
+    async def aclose(self) -> None:
+        """Cierra solo lo que llegó a construirse."""
+        if (sweeps := self.built("sweeps")) is not None:
+            sweeps.close()
+        if (http := self.built("http")) is not None:
+            from app.clients.http import set_http_manager
+
+            await http.aclose()
+            set_http_manager(None)
+        if (state := self.built("state")) is not None:
+            await state.aclose()
@@ -1,20 +1,71 @@
+import asyncio
 from typing import List
 from app.domain.schemas import IsitWater
+from app.clients.http import HttpClientManager
 from app.clients.isist_client import IsItWaterClient
+from app.core.config import settings
+from app.services.water_tiles import SqliteTileStore, WaterRaster, WaterTileCache, tile_key
 
 class IsItWaterService:
     """
     Servicio para consultar la API de IsItWater y devolver un JSON limpio al frontend.
     """
 
-    def __init__(self, client: IsItWaterClient | None = None):
+    def __init__(self, client: IsItWaterClient | None = None, tiles: WaterTileCache | None = None):
         self.client = client or IsItWaterClient()
+        self.tiles = tiles
+
+    @classmethod
+    def from_settings(cls, http: HttpClientManager | None = None) -> "IsItWaterService":
+        """Servicio con la caché por celdas configurada en .env."""
+        client = IsItWaterClient(http=http)
+        resolution = settings.WATER_TILE_RESOLUTION_DEG
+        store = SqliteTileStore(settings.WATER_TILE_DB_PATH, resolution) if settings.WATER_TILE_DB_PATH else None
+        raster = WaterRaster(settings.WATER_RASTER_PATH) if settings.WATER_RASTER_PATH else None
+        tiles = WaterTileCache(
+            client,
+            resolution_deg=resolution,
+            maxsize=settings.WATER_TILE_CACHE_SIZE,
+            store=store,
+            raster=raster,
+            offline=settings.WATER_OFFLINE,
+        )
+        return cls(client, tiles)
 
     async def get_water_info(self, lat: float, lon: float) -> IsitWater:
         """
         Llama al cliente de IsItWater y transforma la respuesta en el formato del dominio.
         """
+        if self.tiles is not None:
+            return await self.tiles.is_water(lat, lon)
         data = await self.client.fetch_is_water(lat, lon)
         # La API suele regresar {"water": true/false}. Defensivo por si falta el campo:
         return bool(data.get("water", False))
 
+    def point_key(self, lat: float, lon: float) -> tuple:
+        """Puntos con la misma clave tienen la misma respuesta: la celda si hay caché, si no el punto."""
+        if self.tiles is not None and not self.tiles.offline:
+            return tile_key(lat, lon, self.tiles.resolution_deg)
+        return (lat, lon)
+
+    async def get_water_many(self, points: List[tuple[float, float]],
+                             concurrency: int = 16) -> List[bool | Exception]:
+        """
+        Agua/tierra de muchos puntos, en el mismo orden.
+        Los puntos repetidos (o de la misma celda) se consultan una sola vez
+        y nunca hay más de `concurrency` consultas en vuelo. Un punto que
+        falla devuelve su excepción en lugar de hacer fallar a los demás.
+        """
+        unique: dict[tuple, tuple[float, float]] = {}
+        for lat, lon in points:
+            unique.setdefault(self.point_key(lat, lon), (lat, lon))
+
+        limit = asyncio.Semaphore(concurrency)
+
+        async def resolve(lat: float, lon: float) -> bool:
+            async with limit:
+                return await self.get_water_info(lat, lon)
+
+        found = await asyncio.gather(*(resolve(*p) for p in unique.values()), return_exceptions=True)
+        by_key = dict(zip(unique, found))
+        return [by_key[self.point_key(lat, lon)] for lat, lon in points]
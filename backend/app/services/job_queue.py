@@ -0,0 +1,398 @@
+"""
+Cola de trabajos en segundo plano para simulaciones largas.
+
+`POST /impact/jobs` encola el trabajo y responde enseguida con su id. A lo
+sumo `workers` trabajos corren a la vez (y `per_client` por cliente); los
+demás esperan por prioridad y orden de llegada. Las partes de CPU corren en
+un pool de hilos propio de la cola, así que un Monte Carlo grande no ocupa
+el threadpool de las rutas síncronas ni bloquea el event loop que atiende
+`/nasa/closest`. Cuando la cola está llena se rechaza con 429 en lugar de
+acumular trabajo sin límite.
+
+Los resultados se guardan en memoria con TTL; el progreso se puede seguir
+por polling, SSE o WebSocket (`watch`).
+
+Con varios workers y un backend compartido (`shared`, ver
+app/core/shared_state.py) el trabajo corre en el worker que lo recibió,
+pero su estado se publica en el backend: cualquier otro worker lo responde
+(polling o `watch`, que entonces consulta cada `sync_s`) y una cancelación
+recibida en otro worker se aplica en la siguiente sincronización.
+"""
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.serialization import dumps, loads
+from app.core.shared_state import StateBackend
+
+logger = logging.getLogger(__name__)
+
+TERMINAL = frozenset({"done", "error", "cancelled"})
+
+
+class JobRejected(Exception):
+    """Control de admisión: la cola o el cupo del cliente están llenos."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+@dataclass(eq=False)
+class Job:
+    id: str
+    kind: str
+    client: str
+    priority: int                      # 0 = más urgente
+    work: Callable[["JobContext"], Awaitable[Any]] | None = field(default=None, repr=False)
+    status: str = "queued"             # "queued" | "running" | "done" | "error" | "cancelled"
+    progress: float = 0.0
+    message: str | None = None
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    finished_at: float | None = None
+    expires_at: float = math.inf
+    task: asyncio.Task | None = field(default=None, repr=False)
+    in_executor: int = field(default=0, repr=False)   # llamadas de `ctx.run` aún en un hilo
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def notify(self) -> None:
+        """Despierta a quienes siguen el trabajo; cada cambio usa un Event nuevo."""
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def as_dict(self) -> dict:
+        now = time.monotonic()
+        run_s = None
+        if self.started_at is not None:
+            run_s = round((self.finished_at or now) - self.started_at, 3)
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "elapsed_s": round((self.finished_at or now) - self.created_at, 3),
+            "run_s": run_s,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobContext:
+    """Lo que recibe cada trabajo: reportar progreso y correr código de CPU en el pool."""
+
+    def __init__(self, queue: "JobQueue", job: Job):
+        self.queue = queue
+        self.job = job
+        self.loop = asyncio.get_running_loop()
+
+    def report(self, fraction: float, message: str | None = None) -> None:
+        """Se puede llamar desde el event loop o desde el hilo del trabajo."""
+        self.loop.call_soon_threadsafe(self.queue._progress, self.job, fraction, message)
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        future = self.queue.executor.submit(functools.partial(fn, *args, **kwargs))
+        self.job.in_executor += 1
+        # El hilo no se puede interrumpir: el cupo del trabajo se libera cuando
+        # termina el cálculo, no cuando se cancela la tarea que lo espera
+        future.add_done_callback(functools.partial(self.queue._thread_done, self.loop, self.job))
+        return await asyncio.wrap_future(future)
+
+
+class JobQueue:
+    def __init__(
+        self,
+        workers: int | None = None,
+        per_client: int | None = None,
+        max_queued: int | None = None,
+        max_per_client: int | None = None,
+        result_ttl: float | None = None,
+        keep: int = 10_000,
+        shared: StateBackend | None = None,
+        sync_s: float = 0.5,
+    ):
+        self.workers = max(1, workers or settings.JOB_WORKERS)
+        self.per_client = max(1, per_client or settings.JOB_PER_CLIENT)
+        self.max_queued = settings.JOB_MAX_QUEUED if max_queued is None else max_queued
+        self.max_per_client = settings.JOB_MAX_PER_CLIENT if max_per_client is None else max_per_client
+        self.result_ttl = settings.JOB_RESULT_TTL_S if result_ttl is None else result_ttl
+        self.keep = keep
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self._heap: list[tuple[int, int, Job]] = []
+        self._expiry: deque[Job] = deque()     # terminados, por orden de vencimiento
+        self._seq = itertools.count()
+        self._active: dict[str, int] = {}      # cliente -> en cola + en ejecución
+        self._running: dict[str, int] = {}     # cliente -> en ejecución
+        self.running = 0
+        self.queued = 0
+        self.rejected = 0
+        self.completed = 0
+        self._avg_run_s = 1.0                  # media móvil, para estimar Retry-After
+        self._executor: ThreadPoolExecutor | None = None
+        self.shared = shared
+        self.sync_s = sync_s
+        self._mirrors: set[asyncio.Task] = set()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def submit(self, kind: str, work: Callable[[JobContext], Awaitable[Any]],
+               client: str = "", priority: int = 5) -> Job:
+        """Encola `work(ctx)` o lanza JobRejected si no hay cupo."""
+        self._purge()
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise JobRejected("La cola de trabajos está llena.", self._retry_after(self.queued))
+        if self._active.get(client, 0) >= self.max_per_client:
+            self.rejected += 1
+            raise JobRejected("Demasiados trabajos pendientes para este cliente.",
+                              self._retry_after(self._active[client]))
+
+        job = Job(uuid.uuid4().hex, kind, client, priority, work)
+        self.jobs[job.id] = job
+        self._active[client] = self._active.get(client, 0) + 1
+        self.queued += 1
+        heapq.heappush(self._heap, (priority, next(self._seq), job))
+        if self.shared is not None:
+            mirror = asyncio.create_task(self._mirror(job))
+            self._mirrors.add(mirror)
+            mirror.add_done_callback(self._mirrors.discard)
+        self._dispatch()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        self._purge()
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """
+        Un trabajo en cola se descarta; uno en ejecución se cancela y su
+        resultado se pierde. El cálculo ya en un hilo termina por su cuenta y
+        el trabajo conserva su cupo (hilo y por cliente) hasta entonces.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.status in TERMINAL:
+            return job
+        if job.status == "queued":
+            self.queued -= 1        # la entrada del heap se descarta al salir
+            self._finish(job, "cancelled")
+        elif job.task is not None:
+            job.task.cancel()
+        return job
+
+    async def state(self, job_id: str) -> dict | None:
+        """Estado del trabajo, corra en este worker o (con backend compartido) en otro."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.as_dict()
+        return await self._snapshot(job_id)
+
+    async def request_cancel(self, job_id: str) -> dict | None:
+        """
+        `cancel` desde cualquier worker. Si el trabajo corre en otro, se deja
+        el pedido en el backend y se devuelve el último estado publicado; el
+        dueño lo cancela en su próxima sincronización.
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return self.cancel(job_id).as_dict()
+        snapshot = await self._snapshot(job_id)
+        if snapshot is not None and snapshot["status"] not in TERMINAL:
+            await self.shared.set(f"job-cancel:{job_id}", b"1", self.result_ttl)
+        return snapshot
+
+    async def watch(self, job_id: str) -> AsyncIterator[dict]:
+        """Estado actual y luego cada cambio, hasta que el trabajo termina."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            async for state in self._watch_remote(job_id):
+                yield state
+            return
+        while True:
+            changed = job.changed
+            yield job.as_dict()
+            if job.status in TERMINAL:
+                return
+            await changed.wait()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "stored": len(self.jobs),
+        }
+
+    async def aclose(self) -> None:
+        for job in list(self.jobs.values()):
+            if job.status not in TERMINAL:
+                self.cancel(job.id)
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._mirrors:
+            # Que el estado final ("cancelled") llegue al backend antes de cerrarlo
+            _, pending = await asyncio.wait(self._mirrors, timeout=2 * self.sync_s)
+            for mirror in pending:
+                mirror.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ---------- estado compartido entre workers ----------
+    async def _snapshot(self, job_id: str) -> dict | None:
+        if self.shared is None:
+            return None
+        raw = await self.shared.get(f"job:{job_id}")
+        return loads(raw) if raw is not None else None
+
+    async def _mirror(self, job: Job) -> None:
+        """
+        Publica el estado del trabajo mientras dure: tras cada cambio (una
+        ráfaga de progreso se publica una sola vez) y cada `sync_s`, cuando
+        además se revisa si otro worker pidió cancelarlo.
+        """
+        cancel_key = f"job-cancel:{job.id}"
+        while True:
+            changed = job.changed
+            try:
+                await self.shared.set(f"job:{job.id}", dumps(job.as_dict()), self.result_ttl)
+                if job.status in TERMINAL:
+                    return
+                if await self.shared.get(cancel_key) is not None:
+                    await self.shared.delete(cancel_key)
+                    self.cancel(job.id)
+            except Exception as e:
+                logger.warning("Job %s: shared state unavailable: %s", job.id, e)
+                if job.status in TERMINAL:
+                    return
+            try:
+                await asyncio.wait_for(changed.wait(), self.sync_s)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _watch_remote(self, job_id: str) -> AsyncIterator[dict]:
+        """`watch` de un trabajo de otro worker: consulta el estado publicado cada `sync_s`."""
+        last = None
+        while (state := await self._snapshot(job_id)) is not None:
+            seen = (state["status"], state["progress"], state["message"])
+            if seen != last:
+                last = seen
+                yield state
+            if state["status"] in TERMINAL:
+                return
+            await asyncio.sleep(self.sync_s)
+
+    # ---------- planificación ----------
+    def _dispatch(self) -> None:
+        """Arranca trabajos mientras haya hilos libres, respetando el cupo por cliente."""
+        skipped = []
+        while self._heap and self.running < self.workers:
+            entry = heapq.heappop(self._heap)
+            job = entry[2]
+            if job.status != "queued":
+                continue
+            if self._running.get(job.client, 0) >= self.per_client:
+                skipped.append(entry)
+                continue
+            self.queued -= 1
+            self.running += 1
+            self._running[job.client] = self._running.get(job.client, 0) + 1
+            job.status = "running"
+            job.started_at = time.monotonic()
+            job.task = asyncio.create_task(job.work(JobContext(self, job)))
+            # En un callback y no en un finally: una tarea cancelada antes de
+            # arrancar nunca ejecuta su cuerpo
+            job.task.add_done_callback(functools.partial(self._done, job))
+            job.notify()
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+
+    def _done(self, job: Job, task: asyncio.Task) -> None:
+        status = "error"
+        if task.cancelled():
+            status = "cancelled"
+        elif task.exception() is not None:
+            e = task.exception()
+            logger.error("Job %s (%s) failed", job.id, job.kind, exc_info=e)
+            job.error = str(e) or type(e).__name__
+        else:
+            result = task.result()
+            # Se guarda ya serializable para polling, SSE y WebSocket
+            job.result = result.model_dump(mode="json") if hasattr(result, "model_dump") else result
+            job.progress = 1.0
+            status = "done"
+
+        self._avg_run_s = 0.8 * self._avg_run_s + 0.2 * (time.monotonic() - job.started_at)
+        self._finish(job, status)
+        self._release(job)
+
+    def _thread_done(self, loop: asyncio.AbstractEventLoop, job: Job, future) -> None:
+        """Callback del pool (en el hilo del trabajo): vuelve al event loop."""
+        try:
+            loop.call_soon_threadsafe(self._left_executor, job)
+        except RuntimeError:
+            pass   # loop ya cerrado: la cola se está apagando
+
+    def _left_executor(self, job: Job) -> None:
+        job.in_executor -= 1
+        self._release(job)
+
+    def _release(self, job: Job) -> None:
+        """Libera el cupo cuando la tarea terminó y ningún hilo sigue calculando para ella."""
+        if job.in_executor or job.task is None or not job.task.done():
+            return
+        self.running -= 1
+        self._running[job.client] -= 1
+        if not self._running[job.client]:
+            del self._running[job.client]
+        self._dispatch()
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.work = None
+        job.finished_at = time.monotonic()
+        job.expires_at = job.finished_at + self.result_ttl
+        self._expiry.append(job)
+        self.completed += status == "done"
+        self._active[job.client] -= 1
+        if not self._active[job.client]:
+            del self._active[job.client]
+        job.notify()
+
+    def _progress(self, job: Job, fraction: float, message: str | None) -> None:
+        if job.status != "running":
+            return
+        job.progress = min(max(fraction, 0.0), 1.0)
+        if message is not None:
+            job.message = message
+        job.notify()
+
+    def _retry_after(self, ahead: int) -> float:
+        return math.ceil(self._avg_run_s * (ahead + 1) / self.workers)
+
+    def _purge(self) -> None:
+        """Quita resultados vencidos y, si hay demasiados, los terminados más antiguos."""
+        now = time.monotonic()
+        # _expiry está en orden de finalización, que es también el de vencimiento
+        while self._expiry and (self._expiry[0].expires_at <= now or len(self.jobs) > self.keep):
+            self.jobs.pop(self._expiry.popleft().id, None)
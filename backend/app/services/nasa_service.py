@@ -1,9 +1,58 @@
-from typing import List
-from app.domain.schemas import MeteorListItem
-from app.clients.nasa_client import NasaNeoClient
+import asyncio
+import functools
+from datetime import date, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List
+
+import numpy as np
+
+from app.core.config import settings
+from app.domain.neo_feed import to_items, top_k
+from app.domain.physics import batch
+from app.domain.physics.orbit import CloseApproaches, OrbitalElements, closeApproaches, dateToJd, jdToDatetime
+from app.domain.schemas import MeteorListItem, OrbitApproachItem
+from app.clients.nasa_client import CachedNasaNeoClient, NasaNeoClient
+
+# NASA /feed acepta como máximo 7 días por petición
+FEED_WINDOW_DAYS = 7
+
+
+def feed_windows(start: date, end: date, days: int = FEED_WINDOW_DAYS) -> List[tuple[str, str]]:
+    """Parte [start, end] (inclusivo) en ventanas consecutivas aceptadas por /feed."""
+    windows = []
+    current = start
+    while current <= end:
+        last = min(current + timedelta(days=days - 1), end)
+        windows.append((current.isoformat(), last.isoformat()))
+        current = last + timedelta(days=1)
+    return windows
+
+
+def approach_items(ids, names, diameters_km, found: CloseApproaches, limit: int | None = None) -> List[OrbitApproachItem]:
+    """
+    Acercamientos calculados localmente, con la física de impacto evaluada
+    en lote con la velocidad relativa de cada uno (impacto en tierra).
+    """
+    n = len(found) if limit is None else min(limit, len(found))
+    diameters_km = np.asarray(diameters_km, dtype=np.float64)[:n]
+    result = batch.simulate_impact_batch(diameters_km, found.relativeVelocity[:n], False)
+    return [
+        OrbitApproachItem(
+            id=int(ids[i]),
+            name=str(names[i]),
+            estimated_diameter_km=round(float(diameters_km[i]), 3),
+            close_approach_utc=jdToDatetime(float(found.jd[i])).isoformat(timespec="minutes"),
+            miss_distance_km=round(float(found.distanceKm[i]), 1),
+            velocity_km_s=round(float(found.relativeVelocity[i]), 3),
+            energy_in_megatons=round(float(result.energyInMegaTons[i]), 2),
+            seismic_magnitude=round(float(result.seismicMagnitude[i]), 2),
+            crater_diameter_m=round(float(result.finalCraterDiameter[i]) * 1000, 2),  # km → m
+        )
+        for i in range(n)
+    ]
+
 
 class NasaNeoService:
-    def __init__(self, client: NasaNeoClient | None = None):
+    def __init__(self, client: NasaNeoClient | CachedNasaNeoClient | None = None):
         self.client = client or NasaNeoClient()
 
     @staticmethod
@@ -13,30 +62,133 @@ class NasaNeoService:
         except (TypeError, ValueError):
             return 0.0
 
-    async def get_filtered_asteroids(self, start_date: str, end_date: str, limit: int = 10) -> List[MeteorListItem]:
-        data = await self.client.fetch_neo_feed(start_date, end_date)
-        results = []
-
+    @classmethod
+    def _earth_approaches(cls, data: dict) -> Iterator[tuple[dict, dict]]:
+        """Recorre un /feed y produce (asteroide, acercamiento) sin acumular."""
         for day, asteroids in data.get("near_earth_objects", {}).items():
             for asteroid in asteroids:
                 for approach in asteroid.get("close_approach_data", []):
                     if approach.get("orbiting_body") == "Earth":
-                        diam = asteroid["estimated_diameter"]["kilometers"]
-                        diameter_avg = (diam["estimated_diameter_min"] + diam["estimated_diameter_max"]) / 2
-
-                        results.append(MeteorListItem(
-                            id=int(asteroid["id"]),
-                            name=asteroid["name"],
-                            estimated_diameter_km=round(diameter_avg, 3),
-                            is_potentially_hazardous=asteroid["is_potentially_hazardous_asteroid"],
-                            close_approach_date_full=approach["close_approach_date_full"],
-                            velocity_km_s=self._parse_float(approach["relative_velocity"]["kilometers_per_second"]),
-                            miss_distance_km=self._parse_float(approach["miss_distance"]["kilometers"])
-                        ))
-
-        results.sort(key=lambda x: x.miss_distance_km)
-        return results[:limit]
-    
+                        yield asteroid, approach
+
+    @classmethod
+    def _to_item(cls, asteroid: dict, approach: dict) -> MeteorListItem:
+        diam = asteroid["estimated_diameter"]["kilometers"]
+        diameter_avg = (diam["estimated_diameter_min"] + diam["estimated_diameter_max"]) / 2
+
+        return MeteorListItem(
+            id=int(asteroid["id"]),
+            name=asteroid["name"],
+            estimated_diameter_km=round(diameter_avg, 3),
+            is_potentially_hazardous=asteroid["is_potentially_hazardous_asteroid"],
+            close_approach_date_full=approach["close_approach_date_full"],
+            velocity_km_s=cls._parse_float(approach["relative_velocity"]["kilometers_per_second"]),
+            miss_distance_km=cls._parse_float(approach["miss_distance"]["kilometers"])
+        )
+
+    @staticmethod
+    def local_approaches(orbital_data: dict, start: date, days: int | None = None,
+                         max_distance_au: float = 0.05) -> CloseApproaches:
+        """Acercamientos a la Tierra propagando `orbital_data` localmente, sin llamar a NASA."""
+        jd = dateToJd(start)
+        return closeApproaches(OrbitalElements.fromNasa([orbital_data]), jd, jd + (days or settings.ORBIT_HORIZON_DAYS),
+                               settings.ORBIT_STEP_DAYS, max_distance_au)
+
+    @classmethod
+    def _approach_for(cls, asteroid: dict, today: date | None = None) -> dict:
+        """
+        Acercamiento que alimenta la simulación: el próximo a la Tierra que
+        lista NASA; si no hay ninguno futuro, el más cercano de la
+        propagación local de `orbital_data`; como último recurso, el primero.
+        """
+        today = today or date.today()
+        upcoming = [a for a in asteroid.get("close_approach_data", [])
+                    if a.get("orbiting_body") == "Earth" and a.get("close_approach_date", "") >= today.isoformat()]
+        if upcoming:
+            return min(upcoming, key=lambda a: a["close_approach_date"])
+
+        orbital_data = asteroid.get("orbital_data")
+        if orbital_data:
+            try:
+                # Sin límite de distancia: interesa la velocidad del paso más cercano
+                found = cls.local_approaches(orbital_data, today, max_distance_au=float("inf"))
+            except (KeyError, TypeError, ValueError):
+                found = None
+            if found:
+                return {
+                    "close_approach_date_full": jdToDatetime(float(found.jd[0])).strftime("%Y-%b-%d %H:%M"),
+                    "relative_velocity": {"kilometers_per_second": float(found.relativeVelocity[0])},
+                    "miss_distance": {"kilometers": float(found.distanceKm[0])},
+                }
+        return asteroid["close_approach_data"][0]
+
+    async def get_filtered_asteroids(self, start_date: str, end_date: str, limit: int = 10) -> List[MeteorListItem]:
+        records = await self.client.fetch_feed_records(start_date, end_date)
+        # Solo los `limit` más cercanos se convierten en MeteorListItem
+        return to_items(top_k(records, limit))
+
+    def _window_fetch(self, name: str, cached: bool) -> Callable[[str, str], Awaitable]:
+        fetch = getattr(self.client, name)
+        if cached or not isinstance(self.client, CachedNasaNeoClient):
+            return fetch
+        return functools.partial(fetch, cache=False)
+
+    async def _iter_windows(self, start: date, end: date, concurrency: int, fetch: str,
+                            cached_windows: int) -> AsyncIterator:
+        """
+        Recorre un rango arbitrario en ventanas de 7 días, con a lo sumo
+        `concurrency` peticiones a /feed en vuelo. Cada ventana se produce
+        conforme llega (no en orden de fecha).
+
+        Solo las primeras `cached_windows` ventanas pasan por la caché: un
+        rango de un año son 53 ventanas que nadie vuelve a pedir y que, de
+        guardarse, desplazarían del LRU a las consultas frecuentes.
+        """
+        pending = enumerate(feed_windows(start, end))
+        in_flight: set[asyncio.Task] = set()
+        fetch_cached = self._window_fetch(fetch, cached=True)
+        fetch_direct = self._window_fetch(fetch, cached=False)
+
+        def launch() -> None:
+            window = next(pending, None)
+            if window is not None:
+                index, (first, last) = window
+                load = fetch_cached if index < cached_windows else fetch_direct
+                in_flight.add(asyncio.create_task(load(first, last)))
+
+        for _ in range(concurrency):
+            launch()
+        try:
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight.discard(task)
+                    result = task.result()
+                    launch()
+                    yield result
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def iter_feed_range(self, start: date, end: date, concurrency: int = 4,
+                              cached_windows: int = 2) -> AsyncIterator[MeteorListItem]:
+        """Cada acercamiento a la Tierra del rango, conforme llega su ventana."""
+        async for data in self._iter_windows(start, end, concurrency, "fetch_neo_feed", cached_windows):
+            for asteroid, approach in self._earth_approaches(data):
+                yield self._to_item(asteroid, approach)
+
+    async def get_closest_in_range(self, start: date, end: date, limit: int = 10,
+                                   concurrency: int = 4, cached_windows: int = 2) -> List[MeteorListItem]:
+        """
+        Los `limit` acercamientos más cercanos de todo el rango.
+        Tras cada ventana solo se conservan `limit` filas: memoria O(limit),
+        no O(acercamientos).
+        """
+        best = None
+        async for records in self._iter_windows(start, end, concurrency, "fetch_feed_records", cached_windows):
+            best = top_k(records if best is None else np.concatenate((best, records)), limit)
+        return [] if best is None else to_items(best)
+
     async def get_filtered_by_item(self, neo_id: int) -> MeteorListItem:
         """
         Obtiene un NEO por ID y lo normaliza a MeteorListItem.
@@ -45,13 +197,11 @@ class NasaNeoService:
        
         data = await self.client.fetch_neo_by_id(neo_id)
         asteroid = data  # /neo/{id} devuelve un único asteroide
-        print("llamado")
         # Diámetro promedio (km)
         diam_km = asteroid["estimated_diameter"]["kilometers"]
         diameter_avg = (diam_km["estimated_diameter_min"] + diam_km["estimated_diameter_max"]) / 2
 
-        # Tomamos el primer acercamiento directamente
-        approach = asteroid["close_approach_data"][0]
+        approach = self._approach_for(asteroid)
         close_approach_date_full = approach.get("close_approach_date_full", "")
         velocity_km_s = self._parse_float(approach["relative_velocity"]["kilometers_per_second"])
         miss_distance_km = self._parse_float(approach["miss_distance"]["kilometers"])
@@ -65,4 +215,28 @@ class NasaNeoService:
             close_approach_date_full=close_approach_date_full,
             velocity_km_s=velocity_km_s,
             miss_distance_km=miss_distance_km,
-        )
\ No newline at end of file
+        )
+
+    async def get_diameter_range(self, neo_id: int) -> dict:
+        """
+        Devuelve el rango de diámetro estimado (min/max, km) y la velocidad
+        del próximo acercamiento, sin promediar, para el modo Monte Carlo.
+        """
+        asteroid = await self.client.fetch_neo_by_id(neo_id)
+        diam_km = asteroid["estimated_diameter"]["kilometers"]
+        approach = self._approach_for(asteroid)
+        return {
+            "diameter_min_km": float(diam_km["estimated_diameter_min"]),
+            "diameter_max_km": float(diam_km["estimated_diameter_max"]),
+            "velocity_km_s": self._parse_float(approach["relative_velocity"]["kilometers_per_second"]),
+        }
+
+    async def get_orbit_approaches(self, neo_id: int, start: date, days: int,
+                                   max_distance_au: float) -> List[OrbitApproachItem]:
+        """Acercamientos futuros de un NEO a partir de su `orbital_data`, con su física de impacto."""
+        asteroid = await self.client.fetch_neo_by_id(neo_id)
+        diam = asteroid["estimated_diameter"]["kilometers"]
+        diameter_avg = (diam["estimated_diameter_min"] + diam["estimated_diameter_max"]) / 2
+        found = self.local_approaches(asteroid["orbital_data"], start, days, max_distance_au)
+        n = len(found)
+        return approach_items([asteroid["id"]] * n, [asteroid["name"]] * n, [diameter_avg] * n, found)
@@ -1,75 +1,273 @@
-from app.clients import usgs_client
-from app.domain.schemas import EarthquakeDetail, SimDetail
-from app.domain.physics import impact
+import asyncio
+import base64
+import logging
+from pathlib import Path
+from app.clients.resilience import CircuitOpenError
+from app.clients.usgs_client import UsgsClient
+from app.core.degraded import mark_degraded
+from app.core.metrics import PHYSICS_SECONDS
+from app.domain.schemas import (
+    BatchImpactInput, BatchImpactResponse, DamageRasterOut, EarthquakeDetail, EffectsResponse, EffectZoneOut,
+    EntryInput, EntryResponse, MonteCarloResponse, PercentileBand, SimDetail,
+)
+from app.domain.physics import batch, effects, entry, impact, montecarlo
+from app.domain.physics.impact import ImpactResult, ImpactScenario
+from app.domain.physics.lookup import ImpactTable
+from app.services.quake_catalog import QuakeCatalog
 import json
 
+logger = logging.getLogger(__name__)
+
+# ImpactBatchResult attribute -> BatchImpactResponse field
+BATCH_FIELDS = {
+    "energyInMegaTons": "energy_in_megatons",
+    "impactVelocity": "impact_velocity",
+    "finalCraterDiameter": "crater_diameter_m",
+    "finalCraterDepth": "crater_depth_m",
+    "seismicMagnitude": "seismic_magnitude",
+}
+
 
 class ImpactEarthquakeService:
-    def __init__(self, config_path: str = "config.json"):
-        self.config_path = config_path
+    def __init__(self, config_path: str | Path | None = None, usgs: UsgsClient | None = None,
+                 catalog: QuakeCatalog | None = None, table: ImpactTable | None = None):
+        self.config_path = Path(config_path) if config_path else impact.CONFIG_PATH
+        self.usgs = usgs or UsgsClient()
+        # Local USGS catalog; when present, earthquake lookups never hit the network
+        self.catalog = catalog
+        # Precomputed impact table for mode="table" batches (interactive sliders)
+        self.table = table
+        # Last USGS answer per magnitude (0.1 steps), served while USGS is unavailable
+        self.last_quakes: dict[float, EarthquakeDetail] = {}
+
+    def simulate(self, scenario: ImpactScenario | None = None) -> ImpactResult:
+        """
+        Runs the impact engine for the given scenario.
+        Without a scenario, the last input saved in config.json is used.
+        """
+        if scenario is None:
+            scenario = impact.load_scenario(self.config_path)
+        with PHYSICS_SECONDS.time(operation="impact"):
+            return impact.simulate_impact(scenario)
+
+    @staticmethod
+    def to_sim_detail(result: ImpactResult) -> SimDetail:
+        return SimDetail(
+            energy_in_megatons=round(result.energyInMegaTons, 2),
+            impact_velocity=round(result.impactVelocity, 2),
+            crater_diameter_m=round(result.finalCraterDiameter * 1000, 2),  # km → m
+            crater_depth_m=round(result.finalCraterDepth * 1000, 2)         # km → m
+        )
 
-    def run_simulation(self) -> SimDetail | None:
+    def run_simulation(self, scenario: ImpactScenario | None = None) -> SimDetail | None:
         """
         Runs the asteroid impact simulation and returns a SimDetail object.
         """
         try:
-            energy = impact.energyInMegaTons()
-            velocity = impact.impactVelocity()
-            crater_diameter = impact.finalCraterDiameter() * 1000  # km → m
-            crater_depth = impact.finalCraterDepthKm() * 1000      # km → m
-
-            return SimDetail(
-                energy_in_megatons=round(energy, 2),
-                impact_velocity=round(velocity, 2),
-                crater_diameter_m=round(crater_diameter, 2),
-                crater_depth_m=round(crater_depth, 2)
-            )
+            return self.to_sim_detail(self.simulate(scenario))
 
         except Exception as e:
-            print(f"Simulation error: {e}")
+            logger.exception("Simulation error: %s", e)
             return None
 
-    def get_related_earthquake(self, magnitude: float) -> EarthquakeDetail | None:
+    def run_batch(self, payload: BatchImpactInput) -> BatchImpactResponse:
         """
-        Queries the USGS API for a real earthquake close to the simulated magnitude.
+        Evaluates many scenarios in one vectorized pass.
+        Units and rounding match SimDetail. mode="table" interpolates on the
+        precomputed table (scenarios outside it use the formulas) and reports
+        the table's error bound; callers check `self.table` first.
         """
-        try:
-            result = usgs_client.get_earthquake_by_magnitude(magnitude)
-            if not result:
+        error_bound = None
+        if payload.mode == "table":
+            with PHYSICS_SECONDS.time(operation="batch_table"):
+                result = self.table.simulate(payload.diameters_km, payload.velocities_kms, payload.water)
+            error_bound = {BATCH_FIELDS[name]: bound for name, bound in self.table.errorBound.items()}
+        else:
+            with PHYSICS_SECONDS.time(operation="batch"):
+                result = batch.simulate_impact_batch(
+                    payload.diameters_km, payload.velocities_kms, payload.water
+                )
+        return BatchImpactResponse(
+            count=len(result),
+            energy_in_megatons=result.energyInMegaTons.round(2).tolist(),
+            impact_velocity=result.impactVelocity.round(2).tolist(),
+            crater_diameter_m=(result.finalCraterDiameter * 1000).round(2).tolist(),  # km → m
+            crater_depth_m=(result.finalCraterDepth * 1000).round(2).tolist(),        # km → m
+            seismic_magnitude=result.seismicMagnitude.round(2).tolist(),
+            error_bound=error_bound,
+        )
+
+    def run_monte_carlo(self, spec: montecarlo.MonteCarloSpec, samples: int,
+                        seed: int | None = None, progress=None) -> MonteCarloResponse:
+        """
+        Propagates the input uncertainty of `spec` and returns p5/p50/p95 bands.
+        CPU-bound: callers on the event loop should run it in a thread.
+        `progress(done, samples)` is forwarded to the sampler.
+        """
+        with PHYSICS_SECONDS.time(operation="montecarlo"):
+            result = montecarlo.run_monte_carlo(spec, samples, seed, progress=progress)
+
+        def band(b: montecarlo.PercentileBand, scale: float = 1.0) -> PercentileBand:
+            return PercentileBand(p5=round(b.p5 * scale, 2), p50=round(b.p50 * scale, 2), p95=round(b.p95 * scale, 2))
+
+        return MonteCarloResponse(
+            samples=result.samples,
+            seed=result.seed,
+            diameter_range_km=[spec.diameterMin, spec.diameterMax],
+            velocity_kms=spec.relativeVelocity,
+            energy_in_megatons=band(result.energyInMegaTons),
+            crater_diameter_m=band(result.finalCraterDiameter, 1000),  # km → m
+            crater_depth_m=band(result.finalCraterDepth, 1000),        # km → m
+            seismic_magnitude=band(result.seismicMagnitude),
+        )
+
+    def run_effects(self, scenario: ImpactScenario | None, lat: float | None = None, lon: float | None = None,
+                    raster: bool = False, grid_size: int = 128,
+                    half_width_km: float | None = None) -> EffectsResponse:
+        """
+        Damage radii for fireball, thermal, airblast and tsunami effects,
+        plus an optional quantized raster around (lat, lon).
+        """
+        result = self.simulate(scenario)
+        with PHYSICS_SECONDS.time(operation="effects"):
+            zones = effects.effect_zones(result)
+
+        raster_out = None
+        if raster and lat is not None and lon is not None:
+            with PHYSICS_SECONDS.time(operation="damage_raster"):
+                grid = effects.damage_raster(lat, lon, zones, half_width_km, grid_size)
+            raster_out = DamageRasterOut(
+                size=grid_size,
+                lat_min=grid.latMin, lat_max=grid.latMax,
+                lon_min=grid.lonMin, lon_max=grid.lonMax,
+                levels_b64=base64.b64encode(grid.levels.tobytes()).decode("ascii"),
+            )
+
+        return EffectsResponse(
+            lat=lat,
+            lon=lon,
+            energy_in_megatons=round(result.energyInMegaTons, 2),
+            zones=[
+                EffectZoneOut(effect=z.effect, label=z.label, threshold=round(z.threshold, 2), unit=z.unit,
+                              radius_km=round(z.radius, 3), severity=z.severity)
+                for z in zones
+            ],
+            raster=raster_out,
+        )
+
+    def run_entry(self, payload: EntryInput) -> EntryResponse:
+        """
+        Integrates the atmospheric entry of every body (drag, ablation,
+        pancake fragmentation) and reports breakup and airburst altitudes.
+        CPU-bound: callers on the event loop should run it in a thread.
+        """
+        with PHYSICS_SECONDS.time(operation="entry"):
+            result = entry.integrate_entries(
+                payload.diameters_km, payload.velocities_kms, payload.angle_deg, payload.density
+            )
+
+        def km_or_none(values):
+            return [None if v != v else round(v / 1000, 2) for v in values.tolist()]  # nan → None
+
+        response = EntryResponse(
+            count=result.breakupAltitude.size,
+            breakup_altitude_km=km_or_none(result.breakupAltitude),
+            airburst_altitude_km=km_or_none(result.airburstAltitude),
+            ground_velocity_kms=(result.groundVelocity / 1000).round(2).tolist(),
+            atmospheric_energy_mt=(result.atmosphericEnergy / effects.JOULES_PER_MT).round(4).tolist(),
+            converged=result.converged.tolist(),
+        )
+        if not result.converged.all():
+            logger.warning("Entry integration hit max_steps with %d of %d bodies in flight",
+                           int((~result.converged).sum()), result.converged.size)
+        if payload.profile:
+            response.altitudes_km = (result.altitudeBins / 1000).tolist()
+            response.energy_deposition_kt_per_km = result.energyDeposition.round(4).tolist()
+        return response
+
+    async def get_related_earthquake(self, magnitude: float) -> EarthquakeDetail | None:
+        """
+        Finds a real earthquake close to the simulated magnitude: from the
+        local catalog when one is loaded, otherwise from the USGS API.
+        When USGS fails, the last earthquake it returned for that magnitude
+        (rounded to 0.1) is used instead and the response is marked degraded.
+        """
+        if self.catalog is not None:
+            try:
+                row = self.catalog.closest_magnitude(magnitude)
+                return EarthquakeDetail(**self.catalog.record(row)) if row is not None else None
+            except Exception as e:
+                logger.warning("Error reading the earthquake catalog: %s", e)
                 return None
-            return EarthquakeDetail(**result)
+
+        bucket = round(magnitude, 1)
+        try:
+            result = await self.usgs.get_earthquake_by_magnitude(magnitude)
+        except CircuitOpenError:
+            mark_degraded("usgs")
+            return self.last_quakes.get(bucket)
         except Exception as e:
-            print(f"Error fetching earthquake data: {e}")
+            logger.warning("Error fetching earthquake data: %s", e)
+            mark_degraded("usgs")
+            return self.last_quakes.get(bucket)
+        if not result:
             return None
+        self.last_quakes[bucket] = detail = EarthquakeDetail(**result)
+        return detail
 
-    def run_combined(self):
+    async def get_related_earthquakes(self, magnitudes, concurrency: int = 8) -> dict[float, EarthquakeDetail | None]:
+        """
+        Fans out lookups for many magnitudes with bounded concurrency.
+        Duplicate magnitudes are looked up once; failures use the same
+        fallback as get_related_earthquake.
+        """
+        sem = asyncio.Semaphore(concurrency)
+        unique = list(dict.fromkeys(magnitudes))
+
+        async def one(magnitude: float) -> EarthquakeDetail | None:
+            async with sem:
+                return await self.get_related_earthquake(magnitude)
+
+        return dict(zip(unique, await asyncio.gather(*(one(m) for m in unique))))
+
+    async def attach_related_earthquakes(self, response: BatchImpactResponse,
+                                         concurrency: int = 8) -> BatchImpactResponse:
+        """
+        Adds one related earthquake per batch scenario. Magnitudes are
+        rounded to 0.1 first, so a batch of thousands of scenarios needs at
+        most a few dozen lookups.
+        """
+        buckets = [round(m, 1) for m in response.seismic_magnitude]
+        found = await self.get_related_earthquakes(buckets, concurrency)
+        response.related_earthquakes = [found[b] for b in buckets]
+        return response
+
+    async def run_combined(self, scenario: ImpactScenario | None = None):
         """
         Runs the impact simulation, derives its seismic effect,
         and finds a real earthquake with a similar magnitude.
         Returns a combined result dictionary.
+        The physics is cheap and runs inline; only the USGS lookup is awaited.
         """
-        simulation = self.run_simulation()
-        if not simulation:
-            return None
-
         try:
-            # Get seismic effect (Richter magnitude equivalent)
-            seismic_magnitude = impact.seismicEffect()
-
-            earthquake = self.get_related_earthquake(seismic_magnitude)
-
-            return {
-                "simulation": simulation.model_dump(),
-                "seismic_magnitude": round(seismic_magnitude, 2),
-                "related_earthquake": earthquake.model_dump() if earthquake else None
-            }
+            result = self.simulate(scenario)
         except Exception as e:
-            print(f"Combined service error: {e}")
+            logger.exception("Simulation error: %s", e)
             return None
 
-    def to_json(self):
+        # Seismic effect (Richter magnitude equivalent) comes from the same pass.
+        # Upstream failures do not reach here: the lookup falls back instead of raising
+        seismic_magnitude = result.seismicMagnitude
+        earthquake = await self.get_related_earthquake(seismic_magnitude)
+        return {
+            "simulation": self.to_sim_detail(result).model_dump(),
+            "seismic_magnitude": round(seismic_magnitude, 2),
+            "related_earthquake": earthquake.model_dump() if earthquake else None
+        }
+
+    async def to_json(self):
         """
         Returns the combined simulation + earthquake result as JSON.
         """
-        combined = self.run_combined()
+        combined = await self.run_combined()
         return json.dumps(combined, indent=2) if combined else None
@@ -0,0 +1,390 @@
+"""
+Catálogo histórico local de sismos de USGS.
+
+Un export de USGS (GeoJSON o CSV) se carga una vez a columnas de NumPy
+guardadas como .npy y abiertas con memmap, así que consultar el catálogo
+no toca la red y varios procesos comparten las mismas páginas.
+
+Índices:
+  - espacial: filas ordenadas por celda de `resolution_deg` grados con un
+    arreglo de offsets (CSR); una franja de celdas es un slice contiguo.
+  - magnitud: orden por (magnitud, tiempo) para búsquedas binarias.
+  - tiempo: orden por tiempo para ventanas [desde, hasta).
+
+La API en vivo queda como refresco incremental (`QuakeCatalogRefresher`).
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import math
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from app.clients.usgs_client import UsgsClient
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_RESOLUTION_DEG = 1.0
+
+# columnas de datos, en el orden del índice espacial
+COLUMNS = {
+    "id": "S16",
+    "place": "S80",        # UTF-8, truncado
+    "time_ms": np.int64,
+    "updated_ms": np.int64,
+    "mag": np.float32,
+    "lat": np.float64,
+    "lon": np.float64,
+    "depth_km": np.float32,
+}
+INDEXES = ("cell_offsets", "by_mag", "mag_sorted", "by_time", "time_sorted")
+
+
+def _iso_to_ms(value: str) -> int:
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+
+
+def _encode(text: str | None, width: int) -> bytes:
+    return (text or "").encode("utf-8")[:width]
+
+
+def records_from_geojson(data: dict) -> list[tuple]:
+    """Filas (id, lugar, tiempo, actualizado, mag, lat, lon, profundidad) de un FeatureCollection."""
+    rows = []
+    for feature in data.get("features", []):
+        props = feature.get("properties", {})
+        lon, lat, depth = (feature.get("geometry", {}).get("coordinates") or [None, None, None])[:3]
+        if props.get("mag") is None or lat is None or lon is None or props.get("time") is None:
+            continue
+        rows.append((feature.get("id"), props.get("place"), int(props["time"]),
+                     int(props.get("updated") or props["time"]), props["mag"], lat, lon, depth or 0.0))
+    return rows
+
+
+def records_from_csv(path: str | Path) -> list[tuple]:
+    """Mismas filas a partir del CSV de búsqueda de USGS (time, latitude, longitude, depth, mag, id, updated, place)."""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            if not r.get("mag") or not r.get("latitude") or not r.get("longitude"):
+                continue
+            time_ms = _iso_to_ms(r["time"])
+            rows.append((r["id"], r.get("place"), time_ms,
+                         _iso_to_ms(r["updated"]) if r.get("updated") else time_ms,
+                         float(r["mag"]), float(r["latitude"]), float(r["longitude"]),
+                         float(r["depth"] or 0.0)))
+    return rows
+
+
+def load_records(path: str | Path) -> list[tuple]:
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        return records_from_csv(path)
+    with path.open("r", encoding="utf-8") as f:
+        return records_from_geojson(json.load(f))
+
+
+class QuakeCatalog:
+    """Columnas + índices; inmutable: `merge` devuelve un catálogo nuevo."""
+
+    def __init__(self, arrays: dict[str, np.ndarray], resolution_deg: float = DEFAULT_RESOLUTION_DEG):
+        self.resolution_deg = resolution_deg
+        self.rows = math.ceil(180.0 / resolution_deg)
+        self.cols = math.ceil(360.0 / resolution_deg)
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    def __len__(self) -> int:
+        return int(self.mag.size)
+
+    @property
+    def latest_time_ms(self) -> int | None:
+        return int(self.time_sorted[-1]) if len(self) else None
+
+    # ---------- construcción ----------
+    def _cell(self, lat, lon):
+        row = np.clip(np.floor((np.asarray(lat) + 90.0) / self.resolution_deg), 0, self.rows - 1).astype(np.int64)
+        col = (np.floor((np.asarray(lon) + 180.0) / self.resolution_deg).astype(np.int64)) % self.cols
+        return row, col
+
+    def _cell_of(self, lat: float, lon: float) -> tuple[int, int]:
+        """Versión escalar de `_cell`, sin el costo de NumPy por llamada."""
+        row = min(max(math.floor((lat + 90.0) / self.resolution_deg), 0), self.rows - 1)
+        return row, math.floor((lon + 180.0) / self.resolution_deg) % self.cols
+
+    @classmethod
+    def from_records(cls, records: list[tuple], resolution_deg: float = DEFAULT_RESOLUTION_DEG) -> "QuakeCatalog":
+        """Deduplica por id (gana el `updated` más reciente) y construye los índices."""
+        latest: dict[str, tuple] = {}
+        for rec in records:
+            prev = latest.get(rec[0])
+            if prev is None or rec[3] >= prev[3]:
+                latest[rec[0]] = rec
+        rows = list(latest.values())
+
+        cols = {}
+        for i, (name, dtype) in enumerate(COLUMNS.items()):
+            if name in ("id", "place"):
+                width = np.dtype(dtype).itemsize
+                cols[name] = np.array([_encode(r[i], width) for r in rows], dtype=dtype)
+            else:
+                cols[name] = np.array([r[i] for r in rows], dtype=dtype)
+
+        catalog = cls({}, resolution_deg)
+        row, col = catalog._cell(cols["lat"], cols["lon"])
+        cell = row * catalog.cols + col
+        # orden espacial (celda, tiempo): cada celda es un bloque contiguo
+        order = np.lexsort((cols["time_ms"], cell))
+        arrays = {name: np.ascontiguousarray(values[order]) for name, values in cols.items()}
+        cell = cell[order]
+        arrays["cell_offsets"] = np.searchsorted(cell, np.arange(catalog.rows * catalog.cols + 1)).astype(np.int64)
+        arrays["by_mag"] = np.lexsort((arrays["time_ms"], arrays["mag"])).astype(np.int64)
+        arrays["mag_sorted"] = arrays["mag"][arrays["by_mag"]]
+        arrays["by_time"] = np.argsort(arrays["time_ms"], kind="stable").astype(np.int64)
+        arrays["time_sorted"] = arrays["time_ms"][arrays["by_time"]]
+        return cls(arrays, resolution_deg)
+
+    def records(self) -> list[tuple]:
+        return list(zip(
+            (i.decode() for i in self.id.tolist()), (p.decode("utf-8", "ignore") for p in self.place.tolist()),
+            self.time_ms.tolist(), self.updated_ms.tolist(), self.mag.tolist(),
+            self.lat.tolist(), self.lon.tolist(), self.depth_km.tolist(),
+        ))
+
+    def merge(self, records: list[tuple]) -> "QuakeCatalog":
+        """Catálogo nuevo con `records` incorporados (refresco incremental)."""
+        return QuakeCatalog.from_records(self.records() + records, self.resolution_deg)
+
+    # ---------- disco ----------
+    def save(self, path: str | Path) -> Path:
+        """
+        Escribe en un directorio temporal y reemplaza archivo por archivo con
+        os.replace: los memmaps abiertos conservan el inodo anterior.
+        """
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name in (*COLUMNS, *INDEXES):
+            np.save(tmp / f"{name}.npy", getattr(self, name))
+        (tmp / "meta.json").write_text(json.dumps({"resolution_deg": self.resolution_deg, "count": len(self)}))
+        path.mkdir(parents=True, exist_ok=True)
+        for entry in tmp.iterdir():
+            os.replace(entry, path / entry.name)
+        tmp.rmdir()
+        return path
+
+    @classmethod
+    def open(cls, path: str | Path) -> "QuakeCatalog":
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        # vista ndarray sobre el memmap: mismas páginas, sin el costo de la subclase np.memmap
+        arrays = {name: np.asarray(np.load(path / f"{name}.npy", mmap_mode="r")) for name in (*COLUMNS, *INDEXES)}
+        return cls(arrays, meta["resolution_deg"])
+
+    # ---------- consultas ----------
+    def record(self, i: int, distance_km: float | None = None) -> dict:
+        """Fila en el formato de EarthquakeDetail."""
+        out = {
+            "id": self.id[i].decode(),
+            "magnitude": round(float(self.mag[i]), 2),
+            "location": self.place[i].decode("utf-8", "ignore"),
+            "time_utc": datetime.fromtimestamp(int(self.time_ms[i]) / 1000, tz=timezone.utc)
+                                .replace(tzinfo=None).isoformat(),
+            "longitude": float(self.lon[i]),
+            "latitude": float(self.lat[i]),
+            "depth_km": float(self.depth_km[i]),
+        }
+        if distance_km is not None:
+            out["distance_km"] = round(distance_km, 3)
+        return out
+
+    def closest_magnitude(self, magnitude: float) -> int | None:
+        """
+        Fila con la magnitud más cercana; en empate se prefiere la mayor
+        y, dentro de la misma magnitud, el evento más reciente.
+        """
+        n = len(self)
+        if not n:
+            return None
+        m = self.mag_sorted
+        magnitude = m.dtype.type(magnitude)
+        i = int(np.searchsorted(m, magnitude))
+        if i == n or (i > 0 and magnitude - m[i - 1] < m[i] - magnitude):
+            i -= 1
+        last = int(np.searchsorted(m, m[i], side="right")) - 1
+        return int(self.by_mag[last])
+
+    def _spans(self, row_lo: int, row_hi: int, col_lo: int, col_hi: int) -> np.ndarray:
+        """Índices de las filas del catálogo en el rectángulo de celdas (columnas circulares)."""
+        offsets = self.cell_offsets
+        if col_hi - col_lo + 1 >= self.cols:
+            col_ranges = [(0, self.cols - 1)]
+        else:
+            lo, hi = col_lo % self.cols, col_hi % self.cols
+            col_ranges = [(lo, hi)] if lo <= hi else [(lo, self.cols - 1), (0, hi)]
+        parts = []
+        for row in range(max(row_lo, 0), min(row_hi, self.rows - 1) + 1):
+            base = row * self.cols
+            for c0, c1 in col_ranges:
+                start, end = offsets[base + c0], offsets[base + c1 + 1]
+                if end > start:
+                    parts.append(np.arange(start, end))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def _distance_km(self, lat0: float, lon0: float, idx: np.ndarray) -> np.ndarray:
+        phi0, phi = math.radians(lat0), np.radians(self.lat[idx])
+        dlmb = np.radians(self.lon[idx] - lon0)
+        a = np.sin((phi - phi0) / 2) ** 2 + math.cos(phi0) * np.cos(phi) * np.sin(dlmb / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def nearest(self, lat: float, lon: float, limit: int = 10, min_magnitude: float | None = None) -> list[tuple[int, float]]:
+        """
+        Los `limit` sismos más cercanos a (lat, lon) como (fila, distancia_km).
+        Se busca en cuadrados de celdas cada vez más grandes hasta que ningún
+        sismo fuera del cuadrado pueda estar más cerca que el k-ésimo hallado.
+        """
+        row0, col0 = self._cell_of(lat, lon)
+        res = self.resolution_deg
+        half = 1
+        while True:
+            idx = self._spans(row0 - half, row0 + half, col0 - half, col0 + half)
+            if min_magnitude is not None and idx.size:
+                idx = idx[self.mag[idx] >= min_magnitude]
+            covered = (row0 - half <= 0 and row0 + half >= self.rows - 1) and 2 * half + 1 >= self.cols
+            if idx.size >= limit or covered:
+                dist = self._distance_km(lat, lon, idx)
+                k = min(limit, idx.size)
+                best = np.argpartition(dist, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+                best = best[np.argsort(dist[best], kind="stable")]
+                # Cota inferior de la distancia a cualquier sismo fuera del cuadrado:
+                # |Δlat| > half·res, o |Δlon| > half·res (distancia a ese meridiano)
+                span = math.radians(half * res)
+                bound = EARTH_RADIUS_KM * min(
+                    span, math.asin(min(1.0, math.cos(math.radians(lat)) * math.sin(min(span, math.pi / 2))))
+                )
+                if covered or (k == limit and dist[best[-1]] <= bound):
+                    return [(int(idx[i]), float(dist[i])) for i in best]
+            half *= 2
+
+    def _time_window(self, since_ms: int | None, until_ms: int | None) -> tuple[int, int]:
+        lo = 0 if since_ms is None else int(np.searchsorted(self.time_sorted, since_ms, side="left"))
+        hi = len(self) if until_ms is None else int(np.searchsorted(self.time_sorted, until_ms, side="left"))
+        return lo, hi
+
+    def _in_window(self, idx: np.ndarray, since_ms: int | None, until_ms: int | None) -> np.ndarray:
+        if since_ms is None and until_ms is None:
+            return idx
+        t = self.time_ms[idx]
+        keep = np.ones(idx.size, dtype=bool)
+        if since_ms is not None:
+            keep &= t >= since_ms
+        if until_ms is not None:
+            keep &= t < until_ms
+        return idx[keep]
+
+    def largest_in_region(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                          since_ms: int | None = None, until_ms: int | None = None) -> int | None:
+        """
+        Sismo de mayor magnitud dentro del rectángulo (lon_min > lon_max cruza el antimeridiano).
+        Parte del índice más selectivo: la ventana de tiempo o las celdas del rectángulo.
+        """
+        row_lo, col_lo = self._cell_of(lat_min, lon_min)
+        row_hi, col_hi = self._cell_of(lat_max, lon_max)
+        if col_hi < col_lo or (col_hi == col_lo and lon_max < lon_min):
+            col_hi += self.cols
+        t_lo, t_hi = self._time_window(since_ms, until_ms)
+        cells = self.cell_offsets
+        # filas completas de celdas: cota superior barata de los candidatos espaciales
+        approx_space = sum(int(cells[(r + 1) * self.cols] - cells[r * self.cols])
+                           for r in range(max(row_lo, 0), min(row_hi, self.rows - 1) + 1))
+        if t_hi - t_lo < approx_space:
+            idx = np.asarray(self.by_time[t_lo:t_hi])
+        else:
+            idx = self._in_window(self._spans(row_lo, row_hi, col_lo, col_hi), since_ms, until_ms)
+        if not idx.size:
+            return None
+        lat, lon = self.lat[idx], self.lon[idx]
+        inside = (lat >= lat_min) & (lat <= lat_max)
+        inside &= ((lon >= lon_min) & (lon <= lon_max)) if lon_min <= lon_max else ((lon >= lon_min) | (lon <= lon_max))
+        idx = idx[inside]
+        if not idx.size:
+            return None
+        # empates: el más reciente
+        mags = self.mag[idx]
+        top = idx[mags == mags.max()]
+        return int(top[np.argmax(self.time_ms[top])])
+
+    def largest_within(self, lat: float, lon: float, radius_km: float,
+                       since_ms: int | None = None, until_ms: int | None = None) -> tuple[int, float] | None:
+        """Sismo de mayor magnitud a menos de `radius_km` de (lat, lon)."""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        cos_lat = math.cos(math.radians(lat))
+        polar = lat + dlat >= 90.0 or lat - dlat <= -90.0 or dlat / max(cos_lat, 1e-12) >= 180.0
+        dlon = 180.0 if polar else dlat / cos_lat
+        row_lo, col_lo = self._cell_of(max(lat - dlat, -90.0), lon - dlon)
+        row_hi, _ = self._cell_of(min(lat + dlat, 90.0), lon)
+        width = math.ceil(2 * dlon / self.resolution_deg) + 1
+        idx = self._in_window(self._spans(row_lo, row_hi, col_lo, col_lo + width), since_ms, until_ms)
+        dist = self._distance_km(lat, lon, idx)
+        idx, dist = idx[dist <= radius_km], dist[dist <= radius_km]
+        if not idx.size:
+            return None
+        mags = self.mag[idx]
+        top = np.flatnonzero(mags == mags.max())
+        best = top[np.argmax(self.time_ms[idx[top]])]
+        return int(idx[best]), float(dist[best])
+
+
+class QuakeCatalogRefresher:
+    """
+    Trae de la API de USGS los eventos posteriores al último del catálogo,
+    los incorpora y reemplaza el catálogo de `holder` (atributo `catalog`).
+    """
+
+    def __init__(self, holder, client: UsgsClient, path: str | Path, min_magnitude: float = 4.5):
+        self.holder = holder
+        self.client = client
+        self.path = Path(path)
+        self.min_magnitude = min_magnitude
+
+    async def refresh(self) -> int:
+        catalog: QuakeCatalog = self.holder.catalog
+        since = catalog.latest_time_ms
+        data = await self.client.fetch_events(since, self.min_magnitude)
+        rows = records_from_geojson(data)
+        if not rows:
+            return 0
+
+        def rebuild() -> QuakeCatalog:
+            catalog.merge(rows).save(self.path)
+            return QuakeCatalog.open(self.path)
+
+        # reconstruir ordena todo el catálogo: fuera del event loop
+        self.holder.catalog = await asyncio.to_thread(rebuild)
+        return len(rows)
+
+    async def run_forever(self, interval_s: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.exception("Quake catalog refresh error: %s", e)
+            await asyncio.sleep(interval_s)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera el catálogo local de sismos a partir de un export de USGS.")
+    parser.add_argument("source", help="export de USGS (.geojson/.json o .csv)")
+    parser.add_argument("out", help="directorio del catálogo")
+    parser.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION_DEG, help="grados por celda")
+    args = parser.parse_args()
+    catalog = QuakeCatalog.from_records(load_records(args.source), args.resolution)
+    print(f"{len(catalog)} sismos -> {catalog.save(args.out)}")
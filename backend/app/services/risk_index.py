@@ -0,0 +1,246 @@
+"""
+Índice de riesgo por consecuencias de impacto sobre el catálogo de NEOs.
+
+Un job en segundo plano recorre /neo/browse, calcula la física de impacto
+de cada objeto en lote (physics/batch.py) y guarda todo en un arreglo
+estructurado de NumPy, junto con sus elementos orbitales para buscar
+acercamientos futuros sin llamar a la API (physics/orbit.py). Para cada
+métrica se mantiene el orden descendente ya calculado, así que un top-k
+paginado es solo un slice.
+"""
+import asyncio
+import hashlib
+import logging
+
+import numpy as np
+
+from app.clients.nasa_client import CachedNasaNeoClient, NasaNeoClient
+from app.domain.physics import batch
+from app.domain.physics.orbit import CloseApproaches, OrbitalElements, closeApproaches
+
+logger = logging.getLogger(__name__)
+
+RISK_DTYPE = np.dtype([
+    ("id", np.int64),
+    ("name", "U40"),
+    ("diameter_km", np.float32),
+    ("velocity_kms", np.float32),
+    ("is_potentially_hazardous", np.bool_),
+    ("energy_in_megatons", np.float64),
+    ("seismic_magnitude", np.float32),
+    ("crater_diameter_m", np.float32),
+    ("fingerprint", np.uint64),
+    # elementos de `orbital_data` en el orden de ORBIT_FIELDS (a = 0: sin órbita)
+    ("orbit", np.float64, (8,)),
+])
+
+ORBIT_FIELDS = ("semi_major_axis", "eccentricity", "inclination", "ascending_node_longitude",
+                "perihelion_argument", "mean_anomaly", "epoch_osculation", "mean_motion")
+
+# métrica pública -> columna del arreglo
+METRICS = {
+    "energy": "energy_in_megatons",
+    "seismic": "seismic_magnitude",
+    "crater": "crater_diameter_m",
+}
+
+
+def _fingerprint(diameter_km: float, velocity_kms: float, hazardous: bool) -> int:
+    """Huella de las entradas de la física: si no cambia, no se recalcula."""
+    raw = f"{diameter_km:.9g}|{velocity_kms:.9g}|{int(hazardous)}".encode()
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little")
+
+
+def parse_browse_page(page: dict) -> list[tuple]:
+    """
+    Extrae (id, nombre, diámetro medio, velocidad, PHA) de una página de /neo/browse.
+    Se usa el acercamiento a la Tierra con menor distancia de paso;
+    los objetos sin acercamientos a la Tierra se omiten.
+    """
+    rows = []
+    for neo in page.get("near_earth_objects", []):
+        earth = [a for a in neo.get("close_approach_data", []) if a.get("orbiting_body") == "Earth"]
+        if not earth:
+            continue
+        closest = min(earth, key=lambda a: float(a["miss_distance"]["kilometers"]))
+        diam = neo["estimated_diameter"]["kilometers"]
+        rows.append((
+            int(neo["id"]),
+            neo["name"][:40],
+            (diam["estimated_diameter_min"] + diam["estimated_diameter_max"]) / 2,
+            float(closest["relative_velocity"]["kilometers_per_second"]),
+            bool(neo["is_potentially_hazardous_asteroid"]),
+        ))
+    return rows
+
+
+def parse_browse_orbits(page: dict) -> list[tuple[int, tuple]]:
+    """(id, elementos) de cada objeto de una página de /neo/browse que trae `orbital_data`."""
+    rows = []
+    for neo in page.get("near_earth_objects", []):
+        data = neo.get("orbital_data")
+        if not data:
+            continue
+        try:
+            rows.append((int(neo["id"]), tuple(float(data[f]) for f in ORBIT_FIELDS)))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return rows
+
+
+class RiskIndex:
+    """
+    Arreglo estructurado + órdenes por métrica. Las actualizaciones
+    (`upsert`) solo recalculan la física de filas nuevas o cambiadas.
+    """
+
+    def __init__(self):
+        self._buf = np.zeros(1024, dtype=RISK_DTYPE)
+        self._size = 0
+        self._orders: dict[str, np.ndarray] = {}
+        self._dirty = False
+        self.version = 0
+        self._rows: dict[int, int] = {}   # id -> fila
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def table(self) -> np.ndarray:
+        return self._buf[:self._size]
+
+    def _grow(self, extra: int) -> None:
+        """Capacidad geométrica: agregar páginas sucesivas es O(1) amortizado."""
+        needed = self._size + extra
+        if needed > self._buf.size:
+            buf = np.zeros(max(needed, self._buf.size * 2), dtype=RISK_DTYPE)
+            buf[:self._size] = self.table
+            self._buf = buf
+
+    def upsert(self, rows: list[tuple]) -> int:
+        """Inserta o actualiza objetos; devuelve cuántos se recalcularon."""
+        fresh = {}
+        for neo_id, name, diameter, velocity, hazardous in rows:
+            fp = _fingerprint(diameter, velocity, hazardous)
+            row = self._rows.get(neo_id)
+            if row is not None and self._buf["fingerprint"][row] == fp:
+                continue
+            fresh[neo_id] = (neo_id, name, diameter, velocity, hazardous, fp)
+        if not fresh:
+            return 0
+
+        changed = np.array(list(fresh.values()),
+                           dtype=[("id", np.int64), ("name", "U40"), ("diameter_km", np.float64),
+                                  ("velocity_kms", np.float64), ("hazardous", np.bool_), ("fp", np.uint64)])
+        # Para ordenar por consecuencias se supone impacto en tierra
+        result = batch.simulate_impact_batch(changed["diameter_km"], changed["velocity_kms"], False)
+
+        new_ids = [i for i in fresh if i not in self._rows]
+        if new_ids:
+            self._grow(len(new_ids))
+            for neo_id in new_ids:
+                self._rows[neo_id] = self._size
+                self._size += 1
+
+        table = self.table
+        target = np.fromiter((self._rows[i] for i in changed["id"]), dtype=np.int64, count=changed.size)
+        table["id"][target] = changed["id"]
+        table["name"][target] = changed["name"]
+        table["diameter_km"][target] = changed["diameter_km"]
+        table["velocity_kms"][target] = changed["velocity_kms"]
+        table["is_potentially_hazardous"][target] = changed["hazardous"]
+        table["fingerprint"][target] = changed["fp"]
+        table["energy_in_megatons"][target] = result.energyInMegaTons
+        table["seismic_magnitude"][target] = result.seismicMagnitude
+        table["crater_diameter_m"][target] = result.finalCraterDiameter * 1000  # km → m
+
+        # El orden se recalcula una vez, en la siguiente consulta
+        self._dirty = True
+        self.version += 1
+        return changed.size
+
+    def set_orbits(self, rows: list[tuple[int, tuple]]) -> int:
+        """Guarda los elementos orbitales de objetos ya indexados; devuelve cuántos."""
+        known = [(self._rows[neo_id], elements) for neo_id, elements in rows if neo_id in self._rows]
+        if known:
+            target, elements = zip(*known)
+            self.table["orbit"][list(target)] = elements
+        return len(known)
+
+    @property
+    def with_orbits(self) -> int:
+        return int(np.count_nonzero(self.table["orbit"][:, 0] > 0))
+
+    def screen_approaches(self, jd_start: float, jd_end: float, step: float = 1.0,
+                          max_distance_au: float = 0.05) -> tuple[np.ndarray, CloseApproaches]:
+        """
+        Acercamientos futuros de todo el catálogo propagando las órbitas
+        localmente, sin llamar a NASA. Devuelve las filas del índice (una por
+        acercamiento) y los acercamientos en el mismo orden.
+        """
+        table = self.table
+        with_orbit = np.flatnonzero(table["orbit"][:, 0] > 0)
+        orbit = table["orbit"][with_orbit]
+        elements = OrbitalElements.fromArrays(*orbit.T)
+        found = closeApproaches(elements, jd_start, jd_end, step, max_distance_au)
+        return table[with_orbit[found.index]], found
+
+    def order(self, metric: str) -> np.ndarray:
+        if self._dirty or metric not in self._orders:
+            table = self.table
+            # estable: los empates conservan el orden de inserción
+            self._orders = {m: np.argsort(-table[col], kind="stable") for m, col in METRICS.items()}
+            self._dirty = False
+        return self._orders[metric]
+
+    def top(self, metric: str, limit: int = 10, offset: int = 0) -> np.ndarray:
+        """Filas [offset, offset + limit) del ranking por `metric`."""
+        return self.table[self.order(metric)[offset:offset + limit]]
+
+
+class RiskIndexRefresher:
+    """Job que recorre /neo/browse y alimenta el índice página por página."""
+
+    def __init__(self, index: RiskIndex, client: NasaNeoClient | CachedNasaNeoClient,
+                 max_pages: int = 50, page_size: int = 20, concurrency: int = 4):
+        self.index = index
+        self.client = client
+        self.max_pages = max_pages
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.last_updated = 0
+
+    def ingest(self, page: dict) -> int:
+        updated = self.index.upsert(parse_browse_page(page))
+        self.index.set_orbits(parse_browse_orbits(page))
+        return updated
+
+    async def refresh(self) -> int:
+        """Una pasada sobre el catálogo; devuelve cuántos objetos cambiaron."""
+        sem = asyncio.Semaphore(self.concurrency)
+        first = await self.client.fetch_neo_browse(0, self.page_size)
+        total_pages = first.get("page", {}).get("total_pages", 1)
+        pages = min(self.max_pages, total_pages) if self.max_pages else total_pages
+
+        async def fetch(page: int) -> dict:
+            async with sem:
+                return await self.client.fetch_neo_browse(page, self.page_size)
+
+        updated = self.ingest(first)
+        for next_page in asyncio.as_completed([fetch(p) for p in range(1, pages)]):
+            try:
+                updated += self.ingest(await next_page)
+            except Exception as e:
+                logger.warning("Risk index page error: %s", e)
+        # Ordenar aquí, fuera del camino de las peticiones
+        self.index.order("energy")
+        self.last_updated = updated
+        return updated
+
+    async def run_forever(self, interval_s: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.exception("Risk index refresh error: %s", e)
+            await asyncio.sleep(interval_s)
@@ -0,0 +1,72 @@
+import logging
+import uuid
+from typing import Any
+
+from app.core.config import settings
+from app.core.serialization import dumps, loads
+from app.core.shared_state import InProcessStateBackend, StateBackend, build_state_backend
+
+SCENARIO_COOKIE = "scenario_id"
+
+logger = logging.getLogger(__name__)
+
+
+class ScenarioStore:
+    """
+    Escenarios de simulación por sesión. `/nasa/input` guarda la entrada
+    y devuelve un `scenario_id`; `/impact/combined` la recupera con ese id.
+    Reemplaza el viaje de ida y vuelta por config.json: nada toca disco.
+
+    Con un backend compartido (sqlite o redis) cualquier worker encuentra el
+    escenario que guardó otro, incluido el "último" para clientes sin id.
+    """
+
+    def __init__(self, backend: StateBackend, ttl: float | None = None, prefix: str = "scenario:"):
+        self.backend = backend
+        self.ttl = ttl or settings.SCENARIO_TTL_S
+        self.prefix = prefix
+        # Fuera del espacio de los ids: ningún scenario_id puede apuntar a esta clave
+        self.last_key = f"{prefix.rstrip(':')}-meta:last"
+
+    async def save(self, config: dict[str, Any], scenario_id: str | None = None) -> str:
+        scenario_id = scenario_id or uuid.uuid4().hex
+        await self.backend.set(self.prefix + scenario_id, dumps(config), self.ttl)
+        return scenario_id
+
+    async def get(self, scenario_id: str) -> dict | None:
+        raw = await self.backend.get(self.prefix + scenario_id)
+        if raw is None:
+            return None
+        try:
+            config = loads(raw)
+        except ValueError:
+            logger.warning("Scenario %s is not valid JSON; ignored", scenario_id)
+            return None
+        return config if isinstance(config, dict) else None
+
+    async def delete(self, scenario_id: str) -> None:
+        await self.backend.delete(self.prefix + scenario_id)
+
+    async def set_last(self, scenario_id: str) -> None:
+        """Recuerda el escenario más reciente, para clientes que no envían el suyo."""
+        await self.backend.set(self.last_key, scenario_id.encode(), self.ttl)
+
+    async def last(self) -> str | None:
+        raw = await self.backend.get(self.last_key)
+        return raw.decode() if raw is not None else None
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+
+def build_scenario_backend(state: StateBackend | None = None) -> StateBackend:
+    """
+    SCENARIO_BACKEND, o STATE_BACKEND si no se indica. Si coincide con el
+    de `state` (el backend compartido de la aplicación) se reutiliza ese.
+    """
+    kind = settings.SCENARIO_BACKEND or settings.STATE_BACKEND
+    if kind == "memory":
+        return InProcessStateBackend(settings.SCENARIO_MAX)
+    if state is not None and state.shared and kind == settings.STATE_BACKEND:
+        return state
+    return build_state_backend(kind)
@@ -0,0 +1,131 @@
+"""
+Barridos de parámetros (diámetro × velocidad × tipo de blanco) en un
+ProcessPoolExecutor.
+
+La malla se parte en trozos de índices planos; cada proceso evalúa su
+trozo con la física vectorizada y devuelve los bytes ya codificados
+(NDJSON o float32 crudos), así que el event loop solo reenvía datos y
+sigue respondiendo mientras corre el barrido. Cada barrido tiene un id
+para consultar su progreso o cancelarlo.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.domain.physics.sweep import SweepGrid, evaluate_chunk
+
+
+@dataclass
+class SweepProgress:
+    id: str
+    total: int
+    done: int = 0
+    status: str = "running"    # "running" | "done" | "cancelled" | "error"
+    started_at: float = field(default_factory=time.monotonic)
+    cancelled: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def as_dict(self) -> dict:
+        return {
+            "sweep_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "elapsed_s": round(time.monotonic() - self.started_at, 3),
+        }
+
+
+class SweepRunner:
+    """
+    Pool de procesos compartido por todos los barridos de la app.
+    Se crea al primer barrido; con "spawn" los procesos hijos no heredan
+    el event loop ni los sockets del servidor.
+    """
+
+    def __init__(self, workers: int | None = None, keep: int = 256):
+        self.workers = workers or settings.SWEEP_WORKERS or os.cpu_count() or 1
+        self.keep = keep
+        self.sweeps: OrderedDict[str, SweepProgress] = OrderedDict()
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def start(self, grid: SweepGrid) -> SweepProgress:
+        progress = SweepProgress(uuid.uuid4().hex, len(grid))
+        self.sweeps[progress.id] = progress
+        # Solo se recuerdan los últimos `keep` barridos
+        while len(self.sweeps) > self.keep:
+            oldest = next(iter(self.sweeps.values()))
+            if oldest.status == "running":
+                break
+            self.sweeps.popitem(last=False)
+        return progress
+
+    def get(self, sweep_id: str) -> SweepProgress | None:
+        return self.sweeps.get(sweep_id)
+
+    def cancel(self, sweep_id: str) -> bool:
+        progress = self.sweeps.get(sweep_id)
+        if progress is None or progress.status != "running":
+            return False
+        progress.cancelled.set()
+        return True
+
+    async def stream(self, progress: SweepProgress, grid: SweepGrid, chunk_size: int,
+                     fmt: str = "binary") -> AsyncIterator[bytes]:
+        """
+        Trozos codificados en orden. Hay a lo sumo 2 × workers trozos en vuelo,
+        de modo que la memoria no depende del tamaño de la malla; si el cliente
+        se desconecta o se cancela el barrido, los trozos pendientes se descartan.
+        """
+        loop = asyncio.get_running_loop()
+        chunks = iter(grid.chunks(chunk_size))
+        pending: deque[tuple[int, asyncio.Future]] = deque()
+
+        def submit() -> None:
+            while len(pending) < 2 * self.workers:
+                bounds = next(chunks, None)
+                if bounds is None:
+                    return
+                lo, hi = bounds
+                pending.append((hi - lo, loop.run_in_executor(self.pool, evaluate_chunk, grid, lo, hi, fmt)))
+
+        try:
+            submit()
+            while pending:
+                if progress.cancelled.is_set():
+                    progress.status = "cancelled"
+                    return
+                count, future = pending.popleft()
+                data = await future
+                progress.done += count
+                submit()
+                yield data
+            progress.status = "done"
+        except asyncio.CancelledError:
+            progress.status = "cancelled"
+            raise
+        except Exception:
+            progress.status = "error"
+            raise
+        finally:
+            if progress.status == "running":
+                # generador cerrado por el servidor (cliente desconectado)
+                progress.status = "cancelled"
+            for _, future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
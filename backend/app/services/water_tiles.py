@@ -0,0 +1,208 @@
+"""
+Caché geoespacial de agua/tierra para IsItWater.
+
+Las coordenadas se ajustan a una cuadrícula de `resolution_deg` grados y
+cada celda se consulta a la API una sola vez (en el centro de la celda).
+Los resultados viven en un LRU en memoria y, opcionalmente, en SQLite
+para sobrevivir reinicios. En modo offline se responde desde un ráster
+local de bits (ver `build_water_raster`) sin ninguna llamada de red; en
+modo normal el ráster es el respaldo cuando la API falla (respuesta
+degradada, el resultado no se guarda como celda resuelta).
+"""
+import argparse
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from app.clients.isist_client import IsItWaterClient
+from app.core.cache import AsyncTTLCache
+from app.core.degraded import mark_degraded
+
+
+def tile_key(lat: float, lon: float, resolution_deg: float) -> tuple[int, int]:
+    """Índices (fila, columna) de la celda que contiene el punto."""
+    return (math.floor((lat + 90.0) / resolution_deg), math.floor((lon + 180.0) / resolution_deg))
+
+
+def tile_center(key: tuple[int, int], resolution_deg: float) -> tuple[float, float]:
+    row, col = key
+    lat = min(-90.0 + (row + 0.5) * resolution_deg, 90.0)
+    lon = -180.0 + (col + 0.5) * resolution_deg
+    return lat, (lon + 180.0) % 360.0 - 180.0
+
+
+class SqliteTileStore:
+    """
+    Persistencia de celdas ya resueltas; una tabla por resolución.
+    Los métodos bloquean (autocommit, un commit por `put`): desde el event
+    loop se llaman con asyncio.to_thread.
+    """
+
+    def __init__(self, path: str | Path, resolution_deg: float):
+        self.path = str(path)
+        self.table = f"tiles_{round(resolution_deg * 1e6)}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(row INTEGER NOT NULL, col INTEGER NOT NULL, water INTEGER NOT NULL, PRIMARY KEY (row, col))"
+        )
+
+    def get(self, key: tuple[int, int]) -> bool | None:
+        with self._lock:
+            found = self._conn.execute(
+                f"SELECT water FROM {self.table} WHERE row = ? AND col = ?", key
+            ).fetchone()
+        return None if found is None else bool(found[0])
+
+    def put(self, key: tuple[int, int], water: bool) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (row, col, water) VALUES (?, ?, ?)",
+                (*key, int(water)),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class WaterRaster:
+    """
+    Ráster global de agua (bit = 1) empaquetado con np.packbits y abierto
+    con memmap, de modo que varios procesos comparten las mismas páginas.
+    Fila 0 corresponde a -90° de latitud y columna 0 a -180° de longitud.
+    """
+
+    def __init__(self, path: str | Path):
+        self.bits = np.load(path, mmap_mode="r")
+        self.rows = self.bits.shape[0]
+        self.resolution_deg = 180.0 / self.rows
+        self.cols = round(360.0 / self.resolution_deg)
+
+    def is_water(self, lat: float, lon: float) -> bool:
+        row, col = tile_key(lat, lon, self.resolution_deg)
+        row = min(max(row, 0), self.rows - 1)
+        col %= self.cols
+        return bool((self.bits[row, col >> 3] >> (7 - (col & 7))) & 1)
+
+
+def build_water_raster(land_path: str | Path, resolution_deg: float, out_path: str | Path) -> Path:
+    """
+    Rasteriza polígonos de tierra (p. ej. Natural Earth `ne_10m_land.shp`)
+    a un archivo .npy de bits. Requiere geopandas y shapely.
+    """
+    import geopandas as gpd
+    import shapely
+
+    land = shapely.union_all(gpd.read_file(land_path).geometry.values)
+    shapely.prepare(land)
+
+    rows, cols = round(180.0 / resolution_deg), round(360.0 / resolution_deg)
+    lons = -180.0 + (np.arange(cols) + 0.5) * resolution_deg
+    packed = np.empty((rows, (cols + 7) // 8), dtype=np.uint8)
+    for row in range(rows):
+        lat = -90.0 + (row + 0.5) * resolution_deg
+        on_land = shapely.contains_xy(land, lons, np.full(cols, lat))
+        packed[row] = np.packbits(~on_land)
+
+    out_path = Path(out_path)
+    np.save(out_path, packed)
+    return out_path
+
+
+class WaterTileCache:
+    """
+    Resuelve agua/tierra por celda: LRU en memoria → SQLite (opcional)
+    → API IsItWater. Con `offline=True` solo usa el ráster local; si no,
+    el ráster (cuando hay) responde mientras la API falla.
+    """
+
+    def __init__(
+        self,
+        client: IsItWaterClient | None = None,
+        resolution_deg: float = 0.01,
+        maxsize: int = 100_000,
+        store: SqliteTileStore | None = None,
+        raster: WaterRaster | None = None,
+        offline: bool = False,
+        latency_window: int = 10_000,
+    ):
+        if offline and raster is None:
+            raise ValueError("offline mode needs a WaterRaster")
+        self.client = client or IsItWaterClient()
+        self.resolution_deg = resolution_deg
+        self.store = store
+        self.raster = raster
+        self.offline = offline
+        self.lru = AsyncTTLCache(maxsize=maxsize, ttl=math.inf)
+        self.store_hits = 0
+        self.raster_hits = 0
+        self.api_calls = 0
+        self.fallbacks = 0
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    async def is_water(self, lat: float, lon: float) -> bool:
+        start = time.perf_counter()
+        try:
+            if self.offline:
+                self.raster_hits += 1
+                return self.raster.is_water(lat, lon)
+            key = tile_key(lat, lon, self.resolution_deg)
+            try:
+                return await self.lru.get_or_load(key, lambda: self._load(key))
+            except Exception:
+                if self.raster is None:
+                    raise
+                self.fallbacks += 1
+                mark_degraded("isitwater")
+                return self.raster.is_water(lat, lon)
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+
+    async def _load(self, key: tuple[int, int]) -> bool:
+        if self.store is not None:
+            found = await asyncio.to_thread(self.store.get, key)
+            if found is not None:
+                self.store_hits += 1
+                return found
+
+        lat, lon = tile_center(key, self.resolution_deg)
+        self.api_calls += 1
+        data = await self.client.fetch_is_water(lat, lon)
+        water = bool(data.get("water", False))
+        if self.store is not None:
+            await asyncio.to_thread(self.store.put, key, water)
+        return water
+
+    def stats(self) -> dict:
+        lat_ms = np.asarray(self._latencies) * 1000
+        lookups = len(self._latencies)
+        return {
+            "resolution_deg": self.resolution_deg,
+            "offline": self.offline,
+            "size": len(self.lru),
+            "memory": self.lru.stats.as_dict(),
+            "store_hits": self.store_hits,
+            "raster_hits": self.raster_hits,
+            "api_calls": self.api_calls,
+            "fallbacks": self.fallbacks,
+            "api_ratio": round(self.api_calls / lookups, 4) if lookups else 0.0,
+            "p50_ms": round(float(np.percentile(lat_ms, 50)), 4) if lookups else None,
+            "p99_ms": round(float(np.percentile(lat_ms, 99)), 4) if lookups else None,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera el ráster offline de agua/tierra.")
+    parser.add_argument("land", help="polígonos de tierra (shapefile/GeoPackage)")
+    parser.add_argument("out", help="archivo .npy de salida")
+    parser.add_argument("--resolution", type=float, default=0.05, help="grados por celda")
+    args = parser.parse_args()
+    print(build_water_raster(args.land, args.resolution, args.out))
@@ -0,0 +1,102 @@
+"""
+Many impact sites for one asteroid: N calls to POST /api/nasa/input (one
+IsItWater lookup, one NASA lookup and one saved scenario each) against one
+POST /api/nasa/input/bulk with the same N sites, on the real app served by
+uvicorn against the local fake upstreams.
+
+Sites are random, with --repeat of them duplicated, and each variant gets a
+fresh app so neither warms the water cache for the other. With --fail-rate
+the fake IsItWater answers that fraction of coordinates with a 503; the
+bulk response should report them as failed sites and still return the rest.
+
+    cd backend
+    python -m benchmarks.bench_bulk --sites 500 --latency 0.05
+    python -m benchmarks.bench_bulk --sites 200 --fail-rate 0.1
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.fake_upstreams import serve
+
+PORTS = {"nasa": 8731, "isitwater": 8732, "app": 8733}
+NEO_ID = 3_542_519
+
+
+def make_sites(n: int, repeat: float, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    sites = [{"lat": round(rng.uniform(-60, 60), 4), "lon": round(rng.uniform(-180, 180), 4)}
+             for _ in range(n - int(n * repeat))]
+    sites += [rng.choice(sites) for _ in range(n - len(sites))]
+    rng.shuffle(sites)
+    return sites
+
+
+async def one_by_one(base: str, sites: list[dict], concurrency: int) -> dict:
+    limit = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(timeout=120) as client:
+        async def post(site: dict) -> int:
+            async with limit:
+                body = {"is_custom": False, "nasa_id": NEO_ID, **site}
+                try:
+                    return (await client.post(f"{base}/api/nasa/input", json=body)).status_code
+                except httpx.HTTPError:
+                    # /input does not handle IsItWater errors: the connection drops
+                    return 0
+
+        start = time.perf_counter()
+        codes = await asyncio.gather(*(post(s) for s in sites))
+        elapsed = time.perf_counter() - start
+        stats = (await client.get(f"{base}/api/nasa/water/stats")).json()
+    return {"ms": elapsed * 1000, "failed": sum(c != 200 for c in codes), "api_calls": stats["api_calls"]}
+
+
+async def bulk(base: str, sites: list[dict]) -> dict:
+    async with httpx.AsyncClient(timeout=120) as client:
+        start = time.perf_counter()
+        response = await client.post(f"{base}/api/nasa/input/bulk", json={"nasa_id": NEO_ID, "sites": sites})
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        body = response.json()
+        stats = (await client.get(f"{base}/api/nasa/water/stats")).json()
+    return {"ms": elapsed * 1000, "failed": body["failed"], "api_calls": stats["api_calls"],
+            "unique_sites": body["unique_sites"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=500)
+    parser.add_argument("--repeat", type=float, default=0.2, help="fraction of duplicated sites")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated upstream latency (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of coordinates IsItWater rejects")
+    parser.add_argument("--concurrency", type=int, default=16, help="client concurrency for /input")
+    args = parser.parse_args()
+
+    sites = make_sites(args.sites, args.repeat)
+    fake_env = {"FAKE_LATENCY_S": str(args.latency), "FAKE_WATER_FAIL_RATE": str(args.fail_rate)}
+    print(f"{args.sites} sites ({args.repeat:.0%} repeated), upstream latency {args.latency}s, "
+          f"fail rate {args.fail_rate:.0%}")
+    with serve("benchmarks.fake_upstreams:make_nasa_app", PORTS["nasa"], fake_env, factory=True) as nasa, \
+         serve("benchmarks.fake_upstreams:make_isitwater_app", PORTS["isitwater"], fake_env, factory=True) as water:
+        app_env = {"NASA_API_KEY": "bench", "ISITWATER_API_KEY": "bench", "NASA_BASE_URL": nasa,
+                   "ISITWATER_BASE_URL": f"{water}/", "WATER_BULK_CONCURRENCY": str(args.concurrency),
+                   # The fake 503s are permanent: retrying them would only add wall time
+                   "HTTP_MAX_RETRIES": "0"}
+        results = {}
+        for label, run in (("input x N", lambda base: one_by_one(base, sites, args.concurrency)),
+                           ("bulk", lambda base: bulk(base, sites))):
+            with serve("app.main:app", PORTS["app"], app_env) as base:
+                results[label] = asyncio.run(run(base))
+
+    print(f"\n{'':<10} {'wall':>10} {'IsItWater calls':>16} {'failed sites':>13}")
+    for label, r in results.items():
+        print(f"{label:<10} {r['ms']:7.0f} ms {r['api_calls']:>16} {r['failed']:>13}")
+    print(f"\nspeedup {results['input x N']['ms'] / results['bulk']['ms']:.1f}x, "
+          f"{results['bulk']['unique_sites']} distinct sites")
+
+
+if __name__ == "__main__":
+    main()
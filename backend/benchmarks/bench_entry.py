@@ -0,0 +1,53 @@
+"""
+Atmospheric entry throughput: trajectories per second on one core and
+with the process pool.
+
+    cd backend
+    python -m benchmarks.bench_entry --bodies 20000 --workers 1 2 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from app.domain.physics.entry import integrate_entries, integrate_entries_parallel
+
+
+def population(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(0.005, 0.3, n),      # km
+        rng.uniform(5, 30, n),           # km/s
+        np.degrees(np.arcsin(np.sqrt(rng.uniform(0.05, 1, n)))),  # isotropic entry angle
+        rng.uniform(2000, 3500, n),      # kg/m^3
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bodies", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    bodies = population(args.bodies, args.seed)
+    integrate_entries(*(b[:64] for b in bodies))  # warm-up
+
+    start = time.perf_counter()
+    result = integrate_entries(*bodies)
+    single = time.perf_counter() - start
+    print(f"bodies={args.bodies} cpus={os.cpu_count()} steps={result.steps} "
+          f"airbursts={result.isAirburst.mean():.1%}")
+    print(f"{'in-process':>12}: {single * 1000:9.1f} ms  {args.bodies / single:12,.0f} traj/s")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        pooled = integrate_entries_parallel(*bodies, workers=workers)
+        elapsed = time.perf_counter() - start
+        assert np.array_equal(np.isnan(pooled.airburstAltitude), np.isnan(result.airburstAltitude))
+        print(f"{f'pool x{workers}':>12}: {elapsed * 1000:9.1f} ms  {args.bodies / elapsed:12,.0f} traj/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+/feed parsing benchmark on recorded fixtures: the dict-walking path
+(json.loads, heapq over every approach, MeteorListItem per result,
+stdlib json response) against the fast path (orjson, structured record
+array, argpartition top-k, orjson response). Both start from the raw
+response bytes and must return the same items. The "cached" rows start
+from what CachedNasaNeoClient keeps: the decoded dict before, the record
+array now.
+
+    cd backend
+    python -m benchmarks.bench_feed_parse --days 7 --per-day 2000 --limit 10
+"""
+import argparse
+import heapq
+import json
+import timeit
+from datetime import date
+
+from app.core.serialization import ORJSON_AVAILABLE, dumps, loads
+from app.domain.neo_feed import parse_feed, to_items, top_k
+from app.services.nasa_service import NasaNeoService
+from benchmarks.fixtures import load_feed
+
+
+def _miss_km(row: tuple[dict, dict]) -> float:
+    return NasaNeoService._parse_float(row[1]["miss_distance"]["kilometers"])
+
+
+def dict_path(raw: bytes, limit: int) -> bytes:
+    data = json.loads(raw)
+    closest = heapq.nsmallest(limit, NasaNeoService._earth_approaches(data), key=_miss_km)
+    items = [NasaNeoService._to_item(asteroid, approach) for asteroid, approach in closest]
+    return json.dumps({"count": len(items), "asteroids": [i.model_dump() for i in items]}).encode()
+
+
+def cached_dict_path(data: dict, limit: int) -> list:
+    closest = heapq.nsmallest(limit, NasaNeoService._earth_approaches(data), key=_miss_km)
+    return [NasaNeoService._to_item(asteroid, approach) for asteroid, approach in closest]
+
+
+def fast_path(raw: bytes, limit: int) -> bytes:
+    items = to_items(top_k(parse_feed(raw), limit))
+    return dumps({"count": len(items), "asteroids": [i.model_dump() for i in items]})
+
+
+def best_ms(fn, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--per-day", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    raw = json.dumps(load_feed(args.days, args.per_day, date(2025, 1, 1))).encode()
+    data = json.loads(raw)
+    records = parse_feed(raw)
+    print(f"{len(raw) / 1e6:.1f} MB, {records.size} Earth approaches, limit {args.limit}, orjson={ORJSON_AVAILABLE}")
+
+    assert json.loads(dict_path(raw, args.limit)) == loads(fast_path(raw, args.limit)), "top-k mismatch"
+
+    stages = {
+        "decode  json.loads": lambda: json.loads(raw),
+        "decode  fast loads": lambda: loads(raw),
+        "parse   parse_feed": lambda: parse_feed(raw),
+        "select  top_k": lambda: top_k(records, args.limit),
+        "total   dict path": lambda: dict_path(raw, args.limit),
+        "total   fast path": lambda: fast_path(raw, args.limit),
+        "cached  dict path": lambda: cached_dict_path(data, args.limit),
+        "cached  fast path": lambda: to_items(top_k(records, args.limit)),
+    }
+    timings = {label: best_ms(fn, args.repeat) for label, fn in stages.items()}
+    for label, ms in timings.items():
+        print(f"{label:<20} {ms:9.2f} ms")
+    speedup = timings["total   dict path"] / timings["total   fast path"]
+    cached = timings["cached  dict path"] / timings["cached  fast path"]
+    print(f"speedup {speedup:.1f}x uncached, {cached:.0f}x cached "
+          f"({records.size / timings['total   fast path'] * 1000:,.0f} approaches/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Range ingestion benchmark: one year of /feed fixtures, fetched in 7-day
+windows with a simulated upstream latency.
+
+"collect" materializes every approach and sorts (the old approach);
+"stream" is NasaNeoService.get_closest_in_range, which keeps only the
+best `limit` rows of each window's record array.
+
+    cd backend
+    python -m benchmarks.bench_feed_range --days 365 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from app.services.nasa_service import NasaNeoService, feed_windows
+from benchmarks.fixtures import FixtureNasaClient, load_feed
+
+START = date(2025, 1, 1)
+
+
+async def collect_then_sort(service: NasaNeoService, end: date, limit: int):
+    items = []
+    for window in feed_windows(START, end):
+        data = await service.client.fetch_neo_feed(*window)
+        items.extend(service._to_item(a, ap) for a, ap in service._earth_approaches(data))
+    items.sort(key=lambda x: x.miss_distance_km)
+    return items[:limit]
+
+
+def measure(label: str, coro_factory) -> list:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = asyncio.run(coro_factory())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>8}: {elapsed * 1000:8.1f} ms  peak alloc {peak / 1e6:7.2f} MB")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=120)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated /feed latency (s)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    feed = load_feed(args.days, args.per_day, START)
+    end = START + timedelta(days=args.days - 1)
+    print(f"{args.days} days, {args.days * args.per_day} NEOs, "
+          f"{len(feed_windows(START, end))} windows, latency {args.latency}s")
+
+    service = NasaNeoService(FixtureNasaClient(feed, args.latency))
+    baseline = measure("collect", lambda: collect_then_sort(service, end, args.limit))
+    streamed = measure("stream", lambda: service.get_closest_in_range(START, end, args.limit, args.concurrency))
+    assert [i.id for i in baseline] == [i.id for i in streamed], "top-k mismatch"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Precomputed impact table against direct computation: per-call latency of
+impact.simulate_impact (scalar), simulate_impact_batch and the memory-mapped
+table (ImpactTable.interpolate / .simulate) for slider-sized and bulk
+batches, plus /impact/batch through the service in both modes. The error of
+every lookup is checked against the exact formulas and the stored bound.
+
+    cd backend
+    python -m benchmarks.bench_lookup --sizes 1 16 1000 100000
+    python -m benchmarks.bench_lookup --table impact.lut
+"""
+import argparse
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+from app.domain.physics import batch, impact
+from app.domain.physics.lookup import DEFAULT_AXES, ImpactTable
+from app.domain.schemas import BatchImpactInput
+from app.services.physicService import ImpactEarthquakeService
+
+
+def best_us(fn, repeat: int = 5) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def scenarios(n: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Slider-like inputs inside the default table domain."""
+    return (10 ** rng.uniform(-2.5, 1.5, n), rng.uniform(11.0, 72.0, n), rng.random(n) < 0.7)
+
+
+def max_errors(table: ImpactTable, d, v, w) -> dict[str, float]:
+    approx, exact = table.interpolate(d, v, w), batch.simulate_impact_batch(d, v, w)
+    out = {}
+    for name in table.errorBound:
+        a, e = getattr(approx, name), getattr(exact, name)
+        out[name] = float(np.max(np.abs(a - e) if name == "seismicMagnitude" else np.abs(a - e) / np.abs(e)))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", help="existing table file (built into a temp file otherwise)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1, 16, 1000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.table) if args.table else None
+        if path is None:
+            start = time.perf_counter()
+            path = ImpactTable.compute(DEFAULT_AXES).save(Path(tmp) / "impact.lut")
+            print(f"built {path.name} in {time.perf_counter() - start:.1f} s")
+        start = time.perf_counter()
+        table = ImpactTable.open(path)
+        print(f"opened {table.grid.shape} ({table.nbytes / 1e6:.1f} MB) in {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+        rng = np.random.default_rng(0)
+        d, v, w = scenarios(200_000, rng)
+        observed = max_errors(table, d, v, w)
+        print(f"\n{'column':<22} {'observed':>10} {'bound':>10}")
+        for name, bound in table.errorBound.items():
+            print(f"{name:<22} {observed[name]:10.3g} {bound:10.3g}")
+            assert observed[name] <= bound * 1.01 + 1e-9, f"{name} above the stored bound"
+
+        scenario = impact.ImpactScenario(diameter=float(d[0]), relativeVelocity=float(v[0]), isTargetWater=bool(w[0]))
+        print(f"\nscalar impact.simulate_impact   {best_us(lambda: impact.simulate_impact(scenario), args.repeat):9.2f} us")
+        print(f"\n{'n':>8} {'exact batch':>14} {'interpolate':>14} {'simulate':>14} {'speedup':>8}")
+        for n in args.sizes:
+            dn, vn, wn = d[:n], v[:n], w[:n]
+            exact = best_us(lambda: batch.simulate_impact_batch(dn, vn, wn), args.repeat)
+            interp = best_us(lambda: table.interpolate(dn, vn, wn), args.repeat)
+            sim = best_us(lambda: table.simulate(dn, vn, wn), args.repeat)
+            print(f"{n:>8} {exact:11.1f} us {interp:11.1f} us {sim:11.1f} us {exact / sim:7.2f}x")
+
+        service = ImpactEarthquakeService(table=table)
+        print(f"\n{'n':>8} {'run_batch exact':>16} {'run_batch table':>16}")
+        for n in (1, 16, 1000):
+            body = {"diameters_km": d[:n].tolist(), "velocities_kms": v[:n].tolist(), "water": w[:n].tolist()}
+            exact_in = BatchImpactInput(**body)
+            table_in = BatchImpactInput(**body, mode="table")
+            exact = best_us(lambda: service.run_batch(exact_in), args.repeat)
+            looked = best_us(lambda: service.run_batch(table_in), args.repeat)
+            print(f"{n:>8} {exact:13.1f} us {looked:13.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Monte Carlo throughput benchmark.
+
+    cd backend
+    python -m benchmarks.bench_montecarlo --samples 1000000 --repeat 5
+"""
+import argparse
+import time
+
+from app.domain.physics.montecarlo import DEFAULT_CHUNK_SIZE, MonteCarloSpec, run_monte_carlo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    spec = MonteCarloSpec(diameterMin=0.12, diameterMax=0.27, relativeVelocity=17.5)
+    run_monte_carlo(spec, samples=args.chunk_size, seed=args.seed)  # warm-up
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        result = run_monte_carlo(spec, args.samples, args.seed, args.chunk_size)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"samples={args.samples} chunk={args.chunk_size} repeat={args.repeat}")
+    print(f"best {best * 1000:.1f} ms  ->  {args.samples / best:,.0f} samples/s")
+    print(f"energy Mt  {result.energyInMegaTons}")
+    print(f"crater km  {result.finalCraterDiameter}")
+    print(f"magnitude  {result.seismicMagnitude}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Orbit propagation benchmark over a synthetic NEO catalog (fixture
+`orbital_data`): Kepler solves, state vectors on an object x epoch grid
+and the full close-approach screen, reported as object-epochs per second.
+The closest approaches are checked against brute-force sampling.
+
+    cd backend
+    python -m benchmarks.bench_orbit --objects 20000 --days 3650 --step 1
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.domain.physics import orbit
+from benchmarks.fixtures import _orbital_data
+
+
+def catalog(n: int) -> orbit.OrbitalElements:
+    return orbit.OrbitalElements.fromNasa(_orbital_data(3_000_000 + i) for i in range(n))
+
+
+def brute_force(el: orbit.OrbitalElements, jd: float, window: float = 2.0) -> tuple[float, float]:
+    times = np.arange(jd - window, jd + window, 1e-4)
+    r, _ = orbit.stateVectors(el, times, grid=True, velocity=False)
+    earth, _ = orbit.stateVectors(orbit.EARTH, times, grid=True, velocity=False)
+    d = np.linalg.norm(r - earth, axis=-1)[0]
+    k = int(d.argmin())
+    return float(times[k]), float(d[k])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=20_000)
+    parser.add_argument("--days", type=float, default=3650)
+    parser.add_argument("--step", type=float, default=1.0)
+    parser.add_argument("--max-distance", type=float, default=0.05, help="AU")
+    parser.add_argument("--check", type=int, default=5, help="approaches verified by brute force")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    el = catalog(args.objects)
+    print(f"{args.objects} objects parsed in {(time.perf_counter() - start) * 1000:.0f} ms")
+    jd0 = float(el.epoch[0])
+    epochs = int(args.days / args.step) + 1
+
+    M = np.random.default_rng(0).uniform(0, 2 * np.pi, 1_000_000)
+    e = np.random.default_rng(1).uniform(0, 0.95, M.size)
+    start = time.perf_counter()
+    orbit.solveKepler(M, e)
+    print(f"solveKepler      {M.size / (time.perf_counter() - start):>14,.0f} solves/s")
+
+    sample = el.take(np.arange(min(512, args.objects)))
+    times = jd0 + np.arange(epochs) * args.step
+    start = time.perf_counter()
+    orbit.stateVectors(sample, times, grid=True, velocity=False)
+    rate = len(sample) * epochs / (time.perf_counter() - start)
+    print(f"stateVectors     {rate:>14,.0f} object-epochs/s")
+
+    start = time.perf_counter()
+    found = orbit.closeApproaches(el, jd0, jd0 + args.days, args.step, args.max_distance)
+    elapsed = time.perf_counter() - start
+    print(f"closeApproaches  {args.objects * epochs / elapsed:>14,.0f} object-epochs/s "
+          f"({elapsed:.2f} s, {len(found)} approaches < {args.max_distance} AU)")
+
+    for i in range(min(args.check, len(found))):
+        jd, distance = brute_force(el.take([found.index[i]]), float(found.jd[i]))
+        print(f"  #{found.index[i]:<6} {found.distanceKm[i]:>14,.0f} km  {found.relativeVelocity[i]:6.2f} km/s  "
+              f"brute force {distance * orbit.AU_KM:>14,.0f} km, {abs(jd - found.jd[i]) * 24:.3f} h apart")
+
+
+if __name__ == "__main__":
+    main()
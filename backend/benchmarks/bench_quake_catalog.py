@@ -0,0 +1,77 @@
+"""
+Local USGS catalog lookups on a synthetic catalog, checked against brute force.
+
+    cd backend
+    python -m benchmarks.bench_quake_catalog --events 500000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.quake_catalog import QuakeCatalog
+
+
+def synthetic_records(n: int, seed: int) -> list[tuple]:
+    rng = np.random.default_rng(seed)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))   # uniforme sobre la esfera
+    lon = rng.uniform(-180, 180, n)
+    mag = np.round(4.5 + rng.exponential(0.45, n), 1)        # Gutenberg-Richter, b ≈ 1
+    time_ms = rng.integers(0, 1_700_000_000_000, n)
+    return [(f"syn{i}", f"evento {i}", int(t), int(t), float(m), float(a), float(o), 10.0)
+            for i, (t, m, a, o) in enumerate(zip(time_ms, mag, lat, lon))]
+
+
+def per_call_us(fn, args_list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    built = QuakeCatalog.from_records(synthetic_records(args.events, args.seed))
+    print(f"build {len(built)} events: {time.perf_counter() - start:.2f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = QuakeCatalog.open(built.save(tmp))
+        rng = np.random.default_rng(args.seed + 1)
+        points = [(float(a), float(o)) for a, o in zip(rng.uniform(-80, 80, args.queries), rng.uniform(-180, 180, args.queries))]
+        mags = [(float(m),) for m in rng.uniform(4, 9, args.queries)]
+
+        # verificación contra fuerza bruta en una muestra
+        lat, lon, mag = np.asarray(catalog.lat), np.asarray(catalog.lon), np.asarray(catalog.mag)
+        everything = np.arange(len(catalog))
+        for (a, o), (m,) in list(zip(points, mags))[:50]:
+            dist = catalog._distance_km(a, o, everything)
+            got = [d for _, d in catalog.nearest(a, o, 10)]
+            assert np.allclose(got, np.sort(dist)[:10]), "nearest mismatch"
+            row = catalog.closest_magnitude(m)
+            assert abs(mag[row] - m) == np.min(np.abs(mag - m)), "closest magnitude mismatch"
+            found = catalog.largest_within(a, o, 500.0)
+            inside = dist <= 500.0
+            assert (found is None) == (not inside.any())
+            if found:
+                assert mag[found[0]] == mag[inside].max(), "largest_within mismatch"
+            box = (lat >= a - 5) & (lat <= a + 5) & (lon >= o - 5) & (lon <= o + 5)
+            row = catalog.largest_in_region(a - 5, a + 5, o - 5, o + 5)
+            assert (row is None) == (not box.any())
+            if row is not None:
+                assert mag[row] == mag[box].max(), "largest_in_region mismatch"
+
+        print(f"closest magnitude     {per_call_us(catalog.closest_magnitude, mags):8.1f} µs/lookup")
+        print(f"nearest 10            {per_call_us(lambda a, o: catalog.nearest(a, o, 10), points):8.1f} µs/lookup")
+        print(f"largest within 500 km {per_call_us(lambda a, o: catalog.largest_within(a, o, 500.0), points):8.1f} µs/lookup")
+        print(f"largest in 10° box    {per_call_us(lambda a, o: catalog.largest_in_region(a - 5, a + 5, o - 5, o + 5), points):8.1f} µs/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Upstream incidents against the real app: latency and errors of
+POST /api/nasa/input (NASA + IsItWater) and GET /api/impact/combined (USGS)
+while the fake upstreams are healthy, hung, slow in the tail, and back.
+
+  healthy   every fake answers after --latency
+  outage    every fake stalls --stall s (longer than HTTP_TIMEOUT_S)
+  tail      10% of requests stall 1 s (hedging territory)
+  recovered faults off again; the circuits must close by themselves
+
+Two app configurations are compared:
+
+  baseline    no budgets, breakers, hedging or water raster: only the httpx
+              timeout and the retries of HttpClientManager
+  resilient   per-upstream budgets, breakers, hedged USGS GETs, the NASA
+              last-known-good data and a water raster as fallback
+
+For every phase it prints completed requests, p50/p99, errors and the share
+of responses flagged X-Degraded. NEO data expires after 1 s, so NASA is
+really called (and failing) during the outage instead of served from cache.
+
+    cd backend
+    python -m benchmarks.bench_resilience --phase-s 8 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from benchmarks.fake_upstreams import serve
+
+PORTS = {"nasa": 8741, "isitwater": 8742, "usgs": 8743, "app": 8744}
+NEO_ID = 3_542_519
+# (mode, delay_s, rate) applied to every fake at the start of each phase
+PHASES = {
+    "healthy": ("ok", 0.0, 1.0),
+    "outage": ("slow", None, 1.0),
+    "tail": ("slow", 1.0, 0.1),
+    "recovered": ("ok", 0.0, 1.0),
+}
+
+
+def write_raster(path: Path, resolution_deg: float = 1.0) -> Path:
+    """All-water bit raster: any answer will do, it only has to be local."""
+    rows, cols = round(180 / resolution_deg), round(360 / resolution_deg)
+    np.save(path, np.packbits(np.ones((rows, cols), dtype=bool), axis=1))
+    return path
+
+
+def app_env(upstreams: dict[str, str], resilient: bool, raster: Path) -> dict[str, str]:
+    env = {
+        "NASA_API_KEY": "bench", "ISITWATER_API_KEY": "bench",
+        "NASA_BASE_URL": upstreams["nasa"], "ISITWATER_BASE_URL": f"{upstreams['isitwater']}/",
+        "USGS_BASE_URL": upstreams["usgs"],
+        "HTTP_TIMEOUT_S": "3", "NASA_NEO_TTL_S": "1", "NASA_CACHE_STALE_S": "0",
+    }
+    if resilient:
+        env.update({
+            "UPSTREAM_BUDGET_S": json.dumps({"nasa": 1.0, "isitwater": 0.5, "usgs": 0.75}),
+            "UPSTREAM_HEDGE_AFTER_S": json.dumps({"usgs": 0.2}),
+            "BREAKER_FAILURES": "5", "BREAKER_RESET_S": "2",
+            "WATER_RASTER_PATH": str(raster),
+        })
+    else:
+        env.update({"UPSTREAM_BUDGET_S": "{}", "UPSTREAM_HEDGE_AFTER_S": "{}", "BREAKER_FAILURES": "0"})
+    return env
+
+
+async def drive(client: httpx.AsyncClient, method: str, url: str, body, stop_at: float, out: list) -> None:
+    """One closed-loop worker: (latency s, status, degraded) per request."""
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body() if body else None)
+            out.append((time.perf_counter() - start, response.status_code, "x-degraded" in response.headers))
+        except httpx.HTTPError:
+            out.append((time.perf_counter() - start, 0, False))
+
+
+def summarize(samples: list) -> dict:
+    if not samples:
+        return {"n": 0, "p50_ms": None, "p99_ms": None, "errors": 0, "degraded": 0.0}
+    latency = np.array([s[0] for s in samples]) * 1000
+    return {
+        "n": len(samples),
+        "p50_ms": float(np.percentile(latency, 50)),
+        "p99_ms": float(np.percentile(latency, 99)),
+        "errors": sum(s[1] != 200 for s in samples),
+        "degraded": sum(s[2] for s in samples) / len(samples),
+    }
+
+
+async def run_variant(base: str, upstreams: dict[str, str], args) -> dict:
+    rng = random.Random(0)
+
+    def sim_input():
+        return {"is_custom": False, "nasa_id": NEO_ID, "lat": rng.uniform(-60, 60), "lon": rng.uniform(-180, 180)}
+
+    targets = {"input": ("POST", f"{base}/api/nasa/input", sim_input),
+               "combined": ("GET", f"{base}/api/impact/combined", None)}
+    results = {}
+    async with httpx.AsyncClient(timeout=120) as client:
+        # Saves the scenario /combined uses and primes the NEO cache
+        (await client.post(targets["input"][1], json=sim_input())).raise_for_status()
+        for phase, (mode, delay, rate) in PHASES.items():
+            for url in upstreams.values():
+                await client.post(f"{url}/_fault", params={"mode": mode, "delay_s": delay or args.stall, "rate": rate})
+            if phase == "recovered":
+                await asyncio.sleep(2.5)   # > BREAKER_RESET_S of the resilient variant
+            stop_at = time.perf_counter() + args.phase_s
+            samples = {name: [] for name in targets}
+            await asyncio.gather(*(
+                drive(client, method, url, body, stop_at, samples[name])
+                for name, (method, url, body) in targets.items()
+                for _ in range(args.concurrency // 2)
+            ))
+            for name, found in samples.items():
+                results[(phase, name)] = summarize(found)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phase-s", type=float, default=8.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05, help="healthy upstream latency (s)")
+    parser.add_argument("--stall", type=float, default=10.0, help="stall during the outage (s)")
+    parser.add_argument("--variants", nargs="*", default=["baseline", "resilient"])
+    args = parser.parse_args()
+
+    fake_env = {"FAKE_LATENCY_S": str(args.latency)}
+    with tempfile.TemporaryDirectory() as tmp, \
+         serve("benchmarks.fake_upstreams:make_nasa_app", PORTS["nasa"], fake_env, factory=True) as nasa, \
+         serve("benchmarks.fake_upstreams:make_isitwater_app", PORTS["isitwater"], fake_env, factory=True) as water, \
+         serve("benchmarks.fake_upstreams:make_usgs_app", PORTS["usgs"], fake_env, factory=True) as usgs:
+        upstreams = {"nasa": nasa, "isitwater": water, "usgs": usgs}
+        raster = write_raster(Path(tmp) / "water.npy")
+        print(f"{'variant':<10} {'phase':<10} {'endpoint':<9} {'n':>6} {'p50':>9} {'p99':>9} "
+              f"{'errors':>7} {'degraded':>9}")
+        for variant in args.variants:
+            with serve("app.main:app", PORTS["app"], app_env(upstreams, variant == "resilient", raster)) as base:
+                results = asyncio.run(run_variant(base, upstreams, args))
+            for (phase, endpoint), r in results.items():
+                p50 = f"{r['p50_ms']:7.0f}ms" if r["n"] else "      -"
+                p99 = f"{r['p99_ms']:7.0f}ms" if r["n"] else "      -"
+                print(f"{variant:<10} {phase:<10} {endpoint:<9} {r['n']:>6} {p50:>9} {p99:>9} "
+                      f"{r['errors']:>7} {r['degraded']:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
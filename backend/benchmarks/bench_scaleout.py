@@ -0,0 +1,160 @@
+"""
+Multi-worker scale-out: the app under `uvicorn --workers N` with each
+STATE_BACKEND, against the fake upstreams.
+
+For every (backend, workers) pair it measures
+
+  throughput  closed-loop GET /api/nasa/closest on a warm cache, from
+              --load-procs load generator processes; rps, p50/p99 and
+              speed-up over the 1-worker run of the same backend
+  cold fill   --windows distinct /api/nasa/range weeks, each requested by
+              --fanout clients at once over fresh connections (so they land
+              on different workers); NASA /feed calls per window should be 1
+              with a shared backend and up to N without one
+  scenarios   POST /api/nasa/input, then GET /api/impact/combined with the
+              returned scenario_id on another connection; share of 404s
+              (scenario saved by a different worker)
+
+Scaling needs real cores: the load generators, the fakes and the workers
+share the machine, so read the speed-up column against the CPU count
+printed first. The redis backend needs the `redis` package and a server on
+REDIS_URL; add it with --backends memory sqlite redis.
+
+    cd backend
+    python -m benchmarks.bench_scaleout --workers 1 2 4 --duration 5
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_upstreams import serve
+from benchmarks.load import run_load
+
+PORTS = {"nasa": 8751, "isitwater": 8752, "usgs": 8753, "app": 8754}
+NEO_ID = 3_542_519
+# No keep-alive: every request opens a connection, which the kernel hands to any worker
+FRESH = httpx.Limits(max_keepalive_connections=0)
+
+
+def app_env(upstreams: dict[str, str], backend: str, state_path: Path) -> dict[str, str]:
+    return {
+        "NASA_API_KEY": "bench", "ISITWATER_API_KEY": "bench",
+        "NASA_BASE_URL": upstreams["nasa"], "ISITWATER_BASE_URL": f"{upstreams['isitwater']}/",
+        "USGS_BASE_URL": upstreams["usgs"],
+        "STATE_BACKEND": backend, "STATE_SQLITE_PATH": str(state_path),
+    }
+
+
+def _load_proc(args: tuple) -> dict:
+    url, concurrency, duration = args
+    return asyncio.run(run_load("GET", url, concurrency=concurrency, duration=duration))
+
+
+def throughput(base: str, procs: int, concurrency: int, duration: float) -> dict:
+    url = f"{base}/api/nasa/closest"
+    with multiprocessing.get_context("spawn").Pool(procs) as pool:
+        parts = pool.map(_load_proc, [(url, max(1, concurrency // procs), duration)] * procs)
+    return {
+        "rps": sum(p["rps"] for p in parts),
+        "p50_ms": max(p["p50_ms"] or 0 for p in parts),
+        "p99_ms": max(p["p99_ms"] or 0 for p in parts),
+        "errors": sum(p["errors"] for p in parts),
+    }
+
+
+async def upstream_requests(client: httpx.AsyncClient, url: str) -> int:
+    return (await client.get(f"{url}/_fault")).json()["requests"]
+
+
+async def cold_fill(base: str, nasa: str, windows: int, fanout: int) -> dict:
+    """NASA /feed calls for `windows` new weeks, each asked by `fanout` clients at once."""
+    first = date(2031, 1, 1)   # every run starts with fresh caches
+    async with httpx.AsyncClient(timeout=60) as admin, httpx.AsyncClient(limits=FRESH, timeout=60) as client:
+        before = await upstream_requests(admin, nasa)
+        requests = []
+        for w in range(windows):
+            start = first + timedelta(weeks=w)
+            params = {"start_date": start.isoformat(), "end_date": (start + timedelta(days=6)).isoformat()}
+            requests += [client.get(f"{base}/api/nasa/range", params=params) for _ in range(fanout)]
+        started = time.perf_counter()
+        responses = await asyncio.gather(*requests)
+        elapsed = time.perf_counter() - started
+        calls = await upstream_requests(admin, nasa) - before
+    return {"calls_per_window": calls / windows, "errors": sum(r.status_code != 200 for r in responses),
+            "elapsed_ms": elapsed * 1000}
+
+
+async def scenarios(base: str, count: int) -> dict:
+    """Share of scenario_ids that another connection (maybe another worker) cannot find."""
+    sem = asyncio.Semaphore(8)
+    async with httpx.AsyncClient(limits=FRESH, timeout=60) as client:
+        async def one(i: int) -> int:
+            async with sem:
+                body = {"is_custom": False, "nasa_id": NEO_ID, "lat": -60 + i % 120, "lon": -170 + i % 340}
+                saved = await client.post(f"{base}/api/nasa/input", json=body)
+                saved.raise_for_status()
+                # No cookie: only the explicit scenario_id, as another client would send
+                client.cookies.clear()
+                found = await client.get(f"{base}/api/impact/combined",
+                                         params={"scenario_id": saved.json()["scenario_id"]})
+                return found.status_code
+
+        statuses = await asyncio.gather(*(one(i) for i in range(count)))
+    return {"missing": sum(s == 404 for s in statuses) / count, "errors": sum(s not in (200, 404) for s in statuses)}
+
+
+def run_config(upstreams: dict[str, str], backend: str, workers: int, state_path: Path, args) -> dict:
+    env = app_env(upstreams, backend, state_path)
+    with serve("app.main:app", PORTS["app"], env, workers=workers) as base:
+        # Warm-up: every worker (or the shared backend) fills /closest before measuring
+        asyncio.run(run_load("GET", f"{base}/api/nasa/closest", concurrency=4 * workers, duration=1.0))
+        result = throughput(base, args.load_procs, args.concurrency, args.duration)
+        result["fill"] = asyncio.run(cold_fill(base, upstreams["nasa"], args.windows, args.fanout))
+        result["scenarios"] = asyncio.run(scenarios(base, args.scenarios))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4])
+    parser.add_argument("--backends", nargs="*", default=["memory", "sqlite"])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--load-procs", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--windows", type=int, default=8)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--scenarios", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake upstream latency (s)")
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} load_procs={args.load_procs} concurrency={args.concurrency}")
+    fake_env = {"FAKE_LATENCY_S": str(args.latency)}
+    shm = Path("/dev/shm") if Path("/dev/shm").is_dir() else None
+    with tempfile.TemporaryDirectory(dir=shm) as tmp, \
+         serve("benchmarks.fake_upstreams:make_nasa_app", PORTS["nasa"], fake_env, factory=True) as nasa, \
+         serve("benchmarks.fake_upstreams:make_isitwater_app", PORTS["isitwater"], fake_env, factory=True) as water, \
+         serve("benchmarks.fake_upstreams:make_usgs_app", PORTS["usgs"], fake_env, factory=True) as usgs:
+        upstreams = {"nasa": nasa, "isitwater": water, "usgs": usgs}
+        print(f"{'backend':<8} {'workers':>7} {'rps':>8} {'speedup':>8} {'p50':>8} {'p99':>8} {'err':>5} "
+              f"{'feed calls/window':>18} {'fill':>8} {'scenario 404':>13}")
+        for backend in args.backends:
+            base_rps = None
+            for workers in args.workers:
+                # A fresh file per run, so nothing filled by an earlier run counts as a hit
+                r = run_config(upstreams, backend, workers, Path(tmp) / f"{backend}-{workers}.db", args)
+                base_rps = base_rps or r["rps"]
+                fill, scen = r["fill"], r["scenarios"]
+                print(f"{backend:<8} {workers:>7} {r['rps']:>8.0f} {r['rps'] / base_rps:>7.2f}x "
+                      f"{r['p50_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms {r['errors'] + fill['errors'] + scen['errors']:>5} "
+                      f"{fill['calls_per_window']:>18.2f} {fill['elapsed_ms']:>6.0f}ms {scen['missing']:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
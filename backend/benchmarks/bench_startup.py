@@ -0,0 +1,155 @@
+"""
+Cold-start benchmark: what every new uvicorn/gunicorn worker pays before
+serving, and what the first request pays for whatever was deferred.
+
+  import    `python -X importtime -c "import app.main"` in a fresh
+            interpreter: cumulative ms for app.main, its slowest direct
+            imports, and which heavy modules (NumPy, httpx, physics) got
+            loaded even though nothing has used them yet
+  ready     ms from spawning `uvicorn app.main:app` until it accepts
+            connections (interpreter + import + lifespan), with PREWARM off
+            and on
+  first     first and second POST /api/impact/batch on the fresh worker:
+            the difference is the lazy construction of the service
+
+Exits with status 1 when the import time is over --budget-ms or a module in
+--deferred is imported by app.main, so CI can track it per commit.
+
+    cd backend
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 800
+    python -m benchmarks.bench_startup --json startup.json --no-server
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.fake_upstreams import BACKEND_DIR
+
+DEFERRED = ("numpy", "httpx", "app.domain.physics.impact", "app.services.physicService")
+ENV = {"NASA_API_KEY": os.environ.get("NASA_API_KEY", "bench"),
+       "ISITWATER_API_KEY": os.environ.get("ISITWATER_API_KEY", "bench")}
+BATCH = json.dumps({"diameters_km": [0.1, 0.5, 1.0], "velocities_kms": [17.0, 20.0, 25.0]}).encode()
+
+
+def importtime(target: str = "app.main") -> tuple[float, dict[str, float], list[str]]:
+    """(cumulative ms of `target`, its direct imports -> cumulative ms, deferred modules loaded)."""
+    code = f"import sys, json, {target}; print(json.dumps([m for m in {list(DEFERRED)!r} if m in sys.modules]))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=BACKEND_DIR,
+                          env={**os.environ, **ENV}, capture_output=True, text=True, check=True)
+    # Children are printed before their parent, one level deeper: the direct
+    # imports of `target` are the depth-1 lines since the previous top-level one
+    children, total = {}, None
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or not line.split("|")[1].strip().isdigit():
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == target:
+            total = int(cumulative) / 1000
+            break
+        if depth == 0:
+            children = {}
+        elif depth == 1:
+            children[name.strip()] = int(cumulative) / 1000
+    return total, children, json.loads(proc.stdout)
+
+
+def _post(url: str, body: bytes) -> float:
+    request = urllib.request.Request(url, body, {"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def cold_worker(port: int, prewarm: bool) -> dict[str, float]:
+    """Spawn-to-listening time and the first two requests of a fresh worker."""
+    env = {**os.environ, **ENV, "PREWARM": str(prewarm).lower()}
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+            with socket.socket() as sock:
+                if sock.connect_ex(("127.0.0.1", port)) == 0:
+                    break
+            if time.perf_counter() - start > 30:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.002)
+        ready = (time.perf_counter() - start) * 1000
+        url = f"http://127.0.0.1:{port}/api/impact/batch"
+        return {"ready_ms": ready, "first_ms": _post(url, BATCH), "second_ms": _post(url, BATCH)}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def best_import(runs: int) -> tuple[float, dict[str, float], list[str]]:
+    """The fastest of `runs` importtime() results: noise only ever adds to it."""
+    return min((importtime() for _ in range(runs)), key=lambda run: run[0])
+
+
+def worker_timings(runs: int = 5, port: int = 8721) -> dict[str, float]:
+    """Medians of cold_worker() with PREWARM off ("lazy") and on ("prewarm")."""
+    results = {}
+    for prewarm in (False, True):
+        samples = [cold_worker(port, prewarm) for _ in range(runs)]
+        suffix = "prewarm" if prewarm else "lazy"
+        for key in samples[0]:
+            results[f"{key[:-3]}_{suffix}_ms"] = statistics.median(s[key] for s in samples)
+    return results
+
+
+def measure(runs: int = 5, port: int = 8721) -> dict[str, float]:
+    """Everything above as flat ms values; used by `benchmarks.suite --only startup`."""
+    return {"import_ms": best_import(runs)[0], **worker_timings(runs, port)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="max import time of app.main")
+    parser.add_argument("--deferred", nargs="*", default=list(DEFERRED),
+                        help="modules app.main must not import")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8721)
+    parser.add_argument("--no-server", action="store_true", help="skip the uvicorn cold-start runs")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    import_ms, modules, loaded = best_import(args.runs)
+    results = {"import_ms": import_ms}
+    if not args.no_server:
+        results.update(worker_timings(args.runs, args.port))
+    print(f"import app.main   {results['import_ms']:8.1f} ms  (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    for name, ms in sorted(modules.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {name:<40} {ms:8.1f} ms")
+    for key, ms in results.items():
+        if key != "import_ms":
+            print(f"{key:<18}{ms:8.1f} ms")
+
+    failures = []
+    if results["import_ms"] > args.budget_ms:
+        failures.append(f"import time {results['import_ms']:.0f} ms > budget {args.budget_ms:.0f} ms")
+    eager = [m for m in loaded if m in args.deferred]
+    if eager:
+        failures.append(f"imported by app.main but should be deferred: {', '.join(eager)}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "top_imports": modules, "eager": eager,
+                       "budget_ms": args.budget_ms}, f, indent=2)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Sweep scaling: cells per second for 1, 2, 4 and 8 worker processes, plus
+the worst event-loop stall seen by a 5 ms ticker while the sweep streams.
+
+    cd backend
+    python -m benchmarks.bench_sweep --diameters 2000 --velocities 1000 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.domain.physics.sweep import SweepGrid, axis_values
+from app.services.sweep_service import SweepRunner
+
+
+async def ticker(stop: asyncio.Event, period: float = 0.005) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(period)
+        worst = max(worst, time.perf_counter() - start - period)
+    return worst
+
+
+async def run(runner: SweepRunner, grid: SweepGrid, chunk_size: int, fmt: str) -> tuple[float, float, int]:
+    stop = asyncio.Event()
+    lag = asyncio.create_task(ticker(stop))
+    start = time.perf_counter()
+    size = 0
+    async for data in runner.stream(runner.start(grid), grid, chunk_size, fmt):
+        size += len(data)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await lag, size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--diameters", type=int, default=2000)
+    parser.add_argument("--velocities", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=65_536)
+    parser.add_argument("--format", choices=["binary", "ndjson"], default="binary")
+    args = parser.parse_args()
+
+    grid = SweepGrid.from_axes(axis_values(0.005, 5, args.diameters, log=True),
+                               axis_values(11, 72, args.velocities), [False, True])
+    print(f"{len(grid):,} cells, chunk {args.chunk_size}, {args.format}, cpus={os.cpu_count()}")
+
+    for workers in args.workers:
+        runner = SweepRunner(workers)
+        warm = SweepGrid.from_axes([0.1], [20], [False])
+        await run(runner, warm, args.chunk_size, args.format)   # arranque de los procesos
+        elapsed, lag, size = await run(runner, grid, args.chunk_size, args.format)
+        runner.close()
+        print(f"workers={workers}: {elapsed:7.2f} s  {len(grid) / elapsed:14,.0f} cells/s  "
+              f"{size / 1e6:8.1f} MB  max loop stall {lag * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+"""
+Local stand-ins for the external APIs.
+
+Each fake is an app factory that uvicorn runs in its own process (see
+`serve`), so the fakes and the load generator do not share a GIL with the
+application under test. Latency is injected with asyncio.sleep and read
+from FAKE_LATENCY_S.
+
+Every fake also accepts faults at runtime, so a benchmark can take an
+upstream down and bring it back while the app keeps serving:
+
+    POST /_fault?mode=slow&delay_s=10&rate=1   stall before answering
+    POST /_fault?mode=error&rate=0.5           answer 503
+    POST /_fault?mode=ok                       back to normal
+
+`rate` is the fraction of requests affected (random). FAKE_FAULT,
+FAKE_FAULT_DELAY_S and FAKE_FAULT_RATE set the initial state.
+GET /_fault returns the state plus the number of requests served so far,
+so a benchmark can count how often the app really called the upstream.
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.fixtures import make_day, make_neo
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _latency() -> float:
+    return float(os.environ.get("FAKE_LATENCY_S", "0.05"))
+
+
+def add_fault_injection(app: FastAPI) -> None:
+    """Adds the /_fault switch, the request counter and the middleware that applies them."""
+    state = {
+        "mode": os.environ.get("FAKE_FAULT", "ok"),
+        "delay_s": float(os.environ.get("FAKE_FAULT_DELAY_S", "10")),
+        "rate": float(os.environ.get("FAKE_FAULT_RATE", "1")),
+        "requests": 0,
+    }
+
+    @app.middleware("http")
+    async def inject(request: Request, call_next):
+        if request.url.path == "/_fault":
+            return await call_next(request)
+        state["requests"] += 1
+        if state["mode"] != "ok" and random.random() < state["rate"]:
+            if state["mode"] == "error":
+                return JSONResponse({"detail": "injected fault"}, status_code=503)
+            await asyncio.sleep(state["delay_s"])
+        return await call_next(request)
+
+    @app.post("/_fault")
+    async def set_fault(mode: str = "ok", delay_s: float = 10.0, rate: float = 1.0):
+        state.update(mode=mode, delay_s=delay_s, rate=rate)
+        return state
+
+    @app.get("/_fault")
+    async def get_fault():
+        return state
+
+
+def make_usgs_app() -> FastAPI:
+    app = FastAPI()
+    latency = _latency()
+
+    @app.get("/query")
+    async def query(minmagnitude: float = 0.0, limit: int = 1):
+        await asyncio.sleep(latency)
+        return {
+            "type": "FeatureCollection",
+            "features": [{
+                "id": "fake0001",
+                "properties": {
+                    "mag": max(minmagnitude, 4.5),
+                    "place": "Fake fault line",
+                    "time": 1_700_000_000_000,
+                    "url": "http://localhost/fake0001",
+                },
+                "geometry": {"coordinates": [-99.1, 19.4, 10.0]},
+            }][:limit],
+        }
+
+    add_fault_injection(app)
+    return app
+
+
+def make_nasa_app() -> FastAPI:
+    """/feed, /neo/{id} and /neo/browse with fixture-shaped bodies for any date."""
+    app = FastAPI()
+    latency = _latency()
+    per_day = int(os.environ.get("FAKE_NEO_PER_DAY", "120"))
+    day_cache = lru_cache(maxsize=512)(lambda day: make_day(day, per_day))
+
+    @app.get("/feed")
+    async def feed(start_date: date, end_date: date):
+        await asyncio.sleep(latency)
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        objects = {d.isoformat(): day_cache(d) for d in days}
+        return {"links": {}, "element_count": len(days) * per_day, "near_earth_objects": objects}
+
+    @app.get("/neo/browse")
+    async def browse(page: int = 0, size: int = 20):
+        await asyncio.sleep(latency)
+        neos = [make_neo(3_000_000 + page * size + i) for i in range(size)]
+        return {"page": {"size": size, "number": page, "total_pages": 1000}, "near_earth_objects": neos}
+
+    @app.get("/neo/{neo_id}")
+    async def neo(neo_id: int):
+        await asyncio.sleep(latency)
+        return make_neo(neo_id)
+
+    add_fault_injection(app)
+    return app
+
+
+def make_isitwater_app() -> FastAPI:
+    """
+    IsItWater stand-in: deterministic water/land by coordinate parity.
+    FAKE_WATER_FAIL_RATE answers that fraction of coordinates with a 503,
+    always the same ones, so retries do not hide the failure.
+    """
+    app = FastAPI()
+    latency = _latency()
+    fail_rate = float(os.environ.get("FAKE_WATER_FAIL_RATE", "0"))
+
+    @app.get("/")
+    async def is_water(latitude: float, longitude: float):
+        await asyncio.sleep(latency)
+        if fail_rate and (hash((latitude, longitude)) % 1000) / 1000 < fail_rate:
+            raise HTTPException(status_code=503, detail="fake outage")
+        return {"latitude": latitude, "longitude": longitude, "water": int(latitude * 10 + longitude * 10) % 3 != 0}
+
+    add_fault_injection(app)
+    return app
+
+
+def _wait_for_port(host: str, port: int, proc: subprocess.Popen, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server on port {port} exited with {proc.returncode}")
+        with socket.socket() as sock:
+            if sock.connect_ex((host, port)) == 0:
+                return
+        time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+@contextmanager
+def serve(app: str, port: int, env: dict | None = None, factory: bool = False,
+          workers: int = 1, host: str = "127.0.0.1"):
+    """
+    Runs the ASGI app at import path `app` ("module:attr") with uvicorn in a
+    subprocess for the duration of the with-block and yields its base URL.
+    """
+    cmd = [sys.executable, "-m", "uvicorn", app, "--host", host, "--port", str(port),
+           "--log-level", "warning", "--workers", str(workers)]
+    if factory:
+        cmd.append("--factory")
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env={**os.environ, **(env or {})})
+    try:
+        _wait_for_port(host, port, proc)
+        yield f"http://{host}:{port}"
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
@@ -0,0 +1,132 @@
+"""
+NASA NEO feed fixtures for benchmarks.
+
+Feeds follow the /feed response layout field for field, with values drawn
+from a seeded generator so every run sees the same data. Generated files
+are written once under benchmarks/fixtures/ and reused afterwards.
+"""
+import asyncio
+import json
+import math
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.domain.neo_feed import parse_feed
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def _orbital_data(neo_id: int) -> dict:
+    """NEO-like elements (Apollo/Aten/Amor range) from their own generator, so adding
+    them leaves the rest of every fixture unchanged."""
+    rng = random.Random(f"orbit:{neo_id}")
+    a = rng.uniform(0.7, 3.0)
+    # NEOs have perihelion q < 1.3 AU
+    e = 1 - rng.uniform(0.3, min(1.3, 0.98 * a)) / a
+    return {
+        "orbit_id": "1",
+        "epoch_osculation": "2461000.5",
+        "eccentricity": f"{e:.16f}",
+        "semi_major_axis": f"{a:.16f}",
+        "inclination": f"{rng.uniform(0, 30):.14f}",
+        "ascending_node_longitude": f"{rng.uniform(0, 360):.14f}",
+        "perihelion_argument": f"{rng.uniform(0, 360):.14f}",
+        "mean_anomaly": f"{rng.uniform(0, 360):.14f}",
+        "mean_motion": f"{math.degrees(0.01720209895 / a ** 1.5):.16f}",
+        "perihelion_distance": f"{a * (1 - e):.16f}",
+        "aphelion_distance": f"{a * (1 + e):.16f}",
+        "orbit_class": {"orbit_class_type": "APO"},
+    }
+
+
+def _neo(rng: random.Random, day: date, neo_id: int) -> dict:
+    d_min = rng.uniform(0.005, 1.5)
+    approaches = [{
+        "close_approach_date": day.isoformat(),
+        "close_approach_date_full": f"{day:%Y-%b-%d} {rng.randrange(24):02d}:{rng.randrange(60):02d}",
+        "epoch_date_close_approach": 0,
+        "relative_velocity": {
+            "kilometers_per_second": f"{rng.uniform(3, 40):.10f}",
+            "kilometers_per_hour": "0",
+            "miles_per_hour": "0",
+        },
+        "miss_distance": {
+            "astronomical": "0",
+            "lunar": "0",
+            "kilometers": f"{rng.uniform(2e5, 7.5e7):.9f}",
+            "miles": "0",
+        },
+        "orbiting_body": "Earth" if rng.random() > 0.05 else "Mars",
+    }]
+    return {
+        "links": {"self": f"http://api.nasa.gov/neo/rest/v1/neo/{neo_id}"},
+        "id": str(neo_id),
+        "neo_reference_id": str(neo_id),
+        "name": f"({2000 + neo_id % 25} FX{neo_id % 997})",
+        "nasa_jpl_url": f"https://ssd.jpl.nasa.gov/tools/sbdb_lookup.html#/?sstr={neo_id}",
+        "absolute_magnitude_h": rng.uniform(15, 30),
+        "estimated_diameter": {
+            "kilometers": {"estimated_diameter_min": d_min, "estimated_diameter_max": d_min * 2.236},
+            "meters": {"estimated_diameter_min": d_min * 1000, "estimated_diameter_max": d_min * 2236},
+        },
+        "is_potentially_hazardous_asteroid": rng.random() < 0.1,
+        "close_approach_data": approaches,
+        "orbital_data": _orbital_data(neo_id),
+        "is_sentry_object": False,
+    }
+
+
+def make_day(day: date, per_day: int = 120, seed: int = 0) -> list[dict]:
+    """The NEOs of a single /feed day, reproducible from (day, seed) alone."""
+    rng = random.Random(f"{seed}:{day.isoformat()}")
+    first_id = 2_000_000 + day.toordinal() % 10_000 * per_day
+    return [_neo(rng, day, first_id + i) for i in range(per_day)]
+
+
+def make_neo(neo_id: int, seed: int = 0) -> dict:
+    """A /neo/{id} body; the approach date is fixed so repeated lookups match."""
+    return _neo(random.Random(f"{seed}:neo:{neo_id}"), date(2025, 1, 1), neo_id)
+
+
+def make_feed(start: date, days: int, per_day: int = 120, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    neo_ids = iter(range(2_000_000, 10_000_000))
+    objects = {}
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        objects[day.isoformat()] = [_neo(rng, day, next(neo_ids)) for _ in range(per_day)]
+    return {
+        "links": {},
+        "element_count": days * per_day,
+        "near_earth_objects": objects,
+    }
+
+
+def load_feed(days: int, per_day: int = 120, start: date = date(2025, 1, 1)) -> dict:
+    """Loads (or generates once) a feed fixture spanning `days` days."""
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    path = FIXTURES_DIR / f"feed_{start.isoformat()}_{days}d_{per_day}.json"
+    if not path.exists():
+        path.write_text(json.dumps(make_feed(start, days, per_day)))
+    return json.loads(path.read_text())
+
+
+class FixtureNasaClient:
+    """Drop-in for NasaNeoClient that serves /feed windows from a fixture."""
+
+    def __init__(self, feed: dict, latency: float = 0.0):
+        self.feed = feed
+        self.latency = latency
+        self.calls = 0
+
+    async def fetch_neo_feed(self, start_date: str, end_date: str) -> dict:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        objects = {day: neos for day, neos in self.feed["near_earth_objects"].items()
+                   if start_date <= day <= end_date}
+        return {"element_count": sum(map(len, objects.values())), "near_earth_objects": objects}
+
+    async def fetch_feed_records(self, start_date: str, end_date: str):
+        return parse_feed(await self.fetch_neo_feed(start_date, end_date))
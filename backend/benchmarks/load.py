@@ -0,0 +1,47 @@
+"""Closed-loop HTTP load generator shared by the end-to-end benchmarks."""
+import asyncio
+import time
+from typing import Any, Callable
+
+import httpx
+import numpy as np
+
+
+async def run_load(method: str, url: str, concurrency: int = 64, duration: float = 5.0,
+                   json_body: Any | Callable[[], Any] = None) -> dict:
+    """
+    Keeps `concurrency` requests in flight for `duration` seconds and
+    returns throughput and latency percentiles (ms). `json_body` may be a
+    callable, evaluated per request, to vary the payload.
+    """
+    latencies: list[float] = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                try:
+                    body = json_body() if callable(json_body) else json_body
+                    response = await client.request(method, url, json=body)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    lat = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)) if lat.size else None,
+        "p99_ms": float(np.percentile(lat, 99)) if lat.size else None,
+    }
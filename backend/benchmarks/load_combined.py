@@ -0,0 +1,107 @@
+"""
+Load test for /api/impact/combined against a local fake USGS server.
+
+"before" reproduces the previous implementation (plain `def` route with a
+blocking requests.get per call, bounded by the threadpool); "after" is the
+real application with the async USGS client.
+
+While the load runs, a probe requests the health route (a plain `def`, so
+it needs a threadpool thread too) once every --probe-every s. Its latency
+shows whether /combined stalls the rest of the worker. With --latency 1 the
+old route holds a thread per request for a full second, so the threadpool
+(40 threads) is saturated long before the CPU.
+
+    cd backend
+    python -m benchmarks.load_combined --concurrency 200 --duration 5 --latency 0.1
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import numpy as np
+import requests
+from fastapi import FastAPI
+
+from benchmarks.fake_upstreams import serve
+from benchmarks.load import run_load
+
+USGS_PORT = 8701
+APP_PORT = 8702
+
+
+def make_legacy_app() -> FastAPI:
+    from app.services.physicService import ImpactEarthquakeService
+
+    app = FastAPI()
+    service = ImpactEarthquakeService()
+    usgs_url = os.environ["USGS_BASE_URL"]
+
+    @app.get("/api/impact/combined")
+    def run_combined():
+        result = service.simulate()
+        response = requests.get(
+            f"{usgs_url}/query",
+            params={"format": "geojson", "minmagnitude": result.seismicMagnitude, "orderby": "time", "limit": 1},
+            timeout=10,
+        )
+        response.raise_for_status()
+        return {"simulation": service.to_sim_detail(result).model_dump(), "related": response.json()}
+
+    @app.get("/Meteors Madness")
+    def health():
+        return {"ok": True}
+
+    return app
+
+
+async def probe(url: str, duration: float, every: float) -> list[float]:
+    """Latencies (ms) of the health route, one request every `every` s."""
+    latencies = []
+    stop_at = time.perf_counter() + duration
+    async with httpx.AsyncClient(timeout=60) as client:
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            await client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(every)
+    return latencies
+
+
+async def measure(base: str, args) -> tuple[dict, list[float]]:
+    return await asyncio.gather(
+        run_load("GET", f"{base}/api/impact/combined", args.concurrency, args.duration),
+        probe(f"{base}/Meteors Madness", args.duration, args.probe_every),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.1, help="fake USGS latency in seconds")
+    parser.add_argument("--probe-every", type=float, default=0.1, help="seconds between health probes")
+    args = parser.parse_args()
+
+    fake_env = {"FAKE_LATENCY_S": str(args.latency)}
+    with serve("benchmarks.fake_upstreams:make_usgs_app", USGS_PORT, fake_env, factory=True) as usgs_url:
+        app_env = {
+            "USGS_BASE_URL": usgs_url,
+            "HTTP_PER_HOST_LIMIT": str(args.concurrency),
+            "HTTP_MAX_CONNECTIONS": str(args.concurrency),
+        }
+        targets = (
+            ("before", "benchmarks.load_combined:make_legacy_app", True),
+            ("after", "app.main:app", False),
+        )
+        for label, target, factory in targets:
+            with serve(target, APP_PORT, app_env, factory=factory) as base:
+                stats, health = asyncio.run(measure(base, args))
+            print(f"{label:>6}: {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:7.1f} ms  "
+                  f"p99 {stats['p99_ms']:7.1f} ms  errors {stats['errors']}  "
+                  f"| health p50 {np.percentile(health, 50):7.1f} ms  p99 {np.percentile(health, 99):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
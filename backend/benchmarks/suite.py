@@ -0,0 +1,272 @@
+"""
+Benchmark suite for the backend, layer by layer:
+
+  physics   every impact.py formula, scalar (ns/call) and batched (ns/element)
+  parsing   NasaNeoService.get_filtered_asteroids over a large /feed fixture,
+            plus raw decode and parse_feed throughput
+  models    MeteorListItem construction cost
+  e2e       req/s and p99 for /api/nasa/closest, /api/nasa/input and
+            /api/impact/combined against local fake NASA, IsItWater and USGS
+  startup   import time of app.main and cold uvicorn worker timings
+            (see benchmarks.bench_startup)
+
+Results are written as JSON. With --baseline, every metric that got worse
+than --threshold (relative) is reported and the run exits with status 1.
+
+    cd backend
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --only physics parsing --baseline bench.json --threshold 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from app.core.serialization import loads
+from app.domain.neo_feed import parse_feed
+from app.domain.physics import batch, impact
+from app.domain.schemas import MeteorListItem
+from app.services.nasa_service import NasaNeoService
+from benchmarks.bench_startup import measure as measure_startup
+from benchmarks.fake_upstreams import serve
+from benchmarks.fixtures import FixtureNasaClient, load_feed
+from benchmarks.load import run_load
+
+SECTIONS = ("physics", "parsing", "models", "e2e", "startup")
+PORTS = {"nasa": 8711, "isitwater": 8712, "usgs": 8713, "app": 8714}
+
+
+def metric(value: float, unit: str, better: str = "lower") -> dict:
+    return {"value": round(float(value), 4), "unit": unit, "better": better}
+
+
+def best_ns(fn, repeat: int = 5) -> float:
+    """Best per-call time (ns) over `repeat` autoranged runs."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+# ---------- physics ----------
+def bench_physics(quick: bool) -> dict:
+    D, Vr = 0.2, 17.5
+    Ve = impact.entryVelocity(Vr)
+    E = impact.kineticEnergy(D, Ve)
+    Vi = impact.impactVelocity(D, Ve)
+    Dt = impact.transientCraterDiameter(D, Vi)
+    Df = impact.finalCraterDiameter(Dt)
+    formulas = {
+        "meteorMass": (D,),
+        "entryVelocity": (Vr,),
+        "kineticEnergy": (D, Ve),
+        "energyInMegaTons": (E,),
+        "ballisticCoefficient": (D,),
+        "impactVelocity": (D, Ve),
+        "transientCraterDiameter": (D, Vi),
+        "finalCraterDiameter": (Dt,),
+        "transientCreaterDepth": (Dt,),
+        "finalCraterDepthKm": (Df,),
+        "seismicEffect": (E,),
+        "thermalRadius": (E,),
+    }
+    results = {}
+    repeat = 3 if quick else 5
+    for name, args in formulas.items():
+        fn = getattr(impact, name)
+        results[f"physics.scalar.{name}"] = metric(best_ns(lambda: fn(*args), repeat), "ns/call")
+    scenario = impact.ImpactScenario(diameter=D, relativeVelocity=Vr)
+    results["physics.scalar.simulate_impact"] = metric(best_ns(lambda: impact.simulate_impact(scenario), repeat), "ns/call")
+
+    n = 10_000 if quick else 100_000
+    rng = np.random.default_rng(0)
+    d = rng.uniform(0.01, 2.0, n)
+    vr = rng.uniform(11, 70, n)
+    ve = batch.entryVelocity(vr)
+    e = batch.kineticEnergy(d, ve)
+    vi = batch.impactVelocity(d, ve)
+    dt = batch.transientCraterDiameter(d, vi)
+    df = batch.finalCraterDiameter(dt)
+    arrays = {
+        "entryVelocity": (vr,), "kineticEnergy": (d, ve), "energyInMegaTons": (e,),
+        "ballisticCoefficient": (d,), "impactVelocity": (d, ve), "transientCraterDiameter": (d, vi),
+        "finalCraterDiameter": (dt,), "finalCraterDepthKm": (df,), "seismicEffect": (e,),
+    }
+    for name, args in arrays.items():
+        fn = getattr(batch, name)
+        results[f"physics.batch.{name}"] = metric(best_ns(lambda: fn(*args), repeat) / n, "ns/element")
+    results["physics.batch.simulate_impact_batch"] = metric(
+        best_ns(lambda: batch.simulate_impact_batch(d, vr), repeat) / n, "ns/element")
+    return results
+
+
+# ---------- parsing ----------
+def bench_parsing(quick: bool) -> dict:
+    days, per_day = (7, 500) if quick else (7, 2000)
+    start = date(2025, 1, 1)
+    feed = load_feed(days, per_day, start)
+    raw = json.dumps(feed).encode()
+    end = (start + timedelta(days=days - 1)).isoformat()
+    service = NasaNeoService(FixtureNasaClient(feed))
+    approaches = parse_feed(feed).size
+
+    async def filtered():
+        return await service.get_filtered_asteroids(start.isoformat(), end)
+
+    loop = asyncio.new_event_loop()
+    try:
+        per_call = best_ns(lambda: loop.run_until_complete(filtered()), 3) / 1e9
+    finally:
+        loop.close()
+    decode = best_ns(lambda: json.loads(raw), 3) / 1e9
+    fast_decode = best_ns(lambda: loads(raw), 3) / 1e9
+    parse = best_ns(lambda: parse_feed(raw), 3) / 1e9
+    return {
+        "parsing.get_filtered_asteroids.approaches_per_s": metric(approaches / per_call, "approaches/s", "higher"),
+        "parsing.get_filtered_asteroids.ms": metric(per_call * 1000, "ms"),
+        "parsing.json_decode.mb_per_s": metric(len(raw) / 1e6 / decode, "MB/s", "higher"),
+        "parsing.fast_decode.mb_per_s": metric(len(raw) / 1e6 / fast_decode, "MB/s", "higher"),
+        "parsing.parse_feed.mb_per_s": metric(len(raw) / 1e6 / parse, "MB/s", "higher"),
+    }
+
+
+# ---------- models ----------
+def bench_models(quick: bool) -> dict:
+    fields = dict(id=2000001, name="(2019 FX12)", estimated_diameter_km=0.123, is_potentially_hazardous=False,
+                  close_approach_date_full="2025-Jan-01 12:34", velocity_km_s=17.5, miss_distance_km=1.2e7)
+    item = MeteorListItem(**fields)
+    repeat = 3 if quick else 5
+    return {
+        "models.MeteorListItem.construct": metric(best_ns(lambda: MeteorListItem(**fields), repeat), "ns/item"),
+        "models.MeteorListItem.model_validate": metric(best_ns(lambda: MeteorListItem.model_validate(fields), repeat), "ns/item"),
+        "models.MeteorListItem.model_dump_json": metric(best_ns(item.model_dump_json, repeat), "ns/item"),
+    }
+
+
+# ---------- end to end ----------
+def bench_e2e(quick: bool, concurrency: int, duration: float, latency: float) -> dict:
+    if quick:
+        duration = min(duration, 2.0)
+    fake_env = {"FAKE_LATENCY_S": str(latency)}
+    rng = random.Random(0)
+
+    def sim_input():
+        return {"is_custom": True, "lat": rng.uniform(-60, 60), "lon": rng.uniform(-180, 180),
+                "diameter_km": rng.uniform(0.01, 1.0), "velocity_kms": rng.uniform(11, 40)}
+
+    results = {}
+    with serve("benchmarks.fake_upstreams:make_nasa_app", PORTS["nasa"], fake_env, factory=True) as nasa, \
+         serve("benchmarks.fake_upstreams:make_isitwater_app", PORTS["isitwater"], fake_env, factory=True) as water, \
+         serve("benchmarks.fake_upstreams:make_usgs_app", PORTS["usgs"], fake_env, factory=True) as usgs:
+        app_env = {
+            "NASA_API_KEY": "bench", "ISITWATER_API_KEY": "bench",
+            "NASA_BASE_URL": nasa, "ISITWATER_BASE_URL": f"{water}/", "USGS_BASE_URL": usgs,
+            "HTTP_PER_HOST_LIMIT": str(concurrency), "HTTP_MAX_CONNECTIONS": str(concurrency * 3),
+        }
+        with serve("app.main:app", PORTS["app"], app_env) as base:
+            targets = (
+                ("closest", "GET", "/api/nasa/closest", None),
+                ("input", "POST", "/api/nasa/input", sim_input),
+                ("combined", "GET", "/api/impact/combined", None),
+            )
+            for name, method, path, body in targets:
+                stats = asyncio.run(run_load(method, f"{base}{path}", concurrency, duration, body))
+                results[f"e2e.{name}.rps"] = metric(stats["rps"], "req/s", "higher")
+                results[f"e2e.{name}.p99_ms"] = metric(stats["p99_ms"] or 0.0, "ms")
+                results[f"e2e.{name}.errors"] = metric(stats["errors"], "requests")
+    return results
+
+
+# ---------- informe ----------
+# ---------- startup ----------
+def bench_startup(quick: bool) -> dict:
+    timings = measure_startup(runs=3 if quick else 5, port=PORTS["app"] + 1)
+    return {f"startup.{name}": metric(ms, "ms") for name, ms in timings.items()}
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Metrics that got worse than `threshold` relative to the baseline."""
+    regressions = []
+    for name, new in current.items():
+        old = baseline.get(name)
+        if old is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / abs(old["value"])
+        worse = change > threshold if new["better"] == "lower" else change < -threshold
+        flag = "REGRESSION" if worse else ""
+        print(f"  {name:<55} {old['value']:>14.4g} -> {new['value']:>14.4g} {new['unit']:<14} {change:+7.1%} {flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="*", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--out", default="bench-results.json")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs and shorter runs")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake upstream latency (s)")
+    args = parser.parse_args()
+
+    results = {}
+    for section in args.only:
+        start = time.perf_counter()
+        if section == "physics":
+            results.update(bench_physics(args.quick))
+        elif section == "parsing":
+            results.update(bench_parsing(args.quick))
+        elif section == "models":
+            results.update(bench_models(args.quick))
+        elif section == "e2e":
+            results.update(bench_e2e(args.quick, args.concurrency, args.duration, args.latency))
+        elif section == "startup":
+            results.update(bench_startup(args.quick))
+        print(f"{section}: {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    with open(args.out, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    for name, m in results.items():
+        print(f"{name:<55} {m['value']:>14.4g} {m['unit']}")
+    print(f"-> {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        print(f"\ncompared with {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
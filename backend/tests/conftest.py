@@ -0,0 +1,66 @@
+import os
+from collections import Counter
+
+# Antes de cualquier import de la app: las pruebas nunca usan el .env ni la red
+os.environ.update(
+    NASA_API_KEY="test", ISITWATER_API_KEY="test", STATE_BACKEND="memory",
+    NASA_BASE_URL="http://nasa.test", ISITWATER_BASE_URL="http://isitwater.test/", USGS_BASE_URL="http://usgs.test",
+    FAKE_LATENCY_S="0",
+)
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients.http import HttpClientManager
+from benchmarks.fake_upstreams import make_isitwater_app, make_nasa_app, make_usgs_app
+
+
+class FakeUpstreams(httpx.AsyncBaseTransport):
+    """Los stand-ins de benchmarks/fake_upstreams.py, en el mismo proceso y por host."""
+
+    def __init__(self):
+        apps = {"nasa.test": make_nasa_app(), "isitwater.test": make_isitwater_app(), "usgs.test": make_usgs_app()}
+        self.transports = {host: httpx.ASGITransport(app) for host, app in apps.items()}
+        self.requests: Counter[str] = Counter()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/_fault":
+            self.requests[request.url.host] += 1
+        return await self.transports[request.url.host].handle_async_request(request)
+
+    async def fault(self, host: str, mode: str, rate: float = 1.0, delay_s: float = 10.0) -> None:
+        """mode "error" (503), "slow" o "ok"; ver add_fault_injection."""
+        async with httpx.AsyncClient(transport=self) as http:
+            await http.post(f"http://{host}/_fault", params={"mode": mode, "rate": rate, "delay_s": delay_s})
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def mock_upstreams(client):
+    """
+    `mock_upstreams(handler)` reemplaza el pool HTTP de la app por un
+    MockTransport (o por `handler` si ya es un transport); usarlo antes de
+    la primera petición que construya un cliente.
+    """
+    def install(handler) -> HttpClientManager:
+        transport = handler if isinstance(handler, httpx.AsyncBaseTransport) else httpx.MockTransport(handler)
+        manager = HttpClientManager(transport=transport, retries=0)
+        client.app.state.services.__dict__["http"] = manager
+        return manager
+
+    return install
+
+
+@pytest.fixture
+def fake_upstreams(mock_upstreams) -> FakeUpstreams:
+    fakes = FakeUpstreams()
+    mock_upstreams(fakes)
+    return fakes
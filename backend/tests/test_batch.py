@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from app.domain.physics import batch
+from app.domain.physics.impact import ImpactScenario, simulate_impact
+
+FIELDS = ("kineticEnergy", "energyInMegaTons", "impactVelocity", "transientCraterDiameter",
+          "finalCraterDiameter", "finalCraterDepth", "seismicMagnitude")
+
+
+def test_batch_matches_scalar_engine():
+    rng = np.random.default_rng(7)
+    # Cubre las dos ramas de impactVelocity (D > 1 km) y los cráteres simples y complejos
+    diameters = np.concatenate([rng.uniform(0.001, 1.0, 200), rng.uniform(1.0, 20.0, 50)])
+    velocities = rng.uniform(11, 72, diameters.size)
+    water = rng.random(diameters.size) < 0.5
+
+    result = batch.simulate_impact_batch(diameters, velocities, water)
+
+    assert len(result) == diameters.size
+    for i in range(diameters.size):
+        scalar = simulate_impact(ImpactScenario(float(diameters[i]), float(velocities[i]), bool(water[i])))
+        for name in FIELDS:
+            assert getattr(result, name)[i] == pytest.approx(getattr(scalar, name), rel=1e-12), name
+
+
+def test_scalars_broadcast():
+    result = batch.simulate_impact_batch([0.1, 0.2, 0.3], 20.0, True)
+    assert result.seismicMagnitude.shape == (3,)
+    assert np.all(np.diff(result.kineticEnergy) > 0)
+
+
+def test_batch_endpoint(client):
+    response = client.post("/api/impact/batch", json={
+        "diameters_km": [0.05, 1.5], "velocities_kms": [17, 30], "water": [False, True],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    scalar = simulate_impact(ImpactScenario(1.5, 30, True))
+    assert body["count"] == 2
+    assert body["energy_in_megatons"][1] == round(scalar.energyInMegaTons, 2)
+    assert body["crater_diameter_m"][1] == round(scalar.finalCraterDiameter * 1000, 2)
+    assert body["related_earthquakes"] is None
+
+
+def test_batch_endpoint_rejects_mismatched_lengths(client):
+    response = client.post("/api/impact/batch", json={"diameters_km": [0.1, 0.2], "velocities_kms": [20]})
+    assert response.status_code == 422
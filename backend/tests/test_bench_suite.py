@@ -0,0 +1,28 @@
+import asyncio
+
+from app.clients.http import HttpClientManager
+from app.clients.nasa_client import NasaNeoClient
+from benchmarks.suite import compare, metric
+
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {"latency": metric(10, "ms"), "rps": metric(1000, "req/s", better="higher"),
+                "new_zero": metric(0, "ms")}
+    current = {"latency": metric(13, "ms"), "rps": metric(900, "req/s", better="higher"),
+               "new_zero": metric(5, "ms"), "only_now": metric(1, "ms")}
+    assert compare(current, baseline, threshold=0.2) == ["latency"]
+    assert compare(current, baseline, threshold=0.05) == ["latency", "rps"]
+    assert compare({"rps": metric(2000, "req/s", better="higher")}, baseline, threshold=0.2) == []
+
+
+def test_clients_use_the_configured_base_url(fake_upstreams):
+    # conftest apunta NASA_BASE_URL al stand-in de benchmarks/fake_upstreams.py
+    async def fetch():
+        http = HttpClientManager(transport=fake_upstreams, retries=0)
+        try:
+            return await NasaNeoClient(api_key="test", http=http, base_url="http://nasa.test/").fetch_neo_by_id(3_542_519)
+        finally:
+            await http.aclose()
+
+    assert asyncio.run(fetch())["id"] == "3542519"
+    assert fake_upstreams.requests["nasa.test"] == 1
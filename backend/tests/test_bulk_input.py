@@ -0,0 +1,65 @@
+import httpx
+import pytest
+
+from benchmarks.fixtures import make_neo
+
+SITES = [{"lat": 10.0, "lon": 20.0}, {"lat": -33.4, "lon": -70.6}, {"lat": 10.0, "lon": 20.0},
+         {"lat": 51.5, "lon": -0.1}, {"lat": -33.4, "lon": -70.6}]
+
+
+def fake_is_water(lat: float, lon: float) -> bool:
+    # la misma regla que make_isitwater_app
+    return int(lat * 10 + lon * 10) % 3 != 0
+
+
+def test_bulk_matches_batch_per_site(client, fake_upstreams):
+    body = {"diameter_km": 0.3, "velocity_kms": 21.0, "sites": SITES}
+    result = client.post("/api/nasa/input/bulk", json=body).json()
+    assert result["count"] == 5 and result["unique_sites"] == 3 and result["failed"] == 0
+    # un solo pedido a IsItWater por punto distinto
+    assert fake_upstreams.requests["isitwater.test"] == 3
+
+    flags = [fake_is_water(s["lat"], s["lon"]) for s in SITES]
+    batch = client.post("/api/impact/batch", json={
+        "diameters_km": [0.3] * 5, "velocities_kms": [21.0] * 5, "water": flags}).json()
+    for i, site in enumerate(result["sites"]):
+        assert site["is_water"] == flags[i] and site["error"] is None
+        assert site["energy_in_megatons"] == batch["energy_in_megatons"][i]
+        assert site["crater_diameter_m"] == batch["crater_diameter_m"][i]
+
+
+def test_bulk_with_a_nasa_asteroid(client, fake_upstreams):
+    size = make_neo(3_542_519)["estimated_diameter"]["kilometers"]
+    body = {"nasa_id": 3_542_519, "sites": SITES[:2]}
+    result = client.post("/api/nasa/input/bulk", json=body).json()
+    assert result["nasa_id"] == 3_542_519 and result["name"]
+    assert result["diameter_km"] == pytest.approx(
+        (size["estimated_diameter_min"] + size["estimated_diameter_max"]) / 2, abs=1e-3)
+    # el NEO se consulta una vez y luego sale de la caché
+    assert client.post("/api/nasa/input/bulk", json=body).json() == result
+    assert fake_upstreams.requests["nasa.test"] == 1
+
+
+def test_failed_site_does_not_sink_the_others(client, mock_upstreams):
+    def handler(request: httpx.Request) -> httpx.Response:
+        # la caché por celdas consulta el centro de la celda, no el punto exacto
+        if abs(float(request.url.params["latitude"]) - 51.5) < 0.1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"water": True})
+
+    mock_upstreams(handler)
+    result = client.post("/api/nasa/input/bulk", json={"diameter_km": 0.3, "velocity_kms": 21.0, "sites": SITES}).json()
+    assert result["failed"] == 1
+    failed = result["sites"][3]
+    assert failed["error"] == "IsItWater no disponible (HTTP 503)" and failed["energy_in_megatons"] is None
+    assert all(s["is_water"] and s["energy_in_megatons"] > 0 for i, s in enumerate(result["sites"]) if i != 3)
+
+
+@pytest.mark.parametrize("body", [
+    {"sites": SITES},
+    {"diameter_km": 0.3, "sites": SITES},
+    {"diameter_km": 0.3, "velocity_kms": 21.0, "sites": []},
+    {"diameter_km": 0.3, "velocity_kms": 21.0, "sites": [{"lat": 91, "lon": 0}]},
+])
+def test_bulk_validation(client, body):
+    assert client.post("/api/nasa/input/bulk", json=body).status_code == 422
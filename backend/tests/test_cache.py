@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.clients.nasa_client import CachedNasaNeoClient
+from app.core.cache import AsyncTTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def counting_loader(value="v", delay: float = 0.0):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+
+    return load, calls
+
+
+def test_concurrent_misses_share_one_load():
+    async def main():
+        cache = AsyncTTLCache(maxsize=8, ttl=10)
+        load, calls = counting_loader(delay=0.01)
+        results = await asyncio.gather(*(cache.get_or_load("k", load) for _ in range(20)))
+        return cache, results, calls
+
+    cache, results, calls = asyncio.run(main())
+    assert results == ["v"] * 20
+    assert len(calls) == 1
+    assert cache.stats.misses == 1 and cache.stats.coalesced == 19
+
+
+def test_ttl_and_lru_eviction():
+    async def main():
+        clock = Clock()
+        cache = AsyncTTLCache(maxsize=2, ttl=10, clock=clock)
+        load, calls = counting_loader()
+        await cache.get_or_load("a", load)
+        await cache.get_or_load("b", load)
+        await cache.get_or_load("a", load)        # "a" pasa a ser la más reciente
+        await cache.get_or_load("c", load)        # desaloja "b"
+        assert "b" not in cache and "a" in cache
+        clock.now = 11
+        assert "a" not in cache
+        await cache.get_or_load("a", load)
+        return calls
+
+    assert len(asyncio.run(main())) == 4
+
+
+def test_stale_entry_is_served_while_refreshing():
+    async def main():
+        clock = Clock()
+        cache = AsyncTTLCache(maxsize=4, ttl=10, stale_ttl=60, clock=clock)
+        await cache.get_or_load("k", counting_loader("old")[0])
+        clock.now = 20
+        load, calls = counting_loader("new")
+        served = await cache.get_or_load("k", load)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return served, cache.peek("k"), calls, cache.stats
+
+    served, fresh, calls, stats = asyncio.run(main())
+    assert served == "old" and fresh == "new"
+    assert len(calls) == 1 and stats.stale_hits == 1
+
+
+def test_failed_load_is_not_cached():
+    async def main():
+        cache = AsyncTTLCache(maxsize=4, ttl=10)
+
+        async def fail():
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("k", fail)
+        return await cache.get_or_load("k", counting_loader()[0]), cache.stats.load_errors
+
+    assert asyncio.run(main()) == ("v", 1)
+
+
+class FakeNasa:
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch_neo_by_id(self, neo_id: int) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": str(neo_id)}
+
+
+def test_cached_client_coalesces_per_id_lookups():
+    async def main():
+        raw = FakeNasa()
+        client = CachedNasaNeoClient(raw, maxsize=8, neo_ttl=60)
+        results = await asyncio.gather(*(client.fetch_neo_by_id(7) for _ in range(10)))
+        await client.fetch_neo_by_id(7)
+        await client.fetch_neo_by_id(8)
+        return raw.calls, results
+
+    calls, results = asyncio.run(main())
+    assert calls == 2
+    assert results == [{"id": "7"}] * 10
@@ -0,0 +1,69 @@
+import httpx
+
+from app.domain.physics.impact import ImpactScenario, simulate_impact
+
+
+def quake(magnitude: float) -> dict:
+    return {
+        "id": f"us{magnitude}",
+        "properties": {"mag": magnitude, "place": "Somewhere", "time": 1_700_000_000_000, "url": ""},
+        "geometry": {"coordinates": [-70.0, -33.0, 10.0]},
+    }
+
+
+def usgs(calls: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        magnitude = float(request.url.params["minmagnitude"])
+        calls.append(magnitude)
+        return httpx.Response(200, json={"features": [quake(magnitude)]})
+
+    return handler
+
+
+def test_combined_uses_the_saved_scenario(client, mock_upstreams):
+    calls = []
+    mock_upstreams(usgs(calls))
+    scenario_id = client.portal.call(client.app.state.scenarios.save,
+                                     {"diameter": 0.4, "relativeVelocity": 20, "water": 0})
+
+    response = client.get("/api/impact/combined", params={"scenario_id": scenario_id})
+
+    assert response.status_code == 200
+    body = response.json()
+    expected = simulate_impact(ImpactScenario(0.4, 20)).seismicMagnitude
+    assert body["seismic_magnitude"] == round(expected, 2)
+    assert body["related_earthquake"]["magnitude"] == calls[0]
+    assert body["degraded"] is False
+
+
+def test_batch_looks_up_each_magnitude_bucket_once(client, mock_upstreams):
+    calls = []
+    mock_upstreams(usgs(calls))
+    response = client.post("/api/impact/batch", json={
+        "diameters_km": [0.3, 0.3, 0.3, 2.0], "velocities_kms": [20, 20, 20.01, 25],
+        "related_earthquakes": True,
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    buckets = [round(m, 1) for m in body["seismic_magnitude"]]
+    assert sorted(calls) == sorted(set(buckets))
+    assert [q["magnitude"] for q in body["related_earthquakes"]] == buckets
+
+
+def test_usgs_failure_falls_back_to_the_last_earthquake(client, mock_upstreams):
+    fail = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"features": [quake(float(request.url.params["minmagnitude"]))]})
+
+    mock_upstreams(handler)
+    payload = {"diameters_km": [0.3], "velocities_kms": [20], "related_earthquakes": True}
+    first = client.post("/api/impact/batch", json=payload).json()
+    fail = True
+    second = client.post("/api/impact/batch", json=payload)
+
+    assert second.status_code == 200
+    assert second.json()["related_earthquakes"] == first["related_earthquakes"]
@@ -0,0 +1,69 @@
+import base64
+
+import numpy as np
+import pytest
+
+from app.domain.physics import effects
+from app.domain.physics.impact import ImpactScenario, simulate_impact
+
+
+def zones_by_label(result):
+    return {z.label: z for z in effects.effect_zones(result)}
+
+
+def test_radii_invert_their_profiles():
+    result = simulate_impact(ImpactScenario(0.3, 20))
+    E = result.kineticEnergy
+    for zone in effects.effect_zones(result):
+        if zone.effect == "airblast":
+            assert effects.peakOverpressure(E, zone.radius) == pytest.approx(zone.threshold, rel=1e-2)
+        elif zone.effect == "thermal":
+            assert effects.thermalExposure(E, zone.radius) == pytest.approx(zone.threshold, rel=1e-2)
+
+
+def test_stricter_thresholds_reach_less_far():
+    zones = effects.effect_zones(simulate_impact(ImpactScenario(0.3, 20)))
+    for effect in ("airblast", "thermal"):
+        radii = [z.radius for z in zones if z.effect == effect]
+        assert radii == sorted(radii, reverse=True)
+
+
+def test_bigger_impacts_reach_further():
+    small = zones_by_label(simulate_impact(ImpactScenario(0.1, 20)))
+    large = zones_by_label(simulate_impact(ImpactScenario(1.0, 20)))
+    assert all(large[label].radius > small[label].radius for label in small)
+
+
+def test_tsunami_only_for_water_targets():
+    land = effects.effect_zones(simulate_impact(ImpactScenario(0.5, 20)))
+    water = effects.effect_zones(simulate_impact(ImpactScenario(0.5, 20, isTargetWater=True)))
+    assert not any(z.effect == "tsunami" for z in land)
+    assert [z.effect for z in water if z.effect == "tsunami"] == ["tsunami", "tsunami"]
+
+
+def test_great_circle():
+    assert effects.great_circle_km(0, 0, 0, 90) == pytest.approx(np.pi / 2 * effects.EARTH_RADIUS_KM)
+    assert effects.great_circle_km(10, 20, 10, 20) == 0
+
+
+def test_raster_levels_follow_distance():
+    zones = effects.effect_zones(simulate_impact(ImpactScenario(0.3, 20)))
+    grid = effects.damage_raster(0.0, 0.0, zones, size=65)
+    centre, corner = grid.levels[32, 32], grid.levels[0, 0]
+    assert centre == max(z.severity for z in zones)
+    assert corner == 0
+    assert grid.latMin < 0 < grid.latMax and grid.lonMin < 0 < grid.lonMax
+
+
+def test_effects_endpoint(client):
+    response = client.post("/api/impact/effects", json={
+        "diameter_km": 0.3, "velocity_kms": 20, "lat": 10, "lon": 20, "raster": True, "grid_size": 32,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert {z["effect"] for z in body["zones"]} == {"crater", "fireball", "airblast", "thermal"}
+    assert len(base64.b64decode(body["raster"]["levels_b64"])) == 32 * 32
+
+
+def test_effects_endpoint_requires_both_parameters(client):
+    assert client.post("/api/impact/effects", json={"diameter_km": 0.3}).status_code == 422
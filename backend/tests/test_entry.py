@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from app.domain.physics.entry import integrate_entries, integrate_entries_parallel
+
+
+def test_small_bodies_burst_and_large_ones_land():
+    result = integrate_entries([0.02, 0.05, 1.0], 20.0)
+    assert result.converged.all()
+    assert result.isAirburst.tolist() == [True, True, False]
+    assert result.groundVelocity[-1] > 0 and result.groundVelocity[0] == 0
+    # Un cuerpo más grande aguanta más y revienta más abajo
+    assert result.airburstAltitude[1] < result.airburstAltitude[0]
+    assert np.all(result.breakupAltitude[:2] > result.airburstAltitude[:2])
+
+
+def test_energy_is_conserved_for_airbursts():
+    d, v = 0.05, 20.0
+    result = integrate_entries([d], v)
+    r = d * 1000 / 2
+    mass = 3000 * 4 / 3 * np.pi * r ** 3
+    initial = 0.5 * mass * (11.2e3 ** 2 + (v * 1000) ** 2)
+    # Pequeñas pérdidas por la masa ablacionada; la gravedad aporta algo de energía
+    assert result.atmosphericEnergy[0] == pytest.approx(initial, rel=0.05)
+    assert result.energyDeposition.shape == (1, result.altitudeBins.size)
+
+
+def test_bodies_are_independent():
+    together = integrate_entries([0.03, 0.3], [15.0, 25.0], angle=[30, 60])
+    alone = integrate_entries([0.3], [25.0], angle=60)
+    assert together.airburstAltitude[1:] == pytest.approx(alone.airburstAltitude, nan_ok=True)
+    assert together.groundVelocity[1] == pytest.approx(alone.groundVelocity[0])
+
+
+def test_step_limit_is_reported_per_body():
+    result = integrate_entries([0.05, 0.5], 20.0, max_steps=20)
+    assert result.steps == 20
+    assert not result.converged.any()
+
+
+def test_parallel_matches_in_process():
+    bodies = (np.linspace(0.01, 0.5, 8), np.linspace(12, 30, 8))
+    serial = integrate_entries(*bodies)
+    pooled = integrate_entries_parallel(*bodies, workers=2, chunks_per_worker=2)
+    assert pooled.converged.tolist() == serial.converged.tolist()
+    np.testing.assert_allclose(pooled.groundVelocity, serial.groundVelocity)
+    np.testing.assert_allclose(pooled.airburstAltitude, serial.airburstAltitude)
+
+
+def test_entry_endpoint(client):
+    response = client.post("/api/impact/entry", json={
+        "diameters_km": [0.02, 1.0], "velocities_kms": [20, 20], "profile": True,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["converged"] == [True, True]
+    assert body["airburst_altitude_km"][0] is not None and body["airburst_altitude_km"][1] is None
+    assert len(body["energy_deposition_kt_per_km"][0]) == len(body["altitudes_km"])
+
+
+def test_entry_endpoint_validates_lengths(client):
+    response = client.post("/api/impact/entry", json={"diameters_km": [0.02, 1.0], "velocities_kms": [20]})
+    assert response.status_code == 422
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from app.clients.nasa_client import CachedNasaNeoClient
+from app.domain.neo_feed import parse_feed, to_items, top_k
+from app.services.nasa_service import NasaNeoService, feed_windows
+from benchmarks.fixtures import FixtureNasaClient, load_feed
+
+START = date(2025, 1, 1)
+
+
+@pytest.mark.parametrize("days", [1, 7, 8, 30, 366])
+def test_windows_cover_the_range_without_overlap(days):
+    end = START + timedelta(days=days - 1)
+    windows = feed_windows(START, end)
+    assert windows[0][0] == START.isoformat() and windows[-1][1] == end.isoformat()
+    for (_, last), (first, _) in zip(windows, windows[1:]):
+        assert date.fromisoformat(first) == date.fromisoformat(last) + timedelta(days=1)
+    assert all((date.fromisoformat(b) - date.fromisoformat(a)).days < 7 for a, b in windows)
+
+
+@pytest.fixture(scope="module")
+def feed():
+    return load_feed(60)
+
+
+def test_closest_in_range_matches_whole_feed(feed):
+    expected = to_items(top_k(parse_feed(feed), 15))
+    service = NasaNeoService(FixtureNasaClient(feed))
+    found = asyncio.run(service.get_closest_in_range(START, START + timedelta(days=59), 15, concurrency=3))
+    assert found == expected
+
+
+def test_stream_yields_every_approach(feed):
+    async def collect():
+        service = NasaNeoService(FixtureNasaClient(feed))
+        return [item async for item in service.iter_feed_range(START, START + timedelta(days=20), concurrency=2)]
+
+    items = asyncio.run(collect())
+    window = {day: neos for day, neos in feed["near_earth_objects"].items()
+              if day <= (START + timedelta(days=20)).isoformat()}
+    assert sorted(i.id for i in items) == sorted(parse_feed({"near_earth_objects": window})["id"].tolist())
+
+
+def test_only_the_first_windows_are_cached(feed):
+    async def main():
+        raw = FixtureNasaClient(feed)
+        client = CachedNasaNeoClient(raw, maxsize=64)
+        service = NasaNeoService(client)
+        end = START + timedelta(days=59)
+        first = await service.get_closest_in_range(START, end, 5, concurrency=4, cached_windows=2)
+        cached, calls = len(client.cache), raw.calls
+        second = await service.get_closest_in_range(START, end, 5, concurrency=4, cached_windows=2)
+        return first == second, cached, len(client.last_good), calls, raw.calls - calls
+
+    same, cached, last_good, first_calls, second_calls = asyncio.run(main())
+    windows = len(feed_windows(START, START + timedelta(days=59)))
+    assert same
+    assert cached == last_good == 2
+    assert first_calls == windows and second_calls == windows - 2
+
+
+def test_range_endpoint(client, fake_upstreams):
+    response = client.get("/api/nasa/range", params={"start_date": "2025-03-01", "end_date": "2025-03-20", "limit": 5})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 5
+    misses = [a["miss_distance_km"] for a in body["asteroids"]]
+    assert misses == sorted(misses)
+    assert fake_upstreams.requests["nasa.test"] == 3
+
+
+def test_stream_endpoint(client, fake_upstreams):
+    response = client.get("/api/nasa/range/stream", params={"start_date": "2025-03-01", "end_date": "2025-03-02"})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines and all({"id", "miss_distance_km"} <= line.keys() for line in lines)
+
+
+@pytest.mark.parametrize("start, end", [("2025-03-10", "2025-03-01"), ("2024-01-01", "2025-06-01")])
+def test_invalid_ranges(client, start, end):
+    assert client.get("/api/nasa/range", params={"start_date": start, "end_date": end}).status_code == 422
+
+
+def test_upstream_error_does_not_leak_the_api_key(client, fake_upstreams):
+    client.portal.call(fake_upstreams.fault, "nasa.test", "error")
+    response = client.get("/api/nasa/range", params={"start_date": "2025-03-01", "end_date": "2025-03-20"})
+    assert response.status_code == 502
+    assert "api_key" not in response.text
@@ -0,0 +1,94 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.clients.http import HttpClientManager
+
+
+def manager(handler, **kwargs) -> HttpClientManager:
+    kwargs.setdefault("backoff_base", 0.001)
+    return HttpClientManager(transport=httpx.MockTransport(handler), **kwargs)
+
+
+async def send(http: HttpClientManager, method: str = "GET", url: str = "https://upstream.test/x"):
+    try:
+        return await http.request(method, url)
+    finally:
+        await http.aclose()
+
+
+def test_get_is_retried_until_success():
+    statuses = iter([503, 429, 200])
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(next(statuses))
+
+    response = asyncio.run(send(manager(handler, retries=3)))
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+def test_last_response_is_returned_when_retries_run_out():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(502)
+
+    assert asyncio.run(send(manager(handler, retries=2))).status_code == 502
+    assert len(calls) == 3
+
+
+def test_post_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    assert asyncio.run(send(manager(handler, retries=3), "POST")).status_code == 503
+    assert len(calls) == 1
+
+
+def test_transport_error_raises_after_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError("down", request=request)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(send(manager(handler, retries=1)))
+    assert len(calls) == 2
+
+
+def test_retry_after_header_is_honoured():
+    http = manager(lambda request: httpx.Response(200), backoff_max=4.0)
+    assert http._backoff(0, httpx.Response(429, headers={"Retry-After": "2"})) == 2.0
+    assert http._backoff(0, httpx.Response(429, headers={"Retry-After": "60"})) == 4.0
+    assert 0 <= http._backoff(0, None) <= http.backoff_base
+
+
+def test_per_host_limit():
+    in_flight = peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    async def main():
+        http = manager(handler, per_host_limit=2)
+        try:
+            await asyncio.gather(*(http.get("https://upstream.test/x") for _ in range(8)))
+        finally:
+            await http.aclose()
+
+    asyncio.run(main())
+    assert peak == 2
@@ -0,0 +1,35 @@
+import math
+
+import pytest
+
+from app.domain.physics import impact
+from app.domain.physics.impact import ImpactScenario, simulate_impact
+
+
+def test_scenarios_are_independent():
+    small = simulate_impact(ImpactScenario(diameter=0.05, relativeVelocity=17))
+    large = simulate_impact(ImpactScenario(diameter=2.0, relativeVelocity=25, isTargetWater=True))
+    assert simulate_impact(ImpactScenario(diameter=0.05, relativeVelocity=17)) == small
+    assert large.kineticEnergy > small.kineticEnergy
+    assert large.scenario.resolvedTargetDensity == impact.waterDensity
+    assert small.scenario.resolvedTargetDensity == impact.targetDensity
+
+
+def test_result_matches_the_formulas():
+    scenario = ImpactScenario(diameter=0.3, relativeVelocity=20, density=3500)
+    result = simulate_impact(scenario)
+    ve = impact.entryVelocity(20)
+    assert result.entryVelocity == pytest.approx(math.sqrt(20 ** 2 + impact.escapeVelocity ** 2))
+    assert result.kineticEnergy == pytest.approx(impact.kineticEnergy(0.3, ve, 3500))
+    assert result.energyInMegaTons == pytest.approx(impact.energyInMegaTons(result.kineticEnergy))
+    assert result.finalCraterDiameter == pytest.approx(impact.finalCraterDiameter(result.transientCraterDiameter))
+
+
+def test_explicit_target_density_wins():
+    scenario = ImpactScenario(diameter=0.3, relativeVelocity=20, isTargetWater=True, targetDensity=2000)
+    assert scenario.resolvedTargetDensity == 2000
+
+
+def test_from_config():
+    scenario = ImpactScenario.from_config({"diameter": "0.5", "relativeVelocity": 12, "water": 1})
+    assert scenario == ImpactScenario(diameter=0.5, relativeVelocity=12.0, isTargetWater=True)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.job_queue import JobQueue, JobRejected
+
+
+def gate_work(started: list, name: str, gate: asyncio.Event):
+    async def work(ctx):
+        started.append(name)
+        await gate.wait()
+        return name
+    return work
+
+
+def test_priority_then_arrival_order():
+    async def main():
+        queue = JobQueue(workers=1, per_client=1, max_queued=10, max_per_client=10)
+        started, gate = [], asyncio.Event()
+        first = queue.submit("t", gate_work(started, "first", gate))
+        low = queue.submit("t", gate_work(started, "low", gate), priority=5)
+        urgent = queue.submit("t", gate_work(started, "urgent", gate), priority=0)
+        await asyncio.sleep(0)
+        assert (first.status, low.status, urgent.status) == ("running", "queued", "queued")
+        gate.set()
+        while low.status != "done":
+            await asyncio.sleep(0.001)
+        await queue.aclose()
+        return started
+
+    assert asyncio.run(main()) == ["first", "urgent", "low"]
+
+
+def test_per_client_slots():
+    async def main():
+        queue = JobQueue(workers=2, per_client=1, max_queued=10, max_per_client=10)
+        started, gate = [], asyncio.Event()
+        a1 = queue.submit("t", gate_work(started, "a1", gate), client="a")
+        a2 = queue.submit("t", gate_work(started, "a2", gate), client="a")
+        b1 = queue.submit("t", gate_work(started, "b1", gate), client="b")
+        await asyncio.sleep(0)
+        states = a1.status, a2.status, b1.status
+        await queue.aclose()
+        return states
+
+    assert asyncio.run(main()) == ("running", "queued", "running")
+
+
+def test_admission_rejects_when_full():
+    async def main():
+        queue = JobQueue(workers=1, per_client=1, max_queued=1, max_per_client=2)
+        gate = asyncio.Event()
+        queue.submit("t", gate_work([], "running", gate), client="a")
+        queue.submit("t", gate_work([], "queued", gate), client="b")
+        with pytest.raises(JobRejected) as full:
+            queue.submit("t", gate_work([], "x", gate), client="c")
+        assert full.value.retry_after >= 1
+        # el cupo por cliente cuenta los trabajos en cola y en ejecución
+        other = JobQueue(workers=1, per_client=1, max_queued=10, max_per_client=2)
+        other.submit("t", gate_work([], "1", gate), client="a")
+        other.submit("t", gate_work([], "2", gate), client="a")
+        with pytest.raises(JobRejected, match="cliente"):
+            other.submit("t", gate_work([], "3", gate), client="a")
+        other.submit("t", gate_work([], "4", gate), client="b")
+        rejected = queue.stats()["rejected"], other.stats()["rejected"]
+        await queue.aclose()
+        await other.aclose()
+        return rejected
+
+    assert asyncio.run(main()) == (1, 1)
+
+
+def test_result_progress_and_error():
+    async def main():
+        queue = JobQueue(workers=1, max_queued=10, max_per_client=10)
+
+        async def work(ctx):
+            ctx.report(0.5, "mitad")
+            return await ctx.run(sum, [1, 2, 3])
+
+        async def failing(ctx):
+            raise ValueError("mal")
+
+        ok = queue.submit("t", work)
+        states = [state async for state in queue.watch(ok.id)]
+        bad = queue.submit("t", failing)
+        while bad.status != "error":
+            await asyncio.sleep(0.001)
+        await queue.aclose()
+        return states, bad
+
+    states, bad = asyncio.run(main())
+    assert states[-1]["status"] == "done" and states[-1]["result"] == 6 and states[-1]["progress"] == 1.0
+    assert any(s["message"] == "mitad" for s in states)
+    assert bad.error == "mal"
+
+
+def test_cancelled_job_keeps_its_slot_until_the_thread_finishes():
+    async def main():
+        queue = JobQueue(workers=1, per_client=1, max_queued=10, max_per_client=10)
+        release = threading.Event()
+        started = []
+
+        async def busy(ctx):
+            return await ctx.run(release.wait, 10)
+
+        async def next_job(ctx):
+            started.append(time.monotonic())
+            return "ok"
+
+        first = queue.submit("t", busy)
+        while first.in_executor == 0:
+            await asyncio.sleep(0.001)
+        queue.cancel(first.id)
+        second = queue.submit("t", next_job)
+        await asyncio.sleep(0.05)
+        # la tarea se canceló, pero su hilo sigue ocupando el único worker
+        assert first.status == "cancelled" and second.status == "queued" and queue.running == 1
+        release.set()
+        while second.status != "done":
+            await asyncio.sleep(0.001)
+        assert queue.running == 0
+        await queue.aclose()
+
+    asyncio.run(main())
+
+
+def test_jobs_endpoint_runs_and_reports(client):
+    body = {"kind": "batch", "params": {"diameters_km": [0.1, 0.5], "velocities_kms": [20.0, 30.0]}}
+    submitted = client.post("/api/impact/jobs", json=body)
+    assert submitted.status_code == 202
+    job_id = submitted.json()["job_id"]
+    events = client.get(f"/api/impact/jobs/{job_id}/events").text
+    last = json.loads(events.strip().split("\n\n")[-1].split("data: ", 1)[1])
+    assert last["status"] == "done"
+    assert last["result"] == client.post("/api/impact/batch", json=body["params"]).json()
+    assert client.get(f"/api/impact/jobs/{job_id}").json()["status"] == "done"
+
+    assert client.get("/api/impact/jobs/nope").status_code == 404
+    bad = client.post("/api/impact/jobs", json={"kind": "batch", "params": {"diameters_km": "x"}})
+    assert bad.status_code == 422
+    assert bad.json()["detail"][0]["loc"][:2] == ["body", "params"]
+
+
+def test_jobs_endpoint_returns_429_when_full(client):
+    client.app.state.jobs = JobQueue(workers=1, max_queued=0, max_per_client=10)
+    body = {"kind": "entry", "params": {"diameters_km": [0.05], "velocities_kms": [20.0]}}
+    rejected = client.post("/api/impact/jobs", json=body)
+    assert rejected.status_code == 429
+    assert int(rejected.headers["retry-after"]) >= 1
+    assert "llena" in rejected.json()["detail"]
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from app.domain.physics import batch, lookup
+from app.domain.physics.lookup import ERROR_COLUMNS, ImpactTable, TableAxes
+
+AXES = TableAxes(logDiameterMin=-2.0, logDiameterMax=1.0, diameterCount=384, velocityMin=11.0, velocityMax=72.0,
+                 velocityCount=96)
+
+
+@pytest.fixture(scope="module")
+def table() -> ImpactTable:
+    return ImpactTable.compute(AXES)
+
+
+def relative_errors(approx: batch.ImpactBatchResult, exact: batch.ImpactBatchResult) -> dict[str, np.ndarray]:
+    return {name: np.abs(getattr(approx, name) - getattr(exact, name)) /
+            (1.0 if name == "seismicMagnitude" else np.abs(getattr(exact, name)))
+            for name in ERROR_COLUMNS}
+
+
+def test_grid_nodes_are_exact(table):
+    D, V = np.meshgrid(AXES.diameters()[::37], AXES.velocities()[::11], indexing="ij")
+    for water in (False, True):
+        errors = relative_errors(table.interpolate(D, V, water), batch.simulate_impact_batch(D.ravel(), V.ravel(), water))
+        assert max(e.max() for name, e in errors.items() if name != "seismicMagnitude") < 1e-5
+
+
+@pytest.mark.parametrize("water", [False, True])
+def test_error_bound_holds_on_new_points(table, water):
+    assert set(table.errorBound) == set(ERROR_COLUMNS)
+    rng = np.random.default_rng(123)
+    d = 10 ** rng.uniform(AXES.logDiameterMin, AXES.logDiameterMax, 100_000)
+    v = rng.uniform(AXES.velocityMin, AXES.velocityMax, 100_000)
+    exact = batch.simulate_impact_batch(d, v, water)
+    errors = relative_errors(table.interpolate(d, v, water), exact)
+    # la profundidad puede saltar de lado del umbral simple/complejo (ver el docstring del módulo)
+    near_split = np.abs(exact.finalCraterDiameter - 4.0) <= 4.0 * 2 * table.errorBound["finalCraterDiameter"]
+    errors["finalCraterDepth"] = errors["finalCraterDepth"][~near_split]
+    for name, error in errors.items():
+        assert error.max() <= 1.05 * table.errorBound[name] + 1e-7, name
+    # una malla de este tamaño ya da errores pequeños
+    assert table.errorBound["energyInMegaTons"] < 1e-3
+    assert table.errorBound["seismicMagnitude"] < 1e-3
+
+
+def test_simulate_falls_back_outside_the_table(table):
+    d = np.array([0.001, 0.5, 50.0])
+    v = np.array([20.0, 5.0, 20.0])
+    result = table.simulate(d, v, False)
+    exact = batch.simulate_impact_batch(d, v, False)
+    np.testing.assert_allclose(result.energyInMegaTons, exact.energyInMegaTons, rtol=1e-12)
+    np.testing.assert_allclose(result.seismicMagnitude, exact.seismicMagnitude, atol=1e-12)
+
+
+def test_save_and_open(table, tmp_path):
+    path = table.save(tmp_path / "impact.lut")
+    opened = ImpactTable.open(path)
+    assert opened.axes == AXES and opened.errorBound == table.errorBound
+    assert opened.grid.ctypes.data % lookup.ALIGN == 0
+    d, v = np.array([0.3, 2.0]), np.array([17.0, 40.0])
+    np.testing.assert_array_equal(opened.interpolate(d, v, True).finalCraterDiameter,
+                                  table.interpolate(d, v, True).finalCraterDiameter)
+
+
+def test_open_rejects_foreign_old_and_stale_files(table, tmp_path, monkeypatch):
+    foreign = tmp_path / "foreign.lut"
+    foreign.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not an impact table"):
+        ImpactTable.open(foreign)
+
+    path = table.save(tmp_path / "impact.lut")
+    raw = bytearray(path.read_bytes())
+    lookup.PREAMBLE.pack_into(raw, 0, lookup.MAGIC, lookup.FORMAT_VERSION + 1, lookup.PREAMBLE.unpack_from(raw)[2])
+    (tmp_path / "future.lut").write_bytes(raw)
+    with pytest.raises(ValueError, match="format"):
+        ImpactTable.open(tmp_path / "future.lut")
+
+    monkeypatch.setattr(lookup, "sourceFingerprint", lambda: "0" * 16)
+    with pytest.raises(ValueError, match="rebuild"):
+        ImpactTable.open(path)
+
+
+def test_batch_table_mode(client, table):
+    body = {"diameters_km": [0.05, 0.5, 3.0], "velocities_kms": [15.0, 25.0, 60.0], "mode": "table"}
+    assert client.post("/api/impact/batch", json=body).status_code == 503
+
+    client.app.state.services.impact.table = table
+    fast = client.post("/api/impact/batch", json=body).json()
+    exact = client.post("/api/impact/batch", json={**body, "mode": "exact"}).json()
+    assert fast["error_bound"]["seismic_magnitude"] == table.errorBound["seismicMagnitude"]
+    assert fast["error_bound"]["crater_depth_m"] == table.errorBound["finalCraterDepth"]
+    assert exact["error_bound"] is None
+    for name in ("energy_in_megatons", "crater_diameter_m", "seismic_magnitude"):
+        assert fast[name] == pytest.approx(exact[name], rel=1e-3, abs=1e-2)
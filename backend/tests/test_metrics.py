@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import Registry, cache_lines
+from app.core.profiling import StackSampler
+
+
+def sample(text: str, name: str, **labels) -> float | None:
+    """Valor de la serie `name{labels}` en un texto de Prometheus (las etiquetas en cualquier orden)."""
+    for line in text.splitlines():
+        match = re.fullmatch(r"(\w+)(?:\{(.*)\})? (\S+)", line)
+        if match is None or match[1] != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match[2] or ""))
+        if all(found.get(k) == str(v) for k, v in labels.items()):
+            return float(match[3])
+    return None
+
+
+def test_counter_and_histogram_render():
+    registry = Registry()
+    counter = registry.counter("things_total", "Cosas.", ("kind",))
+    histogram = registry.histogram("work_seconds", "Trabajo.", ("op",), buckets=(0.1, 1.0))
+    counter.inc(kind="a")
+    counter.inc(2, kind='b"\n')
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, op="x")
+
+    text = registry.render()
+    assert "# TYPE things_total counter" in text and "# TYPE work_seconds histogram" in text
+    assert sample(text, "things_total", kind="a") == 1
+    assert 'kind="b\\"\\n"' in text
+    assert sample(text, "work_seconds_bucket", op="x", le="0.1") == 1
+    assert sample(text, "work_seconds_bucket", op="x", le="1.0") == 3
+    assert sample(text, "work_seconds_bucket", op="x", le="+Inf") == 4
+    assert sample(text, "work_seconds_count", op="x") == 4
+    assert sample(text, "work_seconds_sum", op="x") == pytest.approx(4.05)
+
+
+def test_broken_collector_is_skipped():
+    registry = Registry()
+    registry.collector("ok", lambda: ["ok_value 1"])
+    registry.collector("broken", lambda: 1 / 0)
+    assert registry.render() == "ok_value 1\n"
+
+
+def test_cache_lines():
+    text = "\n".join(cache_lines([("nasa", {"hits": 3, "misses": 1, "hit_ratio": 0.75})]))
+    assert sample(text, "cache_hits_total", cache="nasa") == 3
+    assert sample(text, "cache_evictions_total", cache="nasa") == 0
+    assert sample(text, "cache_hit_ratio", cache="nasa") == 0.75
+
+
+def test_metrics_endpoint(client, fake_upstreams):
+    before = sample(client.get("/metrics").text, "http_request_duration_seconds_count",
+                    method="GET", route="/api/nasa/closest", status=200) or 0
+    assert client.get("/api/nasa/closest").status_code == 200
+    assert client.get("/api/nasa/closest").status_code == 200
+    text = client.get("/metrics").text
+    assert sample(text, "http_request_duration_seconds_count",
+                  method="GET", route="/api/nasa/closest", status=200) == before + 2
+    assert sample(text, "upstream_request_duration_seconds_count", host="nasa.test", status=200) >= 1
+    # la segunda petición sale de la caché
+    assert sample(text, "cache_hits_total", cache="nasa") >= 1
+    assert sample(text, "upstream_circuit_state", upstream="nasa") == 0
+
+
+def test_metrics_does_not_build_services(client):
+    client.get("/metrics")
+    assert client.app.state.services.built("nasa_client") is None
+
+
+def test_profile_query(client, monkeypatch):
+    body = {"diameters_km": [0.5] * 1000, "velocities_kms": [20.0] * 1000}
+    plain = client.post("/api/impact/batch", json=body, params={"profile": 1})
+    assert plain.status_code == 200 and "x-profile-samples" not in plain.headers
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    profiled = client.post("/api/impact/batch", json=body, headers={"X-Profile": "1"})
+    assert profiled.headers["x-profile-status"] == "200"
+    assert int(profiled.headers["x-profile-samples"]) >= 1
+
+
+def test_stack_sampler_folds_stacks():
+    import time
+
+    sampler = StackSampler(interval_s=0.001).start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    sampler.stop()
+    folded = sampler.folded()
+    assert sampler.samples > 0
+    assert "test_stack_sampler_folds_stacks" in folded
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
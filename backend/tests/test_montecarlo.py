@@ -0,0 +1,54 @@
+import httpx
+import numpy as np
+import pytest
+
+from app.domain.physics import montecarlo
+from app.domain.physics.montecarlo import MonteCarloSpec, run_monte_carlo
+
+SPEC = MonteCarloSpec(diameterMin=0.1, diameterMax=0.4, relativeVelocity=18)
+
+
+def test_seed_makes_runs_reproducible():
+    assert run_monte_carlo(SPEC, 20_000, seed=3) == run_monte_carlo(SPEC, 20_000, seed=3)
+    assert run_monte_carlo(SPEC, 20_000, seed=3) != run_monte_carlo(SPEC, 20_000, seed=4)
+
+
+def test_percentiles_within_histogram_bin():
+    samples = 50_000
+    result = run_monte_carlo(SPEC, samples, seed=11, chunk_size=samples)
+    # Mismas muestras que la única tanda de run_monte_carlo
+    chunk = montecarlo._sample_chunk(SPEC, np.random.default_rng(11), samples)
+    for band, values in ((result.energyInMegaTons, chunk.energyInMegaTons),
+                         (result.finalCraterDiameter, chunk.finalCraterDiameter)):
+        exact = np.percentile(values, montecarlo.PERCENTILES)
+        assert [band.p5, band.p50, band.p95] == pytest.approx(exact, rel=5e-3)
+        assert band.p5 <= band.p50 <= band.p95
+
+
+def test_progress_is_reported_per_chunk():
+    seen = []
+    run_monte_carlo(SPEC, 10_000, seed=1, chunk_size=4_000, progress=lambda done, total: seen.append((done, total)))
+    assert seen == [(4_000, 10_000), (8_000, 10_000), (10_000, 10_000)]
+
+
+@pytest.mark.parametrize("spec, samples", [(SPEC, 0), (MonteCarloSpec(0.5, 0.1, 18), 1_000)])
+def test_invalid_input(spec, samples):
+    with pytest.raises(ValueError):
+        run_monte_carlo(spec, samples)
+
+
+def test_endpoint_with_custom_range(client):
+    response = client.post("/api/impact/montecarlo", json={
+        "diameter_min_km": 0.1, "diameter_max_km": 0.4, "velocity_kms": 18, "samples": 5_000, "seed": 2,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["samples"] == 5_000
+    assert body["energy_in_megatons"]["p5"] <= body["energy_in_megatons"]["p95"]
+
+
+def test_upstream_error_does_not_leak_the_api_key(client, mock_upstreams):
+    mock_upstreams(lambda request: httpx.Response(500))
+    response = client.post("/api/impact/montecarlo", json={"nasa_id": 3542519, "samples": 1_000})
+    assert response.status_code == 502
+    assert "api_key" not in response.text
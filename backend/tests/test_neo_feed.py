@@ -0,0 +1,86 @@
+import copy
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from app.domain.neo_feed import parse_feed, records_from_bytes, records_to_bytes, to_items, top_k
+from benchmarks.fixtures import make_feed
+
+FEED = make_feed(date(2025, 3, 1), days=3, per_day=60)
+
+
+def reference_rows(feed: dict) -> list[tuple]:
+    """El recorrido original del JSON, fila por fila."""
+    rows = []
+    for asteroids in feed["near_earth_objects"].values():
+        for asteroid in asteroids:
+            size = asteroid["estimated_diameter"]["kilometers"]
+            for approach in asteroid["close_approach_data"]:
+                if approach["orbiting_body"] != "Earth":
+                    continue
+                rows.append((int(asteroid["id"]), asteroid["name"],
+                             (size["estimated_diameter_min"] + size["estimated_diameter_max"]) / 2,
+                             asteroid["is_potentially_hazardous_asteroid"], approach["close_approach_date_full"],
+                             float(approach["relative_velocity"]["kilometers_per_second"]),
+                             float(approach["miss_distance"]["kilometers"])))
+    return rows
+
+
+def test_parse_feed_matches_the_fixture():
+    records = parse_feed(json.dumps(FEED).encode())
+    expected = reference_rows(FEED)
+    assert 0 < len(expected) < 180   # el fixture incluye acercamientos a Marte, que se descartan
+    assert records.tolist() == expected
+    assert parse_feed(FEED).tolist() == expected
+
+
+def test_long_names_are_not_truncated():
+    feed = copy.deepcopy(FEED)
+    long_name = "(2025 XY) " + "a" * 120
+    feed["near_earth_objects"]["2025-03-01"][0]["name"] = long_name
+    records = parse_feed(feed)
+    assert long_name in records["name"].tolist()
+    assert records.dtype["name"].itemsize // 4 == len(long_name)
+
+
+def test_invalid_numbers_and_empty_feed():
+    feed = copy.deepcopy(FEED)
+    asteroid = next(a for a in feed["near_earth_objects"]["2025-03-02"]
+                    if a["close_approach_data"][0]["orbiting_body"] == "Earth")
+    asteroid["close_approach_data"][0]["miss_distance"]["kilometers"] = "n/a"
+    records = parse_feed(feed)
+    assert records["miss_distance_km"][records["id"] == int(asteroid["id"])].tolist() == [0.0]
+
+    empty = parse_feed({"near_earth_objects": {}})
+    assert empty.size == 0 and to_items(top_k(empty, 10)) == []
+
+
+def test_records_round_trip_bytes():
+    records = parse_feed(FEED)
+    restored = records_from_bytes(records_to_bytes(records))
+    assert restored.dtype == records.dtype
+    assert restored.tolist() == records.tolist()
+
+
+@pytest.mark.parametrize("k", [0, 1, 7, 500])
+def test_top_k_matches_a_stable_sort(k):
+    records = parse_feed(FEED)
+    # empates en la frontera: se resuelven por posición
+    records["miss_distance_km"][::5] = 1e6
+    expected = sorted(range(len(records)), key=lambda i: records["miss_distance_km"][i])[:k]
+    assert top_k(records, k).tolist() == records[expected].tolist()
+
+
+def test_to_items_rounds_the_diameter():
+    item = to_items(top_k(parse_feed(FEED), 1))[0]
+    assert item.estimated_diameter_km == round(item.estimated_diameter_km, 3)
+
+
+def test_closest_endpoint(client, fake_upstreams):
+    body = client.get("/api/nasa/closest").json()
+    today = date.today()
+    assert body["range"] == [today.isoformat(), (today + timedelta(days=2)).isoformat()]
+    misses = [a["miss_distance_km"] for a in body["asteroids"]]
+    assert body["count"] == len(misses) == 10 and misses == sorted(misses)
+    assert fake_upstreams.requests["nasa.test"] == 1
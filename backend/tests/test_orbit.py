@@ -0,0 +1,110 @@
+from datetime import date, datetime, timezone
+
+import httpx
+import numpy as np
+import pytest
+
+from app.domain.physics.orbit import (
+    AU_KM, DAY_S, EARTH, JD_J2000, OrbitalElements, closeApproaches, dateToJd, jdToDatetime, muSun, solveKepler,
+    stateVectors,
+)
+from benchmarks.fixtures import _orbital_data, make_neo
+
+ELEMENTS = OrbitalElements.fromNasa(_orbital_data(i) for i in range(2_000_000, 2_000_300))
+JD0 = dateToJd(date(2026, 1, 1))
+
+
+def test_julian_dates():
+    assert dateToJd(date(2000, 1, 1)) == JD_J2000 - 0.5
+    assert dateToJd(datetime(2000, 1, 1, 12, tzinfo=timezone.utc)) == JD_J2000
+    moment = datetime(2031, 7, 4, 18, 30, tzinfo=timezone.utc)
+    assert abs(jdToDatetime(dateToJd(moment)) - moment).total_seconds() < 1e-3
+
+
+@pytest.mark.parametrize("e", [0.0, 0.3, 0.9, 0.99])
+def test_kepler_residual(e):
+    M = np.linspace(-10, 10, 2001)
+    E = solveKepler(M, e)
+    np.testing.assert_allclose(E - e * np.sin(E), np.remainder(M, 2 * np.pi), atol=1e-10)
+
+
+def test_earth_orbit():
+    days = JD0 + np.arange(0, 366, 5.0)
+    r, v = stateVectors(EARTH, days, grid=True)
+    distance = np.linalg.norm(r[0], axis=-1)
+    speed = np.linalg.norm(v[0], axis=-1) * AU_KM / DAY_S
+    assert distance.min() == pytest.approx(0.9833, abs=1e-3)
+    assert distance.max() == pytest.approx(1.0167, abs=1e-3)
+    assert 29.2 < speed.min() < speed.max() < 30.4
+    # un año sideral después vuelve al mismo punto
+    later, _ = stateVectors(EARTH, days + 2 * np.pi / EARTH.meanMotion[0], grid=True)
+    np.testing.assert_allclose(later, r, atol=1e-9)
+
+
+def test_state_vectors_are_consistent():
+    jd = JD0 + np.linspace(0, 400, len(ELEMENTS))
+    r, v = stateVectors(ELEMENTS, jd)
+    # vis-viva y velocidad como derivada numérica de la posición
+    distance = np.linalg.norm(r, axis=-1)
+    np.testing.assert_allclose(np.einsum("ij,ij->i", v, v), muSun * (2 / distance - 1 / ELEMENTS.semiMajorAxis),
+                               rtol=1e-9)
+    h = 1e-3
+    (ahead, _), (behind, _) = stateVectors(ELEMENTS, jd + h), stateVectors(ELEMENTS, jd - h)
+    np.testing.assert_allclose((ahead - behind) / (2 * h), v, rtol=1e-6, atol=1e-9)
+    grid, _ = stateVectors(ELEMENTS, jd[:7], grid=True)
+    np.testing.assert_allclose(grid[np.arange(7), np.arange(7)], r[:7], atol=1e-12)
+
+
+def brute_minima(el: OrbitalElements, start: float, end: float, step: float):
+    """Mínimos locales de la distancia a la Tierra sobre una malla fina: (fila, jd, distancia)."""
+    times = np.arange(start, end, step)
+    earth, _ = stateVectors(EARTH, times, grid=True, velocity=False)
+    r, _ = stateVectors(el, times, grid=True, velocity=False)
+    d = np.linalg.norm(r - earth, axis=-1)
+    rows, k = np.nonzero((d[:, 1:-1] < d[:, :-2]) & (d[:, 1:-1] <= d[:, 2:]))
+    return rows, times[k + 1], d[rows, k + 1]
+
+
+def test_close_approaches_match_brute_force():
+    found = closeApproaches(ELEMENTS, JD0, JD0 + 730, step=1.0, maxDistance=0.1, chunkSize=64)
+    assert len(found) > 0
+    assert np.all(np.diff(found.distance) >= 0) and np.all(found.distance <= 0.1)
+
+    candidates = np.unique(found.index)
+    rows, jd, distance = brute_minima(ELEMENTS.take(candidates), JD0 + 1, JD0 + 729, step=0.01)
+    for index, t, d in zip(found.index, found.jd, found.distance):
+        here = (candidates[rows] == index) & (np.abs(jd - t) < 1)
+        assert here.any()
+        assert d == pytest.approx(distance[here].min(), abs=1e-6)
+        assert t == pytest.approx(jd[here][np.argmin(distance[here])], abs=0.02)
+
+    # ningún mínimo claramente por debajo del umbral queda fuera
+    rows, jd, distance = brute_minima(ELEMENTS, JD0 + 1, JD0 + 729, step=0.1)
+    missed = {(row, round(t)) for row, t, d in zip(rows, jd, distance) if d < 0.099}
+    assert missed <= {(i, round(t)) for i, t in zip(found.index, found.jd)} | \
+        {(i, round(t) + s) for i, t in zip(found.index, found.jd) for s in (-1, 1)}
+    assert len(missed) > 0
+
+
+def test_unbound_orbits_are_skipped():
+    el = OrbitalElements.fromArrays([1.0, -2.0], [0.0167, 1.5], 0, 0, 0, 0, JD_J2000)
+    assert el.isBound.tolist() == [True, False]
+    assert len(closeApproaches(el.take([1]), JD0, JD0 + 30)) == 0
+
+
+def test_orbit_endpoint(client, mock_upstreams):
+    neo = make_neo(2_000_259)
+    mock_upstreams(lambda request: httpx.Response(200, json=neo))
+    response = client.get("/api/nasa/orbit/2000259", params={"days": 3650, "max_distance_au": 0.2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["screened"] == 1 and body["count"] == len(body["approaches"])
+    misses = [a["miss_distance_km"] for a in body["approaches"]]
+    assert misses == sorted(misses) and all(m <= 0.2 * AU_KM for m in misses)
+
+
+def test_orbit_endpoint_without_orbital_data(client, mock_upstreams):
+    neo = make_neo(2_000_259)
+    del neo["orbital_data"]
+    mock_upstreams(lambda request: httpx.Response(200, json=neo))
+    assert client.get("/api/nasa/orbit/2000259").status_code == 422
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from app.services.quake_catalog import QuakeCatalog, records_from_geojson
+
+T0 = 1_600_000_000_000
+
+
+def random_records(n: int = 3000, seed: int = 5) -> list[tuple]:
+    rng = np.random.default_rng(seed)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lon = rng.uniform(-180, 180, n)
+    mag = np.round(rng.uniform(4.5, 9.0, n), 1)
+    times = T0 + rng.integers(0, 10 ** 11, n)
+    return [(f"q{i}", f"Place {i}", int(times[i]), int(times[i]), float(mag[i]), float(lat[i]), float(lon[i]), 10.0)
+            for i in range(n)]
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return QuakeCatalog.from_records(random_records())
+
+
+def brute_distance(catalog, lat, lon):
+    return catalog._distance_km(lat, lon, np.arange(len(catalog)))
+
+
+@pytest.mark.parametrize("lat, lon", [(0, 0), (-33.4, -70.6), (89.5, 10), (10, 179.9), (-60, -179.5)])
+def test_nearest_matches_brute_force(catalog, lat, lon):
+    found = catalog.nearest(lat, lon, limit=15)
+    dist = brute_distance(catalog, lat, lon)
+    assert [d for _, d in found] == pytest.approx(np.sort(dist)[:15].tolist())
+
+
+def test_nearest_with_min_magnitude(catalog):
+    found = catalog.nearest(35, 139, limit=5, min_magnitude=8.0)
+    assert all(catalog.mag[row] >= 8.0 for row, _ in found)
+    dist = brute_distance(catalog, 35, 139)
+    strong = np.flatnonzero(catalog.mag >= 8.0)
+    assert [d for _, d in found] == pytest.approx(np.sort(dist[strong])[:5].tolist())
+
+
+def test_largest_within_radius(catalog):
+    dist = brute_distance(catalog, 20, -100)
+    inside = np.flatnonzero(dist <= 2000)
+    row, distance = catalog.largest_within(20, -100, 2000)
+    assert catalog.mag[row] == catalog.mag[inside].max()
+    assert distance <= 2000
+
+
+@pytest.mark.parametrize("box", [(-10, 30, -20, 40), (-40, 40, 170, -170)])
+def test_largest_in_region_including_antimeridian(catalog, box):
+    lat_min, lat_max, lon_min, lon_max = box
+    lat, lon = catalog.lat, catalog.lon
+    in_lon = (lon >= lon_min) & (lon <= lon_max) if lon_min <= lon_max else (lon >= lon_min) | (lon <= lon_max)
+    inside = np.flatnonzero((lat >= lat_min) & (lat <= lat_max) & in_lon)
+    row = catalog.largest_in_region(*box)
+    assert row in inside and catalog.mag[row] == catalog.mag[inside].max()
+
+
+def test_time_window(catalog):
+    since, until = T0 + 2 * 10 ** 10, T0 + 3 * 10 ** 10
+    row = catalog.largest_in_region(-90, 90, -180, 180, since_ms=since, until_ms=until)
+    window = np.flatnonzero((catalog.time_ms >= since) & (catalog.time_ms < until))
+    assert since <= catalog.time_ms[row] < until
+    assert catalog.mag[row] == catalog.mag[window].max()
+
+
+def test_closest_magnitude_prefers_recent(catalog):
+    row = catalog.closest_magnitude(7.0)
+    same = np.flatnonzero(catalog.mag == catalog.mag[row])
+    assert catalog.mag[row] == pytest.approx(7.0)
+    assert catalog.time_ms[row] == catalog.time_ms[same].max()
+
+
+def test_merge_keeps_the_latest_update_and_saves(tmp_path):
+    records = random_records(50)
+    catalog = QuakeCatalog.from_records(records)
+    updated = (records[0][0], "Moved", records[0][2], records[0][3] + 1, 9.5, 0.0, 0.0, 5.0)
+    merged = catalog.merge([updated])
+    assert len(merged) == 50
+    reopened = QuakeCatalog.open(merged.save(tmp_path / "catalog"))
+    row = reopened.closest_magnitude(9.5)
+    assert reopened.record(row)["location"] == "Moved"
+
+
+def test_geojson_rows_skip_incomplete_features():
+    data = {"features": [
+        {"id": "a", "properties": {"mag": 5.0, "time": T0, "place": "x"}, "geometry": {"coordinates": [1, 2, 3]}},
+        {"id": "b", "properties": {"mag": None, "time": T0}, "geometry": {"coordinates": [1, 2, 3]}},
+    ]}
+    assert [r[0] for r in records_from_geojson(data)] == ["a"]
+
+
+def test_endpoints(client, catalog):
+    assert client.get("/api/impact/earthquakes/nearest", params={"lat": 0, "lon": 0}).status_code == 503
+    client.app.state.services.impact.catalog = catalog
+    nearest = client.get("/api/impact/earthquakes/nearest", params={"lat": 0, "lon": 0, "limit": 3}).json()
+    assert len(nearest) == 3
+    assert [q["distance_km"] for q in nearest] == sorted(q["distance_km"] for q in nearest)
+    largest = client.get("/api/impact/earthquakes/largest", params={"lat": 0, "lon": 0, "radius_km": 3000})
+    assert largest.status_code == 200 and largest.json()["distance_km"] <= 3000
+    assert client.get("/api/impact/earthquakes/largest", params={"lat": 0}).status_code == 422
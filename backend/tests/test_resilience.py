@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.clients.http import HttpClientManager
+from app.clients.resilience import (
+    CLOSED, HALF_OPEN, OPEN, BudgetExceeded, CircuitBreaker, CircuitOpenError, UpstreamPolicy,
+)
+from app.core.degraded import mark_degraded, track_degraded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_transitions():
+    clock = FakeClock()
+    breaker = CircuitBreaker("up", failure_threshold=3, reset_s=10, clock=clock)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_success()
+    assert breaker.failures == 0
+
+    for _ in range(3):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN and breaker.opens == 1
+    clock.now = 4.0
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.allow()
+    assert rejected.value.retry_after == pytest.approx(6.0)
+
+    # half-open: una sola petición de prueba; si falla, vuelve a abrirse
+    clock.now = 10.0
+    breaker.allow()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.opens == 2
+
+    # una prueba cancelada libera el turno; una exitosa cierra el circuito
+    clock.now = 20.0
+    breaker.allow()
+    breaker.release()
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats() == {"state": CLOSED, "failures": 0, "opens": 2, "rejected": 2}
+
+
+def test_disabled_breaker_never_opens():
+    breaker = CircuitBreaker("up", failure_threshold=0)
+    for _ in range(100):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def manager(handler, **policy) -> HttpClientManager:
+    return HttpClientManager(transport=httpx.MockTransport(handler), retries=0,
+                             policies={"up": UpstreamPolicy(**policy)})
+
+
+async def get(http: HttpClientManager) -> httpx.Response:
+    return await http.get("https://upstream.test/x", upstream="up")
+
+
+def test_open_circuit_fails_fast_without_calling_the_upstream():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    async def main():
+        http = manager(handler, failure_threshold=2, reset_s=60)
+        statuses = [(await get(http)).status_code for _ in range(2)]
+        with pytest.raises(CircuitOpenError):
+            await get(http)
+        stats = http.stats()
+        await http.aclose()
+        return statuses, stats
+
+    statuses, stats = asyncio.run(main())
+    assert statuses == [503, 503] and len(calls) == 2
+    assert stats["up"]["state"] == OPEN and stats["up"]["rejected"] == 1
+
+
+def test_budget_bounds_the_whole_request():
+    async def handler(request):
+        await asyncio.sleep(1.0)
+        return httpx.Response(200)
+
+    async def main():
+        http = manager(handler, budget_s=0.05, failure_threshold=1)
+        started = time.perf_counter()
+        with pytest.raises(BudgetExceeded):
+            await get(http)
+        elapsed = time.perf_counter() - started
+        state = http.breaker("up").state
+        await http.aclose()
+        return elapsed, state
+
+    elapsed, state = asyncio.run(main())
+    assert elapsed < 0.5 and state == OPEN
+
+
+def test_hedged_request_takes_the_fastest_answer():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1.0)
+            return httpx.Response(200, text="slow")
+        return httpx.Response(200, text="fast")
+
+    async def main():
+        http = manager(handler, hedge_after_s=0.02)
+        started = time.perf_counter()
+        response = await get(http)
+        elapsed = time.perf_counter() - started
+        await http.aclose()
+        return response.text, elapsed
+
+    text, elapsed = asyncio.run(main())
+    assert text == "fast" and elapsed < 0.5 and len(calls) == 2
+
+
+def test_degraded_marks_reach_the_outer_block():
+    async def fallback():
+        await asyncio.sleep(0)
+        mark_degraded("nasa")
+
+    async def main():
+        with track_degraded() as outer:
+            with track_degraded() as inner:
+                # las tareas de gather heredan el registro de la petición
+                await asyncio.gather(fallback(), fallback())
+            mark_degraded("usgs")
+        return inner, outer
+
+    inner, outer = asyncio.run(main())
+    assert inner == {"nasa"} and outer == {"nasa", "usgs"}
+    mark_degraded("nasa")   # sin registro abierto no pasa nada
+
+
+def test_nasa_outage_is_served_from_the_last_good_value(client, fake_upstreams):
+    fresh = client.get("/api/nasa/closest")
+    assert fresh.json()["degraded"] is False and "x-degraded" not in fresh.headers
+
+    client.app.state.services.nasa_client.cache.clear()
+    client.portal.call(fake_upstreams.fault, "nasa.test", "error")
+    degraded = client.get("/api/nasa/closest")
+    assert degraded.status_code == 200
+    assert degraded.json()["degraded"] is True and degraded.headers["x-degraded"] == "nasa"
+    assert degraded.json()["asteroids"] == fresh.json()["asteroids"]
+
+    # sin un valor previo no hay respaldo: 502 sin filtrar la URL con la api_key
+    missing = client.get("/api/nasa/range", params={"start_date": "2030-01-01", "end_date": "2030-01-03"})
+    assert missing.status_code == 502 and "api_key" not in missing.text
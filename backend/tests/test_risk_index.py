@@ -0,0 +1,85 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.clients.nasa_client import NasaNeoClient
+from app.domain.physics import batch
+from app.services.risk_index import RiskIndex, RiskIndexRefresher, parse_browse_page
+from benchmarks.fixtures import make_neo
+
+
+def rows(n: int, first_id: int = 1):
+    rng = np.random.default_rng(first_id)
+    return [(first_id + i, f"NEO {first_id + i}", float(rng.uniform(0.01, 2)), float(rng.uniform(5, 40)), False)
+            for i in range(n)]
+
+
+def test_ranking_matches_the_batch_engine():
+    index = RiskIndex()
+    data = rows(500)
+    index.upsert(data)
+    energy = batch.simulate_impact_batch([r[2] for r in data], [r[3] for r in data], False).energyInMegaTons
+    expected = [data[i][0] for i in np.argsort(-energy, kind="stable")[:10]]
+    assert index.top("energy", 10)["id"].tolist() == expected
+
+
+def test_only_changed_rows_are_recomputed():
+    index = RiskIndex()
+    data = rows(50)
+    assert index.upsert(data) == 50
+    assert index.upsert(data) == 0
+    changed = [(data[0][0], data[0][1], 10.0, 30.0, True)]
+    assert index.upsert(changed) == 1
+    assert len(index) == 50
+    assert index.top("energy", 1)["id"][0] == data[0][0]
+
+
+def test_growth_keeps_rows():
+    index = RiskIndex()
+    for page in range(5):
+        index.upsert(rows(500, first_id=1 + page * 500))
+    assert len(index) == 2500
+    assert sorted(index.table["id"].tolist()) == list(range(1, 2501))
+
+
+def test_browse_page_keeps_the_closest_earth_approach():
+    neo = make_neo(3_000_001)
+    earth = dict(neo["close_approach_data"][0], orbiting_body="Earth")
+    near = dict(earth, relative_velocity={"kilometers_per_second": "12.5"}, miss_distance={"kilometers": "1000"})
+    neo["close_approach_data"] = [earth, near, dict(near, orbiting_body="Mars", miss_distance={"kilometers": "1"})]
+    (row,) = parse_browse_page({"near_earth_objects": [neo]})
+    assert row[0] == 3_000_001 and row[3] == 12.5
+
+
+def test_refresher_walks_the_catalog(client, fake_upstreams):
+    index = RiskIndex()
+    refresher = RiskIndexRefresher(index, NasaNeoClient(http=client.app.state.services.http), max_pages=3)
+    updated = client.portal.call(refresher.refresh)
+    assert updated == len(index) > 0
+    assert fake_upstreams.requests["nasa.test"] == 3
+
+
+@pytest.fixture
+def ranked_client(client):
+    client.app.state.services.risk_index.upsert(rows(25))
+    return client
+
+
+def test_cursor_pages_through_the_ranking(ranked_client):
+    seen, cursor = [], None
+    while True:
+        params = {"metric": "crater", "limit": 10, **({"cursor": cursor} if cursor else {})}
+        body = ranked_client.get("/api/nasa/ranked", params=params).json()
+        seen += [a["id"] for a in body["asteroids"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == body["total"] == 25
+    craters = ranked_client.app.state.services.risk_index.top("crater", 25)["id"].tolist()
+    assert seen == craters
+
+
+@pytest.mark.parametrize("cursor", ["-1", "abc"])
+def test_invalid_cursor(ranked_client, cursor):
+    assert ranked_client.get("/api/nasa/ranked", params={"cursor": cursor}).status_code == 422
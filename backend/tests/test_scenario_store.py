@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.core.shared_state import InProcessStateBackend, SqliteStateBackend
+from app.services.scenario_store import SCENARIO_COOKIE, ScenarioStore
+
+CONFIG = {"diameter": 0.4, "relativeVelocity": 20.0, "water": 1, "lat": -33.4, "lon": -70.6}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InProcessStateBackend()
+    return SqliteStateBackend(str(tmp_path / "state.db"))
+
+
+def test_round_trip_and_last(backend):
+    async def main():
+        store = ScenarioStore(backend, ttl=60)
+        try:
+            first = await store.save(CONFIG)
+            second = await store.save({**CONFIG, "diameter": 1.0})
+            await store.set_last(second)
+            return (first != second, await store.get(first), await store.get(second),
+                    await store.last(), await store.get("missing"))
+        finally:
+            await store.aclose()
+
+    distinct, first, second, last, missing = asyncio.run(main())
+    assert distinct
+    assert first == CONFIG and second["diameter"] == 1.0
+    assert missing is None
+    assert last is not None
+
+
+def test_last_pointer_is_not_a_scenario_id(backend):
+    async def main():
+        store = ScenarioStore(backend, ttl=60)
+        try:
+            scenario_id = await store.save(CONFIG)
+            await store.set_last(scenario_id)
+            return [await store.get(key) for key in ("last", "-meta:last", "meta:last")], await store.last()
+        finally:
+            await store.aclose()
+
+    lookups, last = asyncio.run(main())
+    assert lookups == [None, None, None]
+    assert last is not None
+
+
+def test_corrupt_entry_reads_as_missing():
+    async def main():
+        backend = InProcessStateBackend()
+        store = ScenarioStore(backend, ttl=60)
+        await backend.set("scenario:broken", b"{not json", 60)
+        await backend.set("scenario:list", b"[1, 2]", 60)
+        return await store.get("broken"), await store.get("list")
+
+    assert asyncio.run(main()) == (None, None)
+
+
+def test_entries_expire():
+    async def main():
+        store = ScenarioStore(InProcessStateBackend(), ttl=0.01)
+        scenario_id = await store.save(CONFIG)
+        await asyncio.sleep(0.02)
+        return await store.get(scenario_id)
+
+    assert asyncio.run(main()) is None
+
+
+def test_input_then_combined(client, fake_upstreams):
+    saved = client.post("/api/nasa/input", json={
+        "is_custom": True, "diameter_km": 0.4, "velocity_kms": 20, "lat": -33.4, "lon": -70.6,
+    })
+    assert saved.status_code == 200
+    body = saved.json()
+    assert client.cookies[SCENARIO_COOKIE] == body["scenario_id"]
+
+    by_id = client.get("/api/impact/combined", params={"scenario_id": body["scenario_id"]})
+    by_cookie = client.get("/api/impact/combined")
+    client.cookies.clear()
+    by_last = client.get("/api/impact/combined")
+
+    assert by_id.status_code == by_cookie.status_code == by_last.status_code == 200
+    assert by_id.json()["simulation"] == by_cookie.json()["simulation"] == by_last.json()["simulation"]
+
+
+@pytest.mark.parametrize("scenario_id", ["missing", "last", "-meta:last"])
+def test_unknown_scenario_is_404(client, scenario_id):
+    client.portal.call(client.app.state.scenarios.set_last, "whatever")
+    response = client.get("/api/impact/combined", params={"scenario_id": scenario_id})
+    assert response.status_code == 404
@@ -0,0 +1,192 @@
+import asyncio
+import importlib.util
+
+import pytest
+
+from app.core.shared_state import (
+    InProcessStateBackend, SharedCache, SqliteStateBackend, build_state_backend,
+)
+from app.services.job_queue import JobQueue
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    """
+    Cada llamada es la vista de otro "worker" sobre el mismo estado: con
+    sqlite otra conexión al mismo archivo, en memoria el mismo dict.
+    """
+    made = []
+    memory = InProcessStateBackend()
+
+    def make():
+        backend = memory if request.param == "memory" else SqliteStateBackend(str(tmp_path / "state.db"))
+        made.append(backend)
+        return backend
+
+    yield make
+    for backend in made:
+        if isinstance(backend, SqliteStateBackend):
+            backend._conn.close()
+            backend._executor.shutdown(wait=False)
+
+
+def test_backend_operations(make_backend):
+    async def main():
+        backend = make_backend()
+        await backend.set("a", b"1", 60)
+        assert await backend.get("a") == b"1"
+        assert not await backend.add("a", b"2", 60)
+        assert await backend.add("b", b"2", 0.05)
+        await asyncio.sleep(0.1)
+        assert await backend.get("b") is None
+        # `add` toma una clave vencida
+        assert await backend.add("b", b"3", 60)
+        assert not await backend.delete_if("b", b"other")
+        assert await backend.delete_if("b", b"3")
+        assert await backend.get("b") is None
+        await backend.delete("a")
+        assert await backend.get("a") is None
+
+    asyncio.run(main())
+
+
+def test_sqlite_is_shared_between_workers(tmp_path):
+    async def main():
+        path = str(tmp_path / "state.db")
+        one, two = SqliteStateBackend(path), SqliteStateBackend(path)
+        await one.set("k", b"v", 60)
+        seen = await two.get("k")
+        lease = await one.add("lock", b"t1", 60), await two.add("lock", b"t2", 60)
+        await one.aclose()
+        await two.aclose()
+        return seen, lease
+
+    assert asyncio.run(main()) == (b"v", (True, False))
+
+
+def test_in_process_backend_is_bounded():
+    async def main():
+        backend = InProcessStateBackend(maxsize=3)
+        for i in range(5):
+            await backend.set(str(i), b"x", 60)
+        return [await backend.get(str(i)) for i in range(5)]
+
+    assert asyncio.run(main()) == [None, None, b"x", b"x", b"x"]
+
+
+def test_build_state_backend():
+    assert isinstance(build_state_backend("memory"), InProcessStateBackend)
+    with pytest.raises(ValueError):
+        build_state_backend("nope")
+    if importlib.util.find_spec("redis") is None:
+        with pytest.raises(RuntimeError, match="redis"):
+            build_state_backend("redis")
+
+
+def codec():
+    return {"encode": lambda v: str(v).encode(), "decode": lambda raw: int(raw)}
+
+
+def test_shared_cache_fills_once_across_workers(make_backend):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        workers = [SharedCache(make_backend(), "t:", poll_s=0.005) for _ in range(4)]
+        values = await asyncio.gather(*(w.get_or_load("k", loader, 60, **codec()) for w in workers))
+        again = await workers[0].get_or_load("k", loader, 60, **codec())
+        stats = [w.stats for w in workers]
+        return values, again, stats
+
+    values, again, stats = asyncio.run(main())
+    assert values == [42] * 4 and again == 42
+    assert len(calls) == 1
+    assert sum(s.fills for s in stats) == 1 and sum(s.coalesced for s in stats) == 3
+    assert sum(s.hits for s in stats) == 1
+
+
+def test_failed_fill_releases_the_lease(make_backend):
+    async def failing():
+        raise RuntimeError("upstream caído")
+
+    async def ok():
+        return 7
+
+    async def main():
+        backend = make_backend()
+        cache = SharedCache(backend, "t:", lease_s=60)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("k", failing, 60, **codec())
+        # sin esperar a que venza el lease
+        return await asyncio.wait_for(cache.get_or_load("k", ok, 60, **codec()), 1.0)
+
+    assert asyncio.run(main()) == 7
+
+
+def test_slow_owner_does_not_release_the_next_lease(make_backend):
+    async def main():
+        backend = make_backend()
+        slow = SharedCache(backend, "t:", lease_s=0.05, poll_s=0.005)
+        release = asyncio.Event()
+
+        async def slow_loader():
+            await release.wait()
+            return 1
+
+        owner = asyncio.create_task(slow.get_or_load("k", slow_loader, 60, **codec()))
+        await asyncio.sleep(0.1)
+        # el lease del dueño lento venció: otro worker lo toma
+        assert await backend.add("lock:t:k", b"next-owner", 60)
+        release.set()
+        await owner
+        return await backend.get("lock:t:k")
+
+    assert asyncio.run(main()) == b"next-owner"
+
+
+def test_backend_errors_fall_back_to_local_loads():
+    class Broken(InProcessStateBackend):
+        async def get(self, key):
+            raise ConnectionError("backend caído")
+
+    async def loader():
+        return 5
+
+    async def main():
+        cache = SharedCache(Broken(), "t:")
+        value = await cache.get_or_load("k", loader, 60, **codec())
+        return value, cache.stats.errors
+
+    assert asyncio.run(main()) == (5, 1)
+
+
+def test_jobs_are_visible_and_cancellable_from_another_worker(tmp_path):
+    async def main():
+        path = str(tmp_path / "state.db")
+        owner_state, other_state = SqliteStateBackend(path), SqliteStateBackend(path)
+        owner = JobQueue(workers=1, max_queued=10, max_per_client=10, shared=owner_state, sync_s=0.01)
+        other = JobQueue(workers=1, max_queued=10, max_per_client=10, shared=other_state, sync_s=0.01)
+
+        async def forever(ctx):
+            ctx.report(0.25, "trabajando")
+            await asyncio.Event().wait()
+
+        job = owner.submit("t", forever)
+        while (remote := await other.state(job.id)) is None or remote["progress"] == 0:
+            await asyncio.sleep(0.01)
+        requested = await other.request_cancel(job.id)
+        watched = [state async for state in other.watch(job.id)]
+        await owner.aclose()
+        await other.aclose()
+        await owner_state.aclose()
+        await other_state.aclose()
+        return remote, requested, watched, job.status
+
+    remote, requested, watched, status = asyncio.run(main())
+    assert remote["status"] == "running" and remote["message"] == "trabajando"
+    assert requested["status"] == "running"
+    assert watched[-1]["status"] == "cancelled" and status == "cancelled"
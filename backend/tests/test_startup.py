@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.services.container import PROVIDERS, Services
+from benchmarks.bench_startup import DEFERRED
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def run_isolated(code: str, tmp_path: Path) -> subprocess.CompletedProcess:
+    """Intérprete nuevo fuera de backend/ (sin .env) y sin las API keys en el entorno."""
+    env = {k: v for k, v in os.environ.items() if not k.endswith("_API_KEY")}
+    env["PYTHONPATH"] = str(BACKEND_DIR)
+    return subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+
+
+def test_import_reads_no_settings_and_defers_heavy_modules(tmp_path):
+    code = (
+        "import json, sys, app.main\n"
+        "from app.core.config import get_settings\n"
+        f"print(json.dumps([get_settings.cache_info().currsize, [m for m in {list(DEFERRED)!r} if m in sys.modules]]))"
+    )
+    proc = run_isolated(code, tmp_path)
+    assert proc.returncode == 0, proc.stderr
+    assert json.loads(proc.stdout) == [0, []]
+
+
+def test_missing_keys_fail_on_first_use(tmp_path):
+    proc = run_isolated("from app.core.config import settings\nsettings.NASA_API_KEY", tmp_path)
+    assert proc.returncode != 0
+    assert "NASA_API_KEY" in proc.stderr and "ISITWATER_API_KEY" in proc.stderr
+
+
+def test_services_are_built_on_first_use():
+    async def main():
+        services = Services()
+        assert all(services.built(name) is None for name in PROVIDERS)
+        nasa = services.nasa
+        assert services.nasa is nasa
+        built = {name for name in PROVIDERS if services.built(name) is not None}
+        services.prewarm()
+        everything = all(services.built(name) is not None for name in PROVIDERS)
+        await services.aclose()
+        return built, everything, services.build_ms
+
+    built, everything, build_ms = asyncio.run(main())
+    assert built == {"nasa", "nasa_client", "http", "state"}
+    assert everything and set(build_ms) == set(PROVIDERS)
+
+
+def test_requests_build_only_what_they_use(client):
+    services = client.app.state.services
+    assert services.built("nasa") is None and services.built("impact") is None
+    assert client.post("/api/impact/batch", json={"diameters_km": [0.1], "velocities_kms": [20.0]}).status_code == 200
+    assert services.built("impact") is not None
+    assert services.built("nasa") is None and services.built("sweeps") is None
@@ -0,0 +1,127 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.domain.physics import batch
+from app.domain.physics.sweep import COLUMNS, FRAME_HEADER, SweepGrid, evaluate_chunk, simulate_chunk
+from app.services.sweep_service import SweepRunner
+
+GRID = SweepGrid.from_axes(np.geomspace(0.01, 5, 40), np.linspace(11, 70, 30), [False, True])
+
+
+def expected(grid: SweepGrid) -> dict[str, np.ndarray]:
+    d, v, w = (axis.ravel() for axis in np.meshgrid(grid.diameters, grid.velocities, grid.water, indexing="ij"))
+    result = batch.simulate_impact_batch(d, v, w)
+    return {
+        "energy_in_megatons": result.energyInMegaTons, "impact_velocity": result.impactVelocity,
+        "crater_diameter_m": result.finalCraterDiameter * 1000, "crater_depth_m": result.finalCraterDepth * 1000,
+        "seismic_magnitude": result.seismicMagnitude,
+    }
+
+
+def decode_frames(data: bytes) -> dict[str, np.ndarray]:
+    columns: dict[str, list] = {name: [] for name in COLUMNS}
+    pos, offset = 0, 0
+    while pos < len(data):
+        lo, count, ncols = FRAME_HEADER.unpack_from(data, pos)
+        assert lo == offset and ncols == len(COLUMNS)
+        pos += FRAME_HEADER.size
+        for name in COLUMNS:
+            columns[name].append(np.frombuffer(data, "<f4", count, pos))
+            pos += 4 * count
+        offset += count
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+
+def assert_matches(columns: dict[str, np.ndarray], grid: SweepGrid) -> None:
+    for name, values in expected(grid).items():
+        np.testing.assert_allclose(columns[name], values.astype(np.float32), rtol=1e-6, err_msg=name)
+
+
+def test_chunks_cover_the_grid_in_c_order():
+    chunks = GRID.chunks(700)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(GRID) == 2400
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+    frames = b"".join(evaluate_chunk(GRID, lo, hi) for lo, hi in chunks)
+    assert_matches(decode_frames(frames), GRID)
+
+
+def test_ndjson_chunk_matches_the_columns():
+    line = json.loads(evaluate_chunk(GRID, 100, 150, "ndjson"))
+    assert line["offset"] == 100 and line["count"] == 50
+    columns = simulate_chunk(GRID, 100, 150)
+    for name in COLUMNS:
+        assert line[name] == pytest.approx(columns[name].tolist(), rel=1e-4, abs=1e-4)
+
+
+def collect(runner: SweepRunner, grid: SweepGrid, chunk_size: int, stop_after: int | None = None):
+    async def main():
+        progress = runner.start(grid)
+        parts = []
+        async for data in runner.stream(progress, grid, chunk_size):
+            parts.append(data)
+            if len(parts) == stop_after:
+                runner.cancel(progress.id)
+        return progress, parts
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def runner():
+    # Un pool de hilos basta para probar el orden y la cancelación sin lanzar procesos
+    runner = SweepRunner(workers=2)
+    runner._pool = ThreadPoolExecutor(2)
+    yield runner
+    runner.close()
+
+
+def test_runner_streams_in_order(runner):
+    progress, parts = collect(runner, GRID, 256)
+    assert progress.status == "done" and progress.done == len(GRID)
+    assert_matches(decode_frames(b"".join(parts)), GRID)
+
+
+def test_cancel_stops_the_stream(runner):
+    progress, parts = collect(runner, GRID, 100, stop_after=2)
+    assert progress.status == "cancelled"
+    assert len(parts) == 2 and progress.done < len(GRID)
+    assert not runner.cancel(progress.id)
+
+
+def test_sweep_endpoint_ndjson_and_progress(client):
+    body = {"diameters_km": {"start": 0.01, "stop": 5, "num": 40, "log": True},
+            "velocities_kms": {"start": 11, "stop": 70, "num": 30}, "water": [False, True], "chunk_size": 1024}
+    response = client.post("/api/impact/sweep", json=body)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    header, chunks, end = lines[0], lines[1:-1], lines[-1]
+    assert header["total"] == 2400 and header["shape"] == [40, 30, 2]
+    assert [c["offset"] for c in chunks] == [0, 1024, 2048]
+    assert end["status"] == "done" and end["done"] == 2400
+    columns = {name: np.concatenate([c[name] for c in chunks]) for name in COLUMNS}
+    for name, values in expected(GRID).items():
+        np.testing.assert_allclose(columns[name], values, rtol=1e-4, atol=1e-4, err_msg=name)
+
+    progress = client.get(f"/api/impact/sweep/{header['sweep_id']}").json()
+    assert progress["status"] == "done" and progress["done"] == 2400
+
+
+def test_sweep_endpoint_binary(client):
+    body = {"diameters_km": GRID.diameters.tolist(), "velocities_kms": GRID.velocities.tolist(),
+            "water": [False, True], "format": "binary", "chunk_size": 1024}
+    response = client.post("/api/impact/sweep", json=body)
+    assert response.headers["x-sweep-shape"] == "40,30,2"
+    assert response.headers["x-sweep-columns"].split(",") == list(COLUMNS)
+    assert_matches(decode_frames(response.content), GRID)
+
+
+def test_sweep_errors(client):
+    assert client.get("/api/impact/sweep/nope").status_code == 404
+    assert client.delete("/api/impact/sweep/nope").status_code == 404
+    huge = {"diameters_km": {"start": 1, "stop": 2, "num": 10_000}, "velocities_kms": {"start": 11, "stop": 70, "num": 10_000}}
+    assert client.post("/api/impact/sweep", json=huge).status_code == 422
+    assert client.post("/api/impact/sweep", json={"diameters_km": [-1], "velocities_kms": [20]}).status_code == 422
@@ -0,0 +1,82 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.water_tiles import SqliteTileStore, WaterRaster, WaterTileCache, tile_center, tile_key
+
+
+class FakeIsItWater:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.points = []
+
+    async def fetch_is_water(self, lat: float, lon: float) -> dict:
+        if self.fail:
+            raise RuntimeError("IsItWater down")
+        self.points.append((lat, lon))
+        return {"water": lat < 0}
+
+
+@pytest.mark.parametrize("lat, lon", [(0.0, 0.0), (-33.456, -70.648), (89.999, 179.999), (-90.0, -180.0)])
+def test_center_lies_in_its_tile(lat, lon):
+    key = tile_key(lat, lon, 0.01)
+    assert tile_key(*tile_center(key, 0.01), 0.01) == key
+
+
+def test_points_in_one_tile_share_one_call():
+    async def main():
+        api = FakeIsItWater()
+        tiles = WaterTileCache(api, resolution_deg=0.1)
+        answers = [await tiles.is_water(-33.45 + i * 0.001, -70.61) for i in range(50)]
+        return api, answers
+
+    api, answers = asyncio.run(main())
+    assert answers == [True] * 50
+    assert len(api.points) == 1
+
+
+def test_sqlite_store_survives_restarts(tmp_path):
+    path = tmp_path / "tiles.db"
+
+    async def lookup(api):
+        store = SqliteTileStore(path, 0.1)
+        try:
+            tiles = WaterTileCache(api, resolution_deg=0.1, store=store)
+            return await tiles.is_water(10.0, 20.0), tiles.store_hits
+        finally:
+            store.close()
+
+    first, second = FakeIsItWater(), FakeIsItWater()
+    assert asyncio.run(lookup(first)) == (False, 0)
+    assert asyncio.run(lookup(second)) == (False, 1)
+    assert len(first.points) == 1 and not second.points
+
+
+def make_raster(tmp_path, resolution_deg: float = 1.0):
+    rows, cols = round(180 / resolution_deg), round(360 / resolution_deg)
+    water = np.zeros((rows, cols), dtype=bool)
+    water[: rows // 2] = True                  # hemisferio sur: agua
+    path = tmp_path / "water.npy"
+    np.save(path, np.packbits(water, axis=1))
+    return WaterRaster(path)
+
+
+def test_raster_lookup(tmp_path):
+    raster = make_raster(tmp_path)
+    assert raster.is_water(-10.5, 100.0) and not raster.is_water(10.5, -100.0)
+    assert raster.is_water(-89.9, 179.9) and not raster.is_water(90.0, 180.0)
+
+
+def test_raster_answers_when_the_api_fails(tmp_path):
+    async def main():
+        tiles = WaterTileCache(FakeIsItWater(fail=True), resolution_deg=0.1, raster=make_raster(tmp_path))
+        return await tiles.is_water(-20.0, 30.0), tiles.fallbacks, len(tiles.lru)
+
+    # El respaldo no se guarda como celda resuelta
+    assert asyncio.run(main()) == (True, 1, 0)
+
+
+def test_offline_needs_a_raster():
+    with pytest.raises(ValueError):
+        WaterTileCache(FakeIsItWater(), offline=True)